@@ -4,12 +4,18 @@ Uses Azure OpenAI GPT-4 to intelligently extract entities from documents
 """
 
 import os
+import re
 import sys
 import io
-import json
+import hashlib
+import argparse
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List, Optional
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
 from collections import defaultdict
 
 # Fix Windows encoding for emojis
@@ -20,186 +26,63 @@ from openai import AzureOpenAI
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 from dotenv import load_dotenv
 
-# For PDF extraction
-try:
-    import pypdf
-except ImportError:
-    pypdf = None
-
-# For document conversion (DOCX, PDF, etc.)
-try:
-    from markitdown import MarkItDown
-    markitdown_converter = MarkItDown()
-except ImportError:
-    markitdown_converter = None
+from extraction_cache import ExtractionCache
+from staging_store import StagingStore, file_sha256
+from converted_text_store import ConvertedTextStore
+from build_profiler import BuildProfiler
+from chunked_extraction import split_into_chunks, merge_extractions, estimate_tokens
+from batched_extraction import (
+    DocumentPacker,
+    packable,
+    build_batch_prompt,
+    batch_output_tokens,
+    split_batch_result,
+    document_id
+)
+from llm_scheduler import RequestScheduler
+from entity_indexes import EntityIndexes
+from entity_resolution import technology_resolver, organization_resolver, topic_resolver
+from document_scanner import HANDLER_REGISTRY, scan_raw_input
+from near_duplicates import NearDuplicateIndex, minhash_signature
+from model_routing import ModelRouter, SMALL, LARGE, SMALL_MODEL, check_extraction
+from partial_json import IncrementalJSONParser, parse_response
+from extraction_schema import validate_extraction, check_entity, continuation_prompt
+from build_estimate import BuildEstimate, calibrate, count_tokens, latest_profile
+from knowledge_db import KnowledgeDatabase, DATABASE_NAME, FTS5_AVAILABLE
+from document_conversion import (
+    CONVERSION_WORKERS,
+    CONVERSION_QUEUE_SIZE,
+    CONVERTED_HANDLERS,
+    convert_pdf,
+    convert_docx,
+    convert_document,
+    converter_version
+)
 
 # Load environment
 load_dotenv()
 
+# Maximum number of extraction requests in flight at once
+MAX_CONCURRENCY = int(os.getenv("HIVEMIND_MAX_CONCURRENCY", "8"))
 
-class AIKnowledgeBuilder:
-    def __init__(self):
-        self.base_path = Path("markdown_files")
-        self.raw_input = Path("RawInput")
-        
-        # Initialize Azure OpenAI client
-        # Using the direct cognitive services endpoint you provided
-        self.client = AzureOpenAI(
-            azure_endpoint="https://grippy-resource.cognitiveservices.azure.com/",
-            api_version="2024-05-01-preview",
-            azure_ad_token_provider=get_bearer_token_provider(
-                DefaultAzureCredential(),
-                "https://cognitiveservices.azure.com/.default"
-            )
-        )
-        
-        # Storage
-        self.extracted_entities = {
-            'people': [],
-            'organizations': [],
-            'technologies': [],
-            'topics': [],
-            'meetings': [],
-            'relationships': []
-        }
-        
-        self.stats = defaultdict(int)
-    
-    def resolve_attendees(self):
-        """Resolve meeting attendee first names to full names from known people"""
-        # Build lookup of first names to full names
-        first_name_map = {}
-        for person in self.extracted_entities['people']:
-            full_name = person.get('name', '')
-            if full_name:
-                first_name = full_name.split()[0]
-                first_name_map[first_name.lower()] = full_name
-        
-        # Resolve attendees in meetings
-        for meeting in self.extracted_entities['meetings']:
-            attendees = meeting.get('attendees', [])
-            resolved = []
-            
-            for attendee in attendees:
-                attendee_clean = attendee.strip()
-                # Check if it's already a full name (has space)
-                if ' ' in attendee_clean:
-                    resolved.append(attendee_clean)
-                else:
-                    # Try to resolve first name
-                    first_name_key = attendee_clean.lower()
-                    if first_name_key in first_name_map:
-                        resolved.append(first_name_map[first_name_key])
-                    else:
-                        resolved.append(attendee_clean)  # Keep original if unknown
-            
-            meeting['attendees_resolved'] = resolved
-    
-    def consolidate_technologies(self) -> List[str]:
-        """Use GPT-4 to consolidate and deduplicate technology names"""
-        if not self.extracted_entities['technologies']:
-            return []
-        
-        # Get unique tech list
-        tech_list = list(set(self.extracted_entities['technologies']))
-        
-        # If too many, use GPT-4 to consolidate
-        if len(tech_list) > 50:
-            print(f"  🤖 Consolidating {len(tech_list)} technologies with GPT-4...")
-            
-            system_prompt = """You are a technology taxonomy expert. Consolidate this list of technologies:
-1. Merge obvious duplicates (e.g., 'M365' = 'Microsoft 365')
-2. Fix typos (e.g., 'Enter ID' → 'Entra ID')
-3. Keep major products, consolidate minor variants
-4. Use canonical product names
+# Threads writing generated pages
+WRITE_WORKERS = int(os.getenv("HIVEMIND_WRITE_WORKERS", "8"))
 
-Return ONLY a JSON array of consolidated technology names."""
-            
-            user_prompt = f"""Consolidate these technologies:
-{json.dumps(tech_list, indent=2)}
+# How often a conversion producer blocked on a full queue checks whether extraction stopped
+QUEUE_POLL_SECONDS = 0.1
 
-Return JSON array of canonical names only."""
-            
-            try:
-                response = self.client.chat.completions.create(
-                    model="gpt-4.1",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=0.1,
-                    max_tokens=2000
-                )
-                
-                result_text = response.choices[0].message.content.strip()
-                
-                # Remove markdown code blocks if present
-                if result_text.startswith("```"):
-                    result_text = result_text.split("```")[1]
-                    if result_text.startswith("json"):
-                        result_text = result_text[4:]
-                
-                consolidated = json.loads(result_text)
-                print(f"  ✓ Consolidated: {len(tech_list)} → {len(consolidated)} technologies")
-                self.stats['ai_extractions'] += 1
-                return consolidated
-                
-            except Exception as e:
-                print(f"  ⚠️ Consolidation failed: {e}, using manual normalization")
-                return tech_list
-        else:
-            return tech_list
-    
-    def extract_text_from_pdf(self, pdf_path: Path) -> str:
-        """Extract text from PDF file using markitdown or pypdf"""
-        # Try markitdown first for better extraction
-        if markitdown_converter:
-            try:
-                result = markitdown_converter.convert(str(pdf_path))
-                text = result.text_content if hasattr(result, 'text_content') else str(result)
-                self.stats['pdf_processed'] += 1
-                return text[:15000]  # Limit text length
-            except Exception as e:
-                print(f"  ⚠️ Markitdown error for {pdf_path.name}: {e}, trying pypdf...")
-        
-        # Fallback to pypdf
-        if pypdf is None:
-            self.stats['pdf_skipped'] += 1
-            return ""
-        
-        try:
-            reader = pypdf.PdfReader(pdf_path)
-            text = ""
-            for page in reader.pages[:10]:  # Limit to first 10 pages
-                text += page.extract_text() + "\n"
-            self.stats['pdf_processed'] += 1
-            return text[:15000]  # Limit text length
-        except Exception as e:
-            print(f"  ⚠️ Error reading PDF {pdf_path.name}: {e}")
-            self.stats['pdf_errors'] += 1
-            return ""
-    
-    def extract_text_from_docx(self, docx_path: Path) -> str:
-        """Extract text from DOCX file using markitdown"""
-        if markitdown_converter is None:
-            self.stats['docx_skipped'] += 1
-            print(f"  ⚠️ markitdown not installed - install with: pip install markitdown")
-            return ""
-        
-        try:
-            result = markitdown_converter.convert(str(docx_path))
-            text = result.text_content if hasattr(result, 'text_content') else str(result)
-            self.stats['docx_processed'] += 1
-            return text
-        except Exception as e:
-            print(f"  ⚠️ Error reading DOCX {docx_path.name}: {e}")
-            self.stats['docx_errors'] += 1
-            return ""
-    
-    def extract_entities_with_ai(self, text: str, source_file: str, document_type: str) -> Dict:
-        """Use GPT-4 to extract structured entities from text"""
-        
-        system_prompt = """You are an expert knowledge extraction AI for the HiveMind system.
+# Extraction request settings (part of the extraction cache key)
+EXTRACTION_MODEL = "gpt-4.1"  # Your deployment name
+EXTRACTION_TEMPERATURE = 0.1
+EXTRACTION_MAX_TOKENS = 2000
+
+# Entity lists emitted one entity at a time while a completion streams (--stream)
+STREAMED_CATEGORIES = ('people', 'meetings', 'relationships')
+
+# Follow-up requests for the missing part of a cut-off extraction answer
+MAX_CONTINUATIONS = int(os.getenv("HIVEMIND_MAX_CONTINUATIONS", "2"))
+
+EXTRACTION_SYSTEM_PROMPT = """You are an expert knowledge extraction AI for the HiveMind system.
 Extract structured entities AND their relationships following the HiveMind ontology. Return JSON only, no markdown formatting.
 
 ENTITY TYPES (HiveMind Ontology v2.0):
@@ -261,69 +144,824 @@ Return in this exact JSON format:
 
 Only include entities and relationships that are clearly mentioned and relevant. Use empty arrays if not applicable."""
 
-        user_prompt = f"""Document Type: {document_type}
+
+def extraction_prompt(text: str, source_file: str, document_type: str) -> str:
+    """User prompt of a single-document extraction request"""
+    return f"""Document Type: {document_type}
 Source: {source_file}
 
 Document Content:
-{text[:8000]}
+{text}
 
 Extract all relevant entities following the HiveMind ontology."""
 
+
+class AIKnowledgeBuilder:
+    def __init__(self, client=None, max_concurrency: Optional[int] = None,
+                 conversion_workers: Optional[int] = None,
+                 use_cache: bool = True, refresh_cache: bool = False,
+                 incremental: bool = True, llm_adjudication: bool = False,
+                 profile: bool = False, pack: bool = False, dedupe: bool = True,
+                 small_model: Optional[str] = None, stream: bool = False, dry_run: bool = False):
+        self.base_path = Path("markdown_files")
+        self.raw_input = Path("RawInput")
+        
+        # Initialize Azure OpenAI client
+        # Using the direct cognitive services endpoint you provided
+        # (any object exposing chat.completions.create can be passed instead)
+        self.client = client or AzureOpenAI(
+            azure_endpoint="https://grippy-resource.cognitiveservices.azure.com/",
+            api_version="2024-05-01-preview",
+            azure_ad_token_provider=get_bearer_token_provider(
+                DefaultAzureCredential(),
+                "https://cognitiveservices.azure.com/.default"
+            ),
+            max_retries=0  # Retries are handled by the request scheduler
+        )
+        self.max_concurrency = max(1, max_concurrency or MAX_CONCURRENCY)
+        
+        # Phase, conversion, LLM call and write telemetry (--profile)
+        self.profiler = BuildProfiler() if profile else None
+        
+        # Retries with backoff, adaptive concurrency and RPM/TPM pacing for all GPT calls
+        self.scheduler = RequestScheduler(self.max_concurrency, profiler=self.profiler)
+        
+        # Small/large deployment tiers for extraction (routing is off without a small deployment)
+        self.router = ModelRouter(EXTRACTION_MODEL, EXTRACTION_MAX_TOKENS,
+                                  small_model=SMALL_MODEL if small_model is None else small_model)
+        
+        # Worker processes for PDF/DOCX conversion (0 converts inline)
+        self.conversion_workers = CONVERSION_WORKERS if conversion_workers is None else conversion_workers
+        
+        # Extraction cache (refresh: ignore cached results but store new ones)
+        self.cache = ExtractionCache(read=not refresh_cache) if use_cache else None
+        
+        # Converted PDF/DOCX text, reused while the file and converter are unchanged
+        # (a dry run reads stored conversions but does not add any)
+        self.text_store = ConvertedTextStore(write=not dry_run) if use_cache else None
+        
+        # Staging store: per-document extraction results (reused for unchanged sources and
+        # after an interrupted build), staged entities for post-processing, page hashes.
+        # A dry run only looks up sources, so it opens the store read-only.
+        self.staging = StagingStore(self.base_path / ".hivemind_staging.db", read_only=dry_run)
+        self.incremental = incremental
+        
+        # Let GPT-4 decide ambiguous name matches during entity resolution
+        self.llm_adjudication = llm_adjudication
+        
+        # Pack short documents into shared extraction requests
+        self.pack = pack
+        
+        # Extract only one copy of near-duplicate documents
+        self.dedupe = dedupe
+        
+        # Stream completions; entity listeners get each entity as soon as it is generated,
+        # called as listener(source, category, entity) from extraction threads. A retried or
+        # escalated request may emit an entity again; the staged result is the final answer.
+        # The staging store keeps streamed entities as provisional rows until then.
+        self.stream = stream
+        self.entity_listeners: List[Callable[[str, str, Dict], None]] = []
+        if stream:
+            self.entity_listeners.append(self.staging.record_provisional)
+        
+        # Storage
+        self.extracted_entities = {
+            'people': [],
+            'organizations': [],
+            'technologies': [],
+            'topics': [],
+            'meetings': [],
+            'relationships': []
+        }
+        
+        self.stats = defaultdict(int)
+        self.stats_lock = threading.Lock()
+        self.failed_sources = []
+        self.indexes: Optional[EntityIndexes] = None
+        self.pending_pages: Dict[Path, tuple] = {}
+    
+    def count(self, key: str, amount: int = 1):
+        """Increment a stats counter (safe to call from extraction workers)"""
+        with self.stats_lock:
+            self.stats[key] += amount
+    
+    def start_phase(self, name: str):
+        """Start timing a build phase when profiling"""
+        if self.profiler:
+            self.profiler.start_phase(name)
+    
+    def adjudicate_names(self, pairs: List[tuple]) -> List[bool]:
+        """Ask GPT-4 whether each ambiguous pair of names refers to the same entity"""
+        system_prompt = """You are a taxonomy expert deduplicating entity names (technologies, organizations, topics).
+For each numbered pair decide whether both names refer to the same real-world entity
+(e.g. 'M365' = 'Microsoft 365', typos, abbreviations), not merely related ones ('Azure' != 'Azure DevOps').
+
+Return ONLY a JSON array of booleans, one per pair, in order."""
+        
+        user_prompt = "\n".join(f"{i}. {a} | {b}" for i, (a, b) in enumerate(pairs, 1))
+        
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4.1",  # Your deployment name
+            response = self.scheduler.call(
+                self.client.chat.completions.create,
+                phase='resolution',
+                estimated_tokens=estimate_tokens(system_prompt + user_prompt) + 200,
+                model=EXTRACTION_MODEL,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
-                temperature=0.1,
-                max_tokens=2000
+                temperature=0.0,
+                max_tokens=200
             )
             
-            result_text = response.choices[0].message.content.strip()
+            # A cut-off answer keeps the verdicts it completed; missing pairs stay separate
+            verdicts, _, _ = parse_response(response.choices[0].message.content or "", open_depth=1)
+            self.count('ai_adjudications')
+            verdicts = [bool(v) for v in verdicts][:len(pairs)] if isinstance(verdicts, list) else []
+            return verdicts + [False] * (len(pairs) - len(verdicts))
             
-            # Remove markdown code blocks if present
-            if result_text.startswith("```"):
-                result_text = result_text.split("```")[1]
-                if result_text.startswith("json"):
-                    result_text = result_text[4:]
-            
-            entities = json.loads(result_text)
-            self.stats['ai_extractions'] += 1
-            
-            # Store relationships
-            if 'relationships' in entities:
-                self.extracted_entities['relationships'].extend(entities.get('relationships', []))
-            
-            # Log what was extracted
-            extracted_summary = []
-            if entities.get('people'): extracted_summary.append(f"{len(entities['people'])} people")
-            if entities.get('organizations'): extracted_summary.append(f"{len(entities['organizations'])} orgs")
-            if entities.get('technologies'): extracted_summary.append(f"{len(entities['technologies'])} tech")
-            if entities.get('topics'): extracted_summary.append(f"{len(entities['topics'])} topics")
-            if entities.get('meetings'): extracted_summary.append(f"{len(entities['meetings'])} meetings")
-            if entities.get('relationships'): extracted_summary.append(f"{len(entities['relationships'])} relationships")
+        except Exception as e:
+            print(f"  ⚠️ Name adjudication failed: {e}, keeping names separate")
+            return [False] * len(pairs)
+    
+    def resolve_entities(self):
+        """Merge variant names of technologies, organizations and topics with local entity resolution"""
+        adjudicator = self.adjudicate_names if self.llm_adjudication else None
+        resolvers = {
+            'technologies': technology_resolver(adjudicator),
+            'organizations': organization_resolver(adjudicator),
+            'topics': topic_resolver(adjudicator)
+        }
+        
+        mapping = {}
+        for category, resolver in resolvers.items():
+            category_mapping = resolver.resolve(self.staging.mention_names(category))
+            self.staging.rename_mentions(category, category_mapping)
+            mapping.update(category_mapping)
             
-            if extracted_summary:
-                print(f"      ✓ Extracted: {', '.join(extracted_summary)}")
+            stats = resolver.stats
+            adjudicated = f", {stats['adjudicated_merges']} merged by GPT-4" if adjudicator else ""
+            print(f"  {category.capitalize()}: {stats['names']} names → {stats['entities']} entities "
+                  f"({stats['ambiguous_pairs']} ambiguous pairs{adjudicated})")
+        
+        # Keep references consistent with the canonical names
+        self.staging.rename_references(mapping)
+    
+    def apply_conversion(self, conversion: Dict) -> str:
+        """Print messages and count stats from a conversion result; return its text"""
+        for message in conversion['messages']:
+            print(message)
+        if conversion['stat']:
+            self.stats[conversion['stat']] += 1
+        return conversion['text']
+    
+    def extract_text_from_pdf(self, pdf_path: Path) -> str:
+        """Extract text from PDF file using markitdown or pypdf"""
+        return self.apply_conversion(convert_pdf(str(pdf_path)))
+    
+    def extract_text_from_docx(self, docx_path: Path) -> str:
+        """Extract text from DOCX file using markitdown"""
+        return self.apply_conversion(convert_docx(str(docx_path)))
+    
+    def request_extraction(self, user_prompt: str, tier: str, label: str, sources: List[str],
+                           max_tokens: Optional[int] = None, open_depth: int = 2):
+        """Send one extraction request to the tier's deployment; returns parse_response's
+        (value, complete, truncated path), salvaging what a cut-off answer completed
+
+        sources are the documents in the request (doc1..docN for a batch, open_depth 1).
+        When streaming, their entities are emitted as soon as each one closes.
+        """
+        max_tokens = max_tokens or self.router.max_tokens(tier)
+        streaming = {}
+        if self.stream:
+            # include_usage adds a final chunk with the token usage (otherwise missing when streaming)
+            streaming = {'stream': True, 'stream_options': {'include_usage': True},
+                         'consume': lambda stream: self.read_stream(stream, sources, batched=open_depth == 1)}
+        started = time.perf_counter()
+        try:
+            response = self.scheduler.call(
+                self.client.chat.completions.create,
+                phase='extraction',
+                estimated_tokens=estimate_tokens(EXTRACTION_SYSTEM_PROMPT + user_prompt) + max_tokens,
+                label=label,
+                **streaming,
+                model=self.router.model(tier),
+                messages=[
+                    {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=EXTRACTION_TEMPERATURE,
+                max_tokens=max_tokens
+            )
+        except Exception:
+            self.router.record_call(tier, time.perf_counter() - started, success=False)
+            raise
+        self.router.record_call(tier, time.perf_counter() - started, success=True)
+        self.count('ai_extractions')
+        
+        if self.stream:
+            return response.parser.result(open_depth)
+        return parse_response(response.choices[0].message.content or "", open_depth)
+    
+    def read_stream(self, stream, sources: List[str], batched: bool) -> SimpleNamespace:
+        """Feed a streamed completion to an incremental parser, emitting entities as they close"""
+        started = time.perf_counter()
+        documents = {document_id(position): source for position, source in enumerate(sources)}
+        first_entity = []
+        
+        def on_value(path: tuple, value):
+            # Entities are the items of {"people": [...]} (batched: {"doc1": {"people": [...]}})
+            if len(path) != (2 if batched else 1) or path[-1] not in STREAMED_CATEGORIES:
+                return
+            source = documents.get(path[0]) if batched else sources[0]
+            if source is None:
+                return
+            if not first_entity:
+                first_entity.append(time.perf_counter() - started)
+                if self.profiler:
+                    self.profiler.record_first_entity(first_entity[0])
+            self.emit_entity(source, path[-1], value)
+        
+        parser = IncrementalJSONParser(on_value)
+        usage = None
+        for chunk in stream:
+            usage = getattr(chunk, 'usage', None) or usage
+            for choice in chunk.choices:
+                if choice.delta and choice.delta.content:
+                    parser.feed(choice.delta.content)
+        return SimpleNamespace(parser=parser, usage=usage)
+    
+    def emit_entity(self, source: str, category: str, entity: Dict):
+        """Pass a streamed entity that passes the schema to the entity listeners"""
+        entity = check_entity(category, entity)
+        if entity is None:
+            return
+        self.count('entities_streamed')
+        for listener in self.entity_listeners:
+            listener(source, category, entity)
+    
+    def validated(self, entities: Dict) -> tuple:
+        """Entities repaired by the ontology schema, and the entities the schema dropped"""
+        entities, repairs = validate_extraction(entities)
+        if repairs:
+            self.count('schema_repairs', len(repairs))
+        return entities, [repair for repair in repairs if repair.endswith("(dropped)")]
+    
+    def extract_complete(self, user_prompt: str, tier: str, source_file: str) -> tuple:
+        """Validated entities of one extraction request, what validation dropped, and
+        whether the answer is complete
+
+        If the answer is cut off (or turns malformed), its completed entities are kept
+        and up to MAX_CONTINUATIONS follow-up requests ask only for the missing part.
+        """
+        raw, complete, truncated_at = self.request_extraction(user_prompt, tier, source_file, [source_file])
+        if not isinstance(raw, dict):
+            raise ValueError("answer is not a JSON object")
+        entities, dropped = self.validated(raw)
+        
+        complete_keys = set()
+        for continuation in range(MAX_CONTINUATIONS + 1):
+            open_key = truncated_at[0] if truncated_at else None
+            complete_keys.update(key for key in raw if key != open_key)
+            if complete:
+                break
+            self.count('truncated_responses')
+            if continuation == MAX_CONTINUATIONS:
+                print(f"      ⚠️ {Path(source_file).name}: answer still incomplete, keeping the entities received")
+                break
+            print(f"      ✂️ {Path(source_file).name}: answer cut off"
+                  f"{f' in {open_key}' if open_key else ''}, requesting the rest")
+            prompt = continuation_prompt(user_prompt, entities, complete_keys, open_key)
+            raw, complete, truncated_at = self.request_extraction(prompt, tier, f"{source_file} (continued)",
+                                                                  [source_file])
+            if not isinstance(raw, dict):
+                complete = False
+                break
+            more, more_dropped = self.validated(raw)
+            entities = merge_extractions([entities, more])
+            dropped += more_dropped
+            self.count('continuations')
+        return entities, dropped, complete
+    
+    def escalate(self, reason: str, source_file: str):
+        """Note that a small-tier result is being redone by the large model"""
+        self.router.record_escalation(reason)
+        self.count('tier_escalations')
+        print(f"      ↗️ Escalating {Path(source_file).name} to {self.router.model(LARGE)}: {reason}")
+    
+    def cache_keys(self, text: str, document_type: str, routed: str) -> List[str]:
+        """Extraction cache keys to look up for a chunk routed to a tier, in order
+
+        Results are stored under the model that produced them, so a small-tier route also
+        accepts the large model's answer (stored when a small-tier result was escalated).
+        """
+        tiers = (routed, LARGE) if routed == SMALL else (routed,)
+        keys = [ExtractionCache.make_key(text, document_type, EXTRACTION_SYSTEM_PROMPT,
+                                         self.router.model(tier), EXTRACTION_TEMPERATURE) for tier in tiers]
+        return list(dict.fromkeys(keys))
+    
+    def cached_extraction(self, text: str, document_type: str, routed: str) -> Optional[Dict]:
+        """Cached result of a chunk, counting the hit or miss"""
+        for key in self.cache_keys(text, document_type, routed):
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.count('cache_hits')
+                return cached
+        self.count('cache_misses')
+        return None
+    
+    def cache_extraction(self, text: str, document_type: str, tier: str, entities: Dict):
+        """Store a complete result under the model of the tier that produced it"""
+        self.cache.put(ExtractionCache.make_key(text, document_type, EXTRACTION_SYSTEM_PROMPT,
+                                                self.router.model(tier), EXTRACTION_TEMPERATURE), entities)
+    
+    def extract_entities_with_ai(self, text: str, source_file: str, document_type: str,
+                                 tier: Optional[str] = None) -> Dict:
+        """Use GPT-4 to extract structured entities from text (one chunk of a document)
+
+        The routing policy picks the tier; small-tier results that fail the structure
+        or confidence checks are redone by the large model. `tier` overrides the route.
+        """
+        routed = self.router.route(document_type, text)
+        tier = tier or routed
+        
+        # Serve unchanged documents from the extraction cache
+        if self.cache:
+            cached = self.cached_extraction(text, document_type, routed)
+            if cached is not None:
+                return cached
+        
+        user_prompt = extraction_prompt(text, source_file, document_type)
+
+        try:
+            entities = None
+            if tier == SMALL:
+                try:
+                    entities, dropped, complete = self.extract_complete(user_prompt, SMALL, source_file)
+                    problem = dropped[0] if dropped else check_extraction(entities, document_type, text)
+                except ValueError:
+                    problem = "invalid JSON"
+                except Exception as e:
+                    problem = f"request failed ({type(e).__name__})"
+                if problem:
+                    self.escalate(problem, source_file)
+                    entities = None
+            if entities is None:
+                tier = LARGE
+                entities, _, complete = self.extract_complete(user_prompt, LARGE, source_file)
             
+            # An answer still cut off after the continuations is used, but not cached
+            if self.cache and complete:
+                self.cache_extraction(text, document_type, tier, entities)
             return entities
             
         except Exception as e:
-            print(f"  ⚠️ AI extraction error: {e}")
-            self.stats['ai_errors'] += 1
-            return {'people': [], 'organizations': [], 'technologies': [], 'topics': [], 'meetings': []}
+            return self.extraction_error(e, Path(source_file).name)
+    
+    def extraction_error(self, error: Exception, label: str) -> Dict:
+        """Empty extraction result recording an error (the document is retried next build)"""
+        print(f"  ⚠️ AI extraction error ({label}): {error}")
+        self.count('ai_errors')
+        return {'people': [], 'organizations': [], 'technologies': [], 'topics': [], 'meetings': [], 'error': str(error)}
+    
+    def extract_batch_with_ai(self, documents: List[tuple]) -> List[Dict]:
+        """Extract entities from several short (text, source, document type) documents in one request
+
+        Cached documents are served from the cache; documents missing from the
+        batched answer (or all of them, if the request fails) are extracted one by one.
+        """
+        results = [None] * len(documents)
+        tiers = [self.router.route(document_type, text) for text, _, document_type in documents]
+        if self.cache:
+            for position, (text, source_file, document_type) in enumerate(documents):
+                results[position] = self.cached_extraction(text, document_type, tiers[position])
+        
+        pending = [position for position, result in enumerate(results) if result is None]
+        escalated = set()
+        if len(pending) > 1:
+            # The batch goes to the small tier only if every document in it would
+            tier = SMALL if all(tiers[p] == SMALL for p in pending) else LARGE
+            user_prompt = build_batch_prompt([documents[p] for p in pending])
+            try:
+                # A cut-off answer keeps the documents it completed; the rest are extracted one by one
+                data, complete, _ = self.request_extraction(user_prompt, tier, f"batch of {len(pending)}",
+                                                            [documents[p][1] for p in pending],
+                                                            max_tokens=batch_output_tokens(len(pending)),
+                                                            open_depth=1)
+                if not complete:
+                    self.count('truncated_responses')
+                batch_results = split_batch_result(data, len(pending))
+                self.count('batch_requests')
+                for position, result in zip(pending, batch_results):
+                    if result is None:
+                        continue
+                    if tier == SMALL:
+                        text, source_file, document_type = documents[position]
+                        problem = check_extraction(result, document_type, text)
+                        if problem:
+                            self.escalate(problem, source_file)
+                            escalated.add(position)
+                            continue
+                    result, _ = self.validated(result)
+                    results[position] = result
+                    self.count('batched_documents')
+                    if self.cache:
+                        self.cache_extraction(documents[position][0], documents[position][2], tier, result)
+                
+            except Exception as e:
+                print(f"  ⚠️ Batched extraction error ({len(pending)} documents): {e}, extracting them one by one")
+                self.count('batch_errors')
+        
+        # Fall back to one request per document for anything the batch did not return
+        for position, result in enumerate(results):
+            if result is None:
+                results[position] = self.extract_entities_with_ai(
+                    *documents[position], tier=LARGE if position in escalated else None)
+        return results
+    
+    def log_extraction_summary(self, entities: Dict):
+        """Print a one-line summary of what was extracted from a document"""
+        extracted_summary = []
+        if entities.get('people'): extracted_summary.append(f"{len(entities['people'])} people")
+        if entities.get('organizations'): extracted_summary.append(f"{len(entities['organizations'])} orgs")
+        if entities.get('technologies'): extracted_summary.append(f"{len(entities['technologies'])} tech")
+        if entities.get('topics'): extracted_summary.append(f"{len(entities['topics'])} topics")
+        if entities.get('meetings'): extracted_summary.append(f"{len(entities['meetings'])} meetings")
+        if entities.get('relationships'): extracted_summary.append(f"{len(entities['relationships'])} relationships")
+        
+        if extracted_summary:
+            print(f"      ✓ Extracted: {', '.join(extracted_summary)}")
+    
+    def make_job(self, file_path: Path, handler: str, document_type: str, text: str) -> Dict:
+        """Describe one document to extract; `handler` selects the store_* method"""
+        return {
+            'path': file_path,
+            'source': str(file_path),
+            'handler': handler,
+            'document_type': document_type,
+            'text': text,
+            'entities': None
+        }
+    
+    def prepare_linkedin_profile(self, job: Dict) -> bool:
+        """Prepare LinkedIn profile for AI extraction"""
+        job['document_type'] = "LinkedIn Profile"
+        return True
+    
+    def prepare_meeting_notes(self, job: Dict) -> bool:
+        """Prepare meeting notes for AI extraction"""
+        job['document_type'] = "Meeting Notes"
+        return True
+    
+    def prepare_pdf_document(self, job: Dict) -> bool:
+        """Prepare PDF for AI extraction"""
+        file_path, text = job['path'], job['text']
+        if not text:
+            return False
+        
+        print(f"    📄 Extracted {len(text)} characters from PDF: {file_path.name}")
+        
+        # Determine document type
+        if 'annual report' in file_path.name.lower():
+            job['document_type'] = "Annual Report"
+        elif 'plan' in file_path.name.lower():
+            job['document_type'] = "Strategic Plan"
+        else:
+            job['document_type'] = "Technical Document"
+        return True
+    
+    def prepare_docx_document(self, job: Dict) -> bool:
+        """Prepare DOCX for AI extraction"""
+        file_path, text = job['path'], job['text']
+        if not text or len(text) < 50:  # Skip if extraction failed or too short
+            print(f"    ⚠️ Skipped {file_path.name}: Insufficient content")
+            return False
+        
+        print(f"    📄 Extracted {len(text)} characters from DOCX: {file_path.name}")
+        
+        # Determine document type
+        if 'meeting' in file_path.name.lower() or 'transcript' in file_path.name.lower():
+            job['document_type'] = "Meeting Transcript"
+        elif 'decision' in file_path.name.lower() or 'key' in file_path.name.lower():
+            job['document_type'] = "Decision Makers List"
+        else:
+            job['document_type'] = "Document"
+        return True
     
-    def process_linkedin_profile(self, file_path: Path):
-        """Process LinkedIn profile with AI"""
-        content = file_path.read_text(encoding='utf-8')
+    def prepare_document(self, handler: str, file_path: Path) -> Dict:
+        """Reuse the staged extraction of an unchanged source, or queue it for conversion"""
+        self.staging.mark_seen(file_path)
+        if self.incremental:
+            entry = self.staging.unchanged_source(file_path)
+            if entry and entry['handler'] == handler:
+                self.stats['sources_unchanged'] += 1
+                job = self.make_job(file_path, handler, entry['document_type'], None)
+                job['entities'] = entry['entities']
+                job['signature'] = entry['signature']
+                job['reused'] = True
+                return job
+        
+        return self.make_job(file_path, handler, None, None)
+    
+    def collect_documents(self) -> List[Dict]:
+        """Scan RawInput once and create extraction jobs for all phases, in phase order"""
+        jobs = []
+        files, rejected = scan_raw_input(self.raw_input)
+        
+        for phase, handler in enumerate(HANDLER_REGISTRY, 1):
+            print(f"\n📋 Phase {phase}: Collecting {handler['label']}...")
+            handler_files = files[handler['name']]
+            print(f"  Found {len(handler_files)} {handler['label']}")
+            for file_path in rejected[handler['name']]:
+                print(f"  ⚠️ Skipped {file_path.name}: unrecognized content (encrypted or legacy format?)")
+            
+            if handler['available'] and not handler['available']():
+                # Staged extractions need no converter; other files are still marked seen, so
+                # their staged results are kept rather than retracted
+                print(f"  ⚠️ {handler['unavailable_message']}")
+                reused = [job for job in (self.prepare_document(handler['name'], file_path)
+                                          for file_path in handler_files) if job.get('reused')]
+                if reused:
+                    print(f"  ♻️ Reusing {len(reused)} staged {handler['label']}")
+                jobs.extend(reused)
+                continue
+            jobs.extend(self.prepare_document(handler['name'], file_path) for file_path in handler_files)
+        
+        return jobs
+    
+    def stored_conversion(self, job: Dict) -> Optional[Future]:
+        """Completed future with the stored converted text of a PDF/DOCX job, or None on a miss"""
+        if not self.text_store:
+            return None
+        started = time.perf_counter()
+        job['text_key'] = ConvertedTextStore.make_key(file_sha256(job['path']), job['handler'],
+                                                      converter_version(job['handler']))
+        conversion = self.text_store.get(job['text_key'])
+        if conversion is None:
+            self.count('text_store_misses')
+            return None
+        self.count('text_store_hits')
+        conversion['stored'] = True
+        conversion['seconds'] = time.perf_counter() - started
+        future = Future()
+        future.set_result(conversion)
+        return future
+    
+    def produce_conversions(self, pending: List[Dict], converted: queue.Queue, stop: threading.Event):
+        """Producer: convert PDF/DOCX in a process pool, feeding jobs to the extraction stage in order
+
+        The bounded queue provides backpressure: once it is full, no further conversions are
+        started until the extraction stage catches up, so memory stays bounded on big corpora.
+        When the extraction stage stops early (stop is set), queued conversions are cancelled.
+        """
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    converted.put(item, timeout=QUEUE_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        pool = None
+        try:
+            if self.conversion_workers > 0 and any(job['handler'] in CONVERTED_HANDLERS for job in pending):
+                pool = ProcessPoolExecutor(max_workers=self.conversion_workers)
+            for job in pending:
+                future = None
+                if job['handler'] in CONVERTED_HANDLERS:
+                    future = self.stored_conversion(job)
+                    if future is None and pool:
+                        future = pool.submit(convert_document, job['handler'], job['source'])
+                if not put((job, future)):
+                    break
+        finally:
+            put(None)
+            if pool:
+                pool.shutdown(wait=True, cancel_futures=stop.is_set())
+    
+    def near_duplicate_index(self, jobs: List[Dict]) -> NearDuplicateIndex:
+        """Index for near-duplicate detection, seeded with the unchanged documents' signatures
+
+        Representatives are unchanged documents first, then new documents in scan order.
+        """
+        near_duplicates = NearDuplicateIndex()
+        for job in jobs:
+            if job.get('reused') and job.get('signature'):
+                near_duplicates.add(job['source'], job['signature'])
+        return near_duplicates
+    
+    def converted_jobs(self, pending: List[Dict]):
+        """Yield pending jobs in order with their converted text, after their prepare_* method
+
+        job['prepared'] is False for documents the prepare_* method skipped, and for documents
+        whose conversion failed (job['conversion_error'] holds the error).
+        """
+        converted = queue.Queue(maxsize=CONVERSION_QUEUE_SIZE)
+        stop = threading.Event()
+        producer = threading.Thread(target=self.produce_conversions, args=(pending, converted, stop), daemon=True)
+        producer.start()
+        
+        try:
+            while (item := converted.get()) is not None:
+                job, future = item
+                try:
+                    conversion = future.result() if future else convert_document(job['handler'], job['source'])
+                except Exception as e:
+                    # A converter error or a crashed worker process (BrokenProcessPool) fails this document only
+                    print(f"  ⚠️ Conversion error ({job['path'].name}): {e!r}")
+                    self.count('conversion_errors')
+                    job['conversion_error'] = repr(e)
+                    job['prepared'] = False
+                    yield job
+                    continue
+                if job.get('text_key') and not conversion.get('stored') and conversion['stat'] in ('pdf_processed', 'docx_processed'):
+                    self.text_store.put(job['text_key'], conversion)
+                if self.profiler:
+                    self.profiler.record_conversion(job['source'], job['handler'], conversion['seconds'], len(conversion['text']))
+                job['conversion_seconds'] = conversion['seconds']
+                job['text'] = self.apply_conversion(conversion)
+                job['prepared'] = getattr(self, f"prepare_{job['handler']}")(job)
+                yield job
+        finally:
+            # Also reached when the consumer raises or stops early: stop the producer and
+            # cancel the conversions it queued instead of leaving it blocked on a full queue
+            stop.set()
+            producer.join()
+    
+    def extract_documents(self, jobs: List[Dict]) -> List[Dict]:
+        """Convert and extract all new/changed jobs; returns the jobs that were not skipped
+
+        Conversion runs in worker processes ahead of extraction (produce_conversions).
+        Converted text of unchanged files comes from the converted-text store.
+        Near-duplicates of a document already seen are linked to it instead of extracted.
+        Long documents are split into chunks (map); short single-chunk documents are packed
+        into shared requests when packing is on. All requests share one thread pool of
+        max_concurrency workers. Each document's chunk results are merged (reduce) as soon
+        as its last chunk completes, and the result is committed to the staging store,
+        so an interrupted build resumes where it stopped.
+        """
+        pending = [job for job in jobs if job['entities'] is None]
+        
+        # Bound queued chunk requests too, so converted text does not pile up in the executor
+        in_flight = threading.BoundedSemaphore(self.max_concurrency * 2)
+        chunk_futures = defaultdict(list)
+        skipped = set()
+        finish_lock = threading.Lock()
+        
+        near_duplicates = self.near_duplicate_index(jobs)
+        jobs_by_source = {job['source']: job for job in jobs}
+        
+        def extract(job: Dict, chunk: str) -> Dict:
+            try:
+                return self.extract_entities_with_ai(chunk, job['source'], job['document_type'])
+            finally:
+                in_flight.release()
+        
+        def extract_batch(batch: List[tuple], futures: List[Future]):
+            try:
+                results = self.extract_batch_with_ai([(chunk, job['source'], job['document_type']) for job, chunk in batch])
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+            except Exception as e:
+                # Every packed job must finish, so fail the futures the batch did not resolve
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                in_flight.release()
+        
+        def submit_batch(batch: List[tuple]):
+            # Each packed job waits on its own future, resolved when the batch returns
+            if not batch:
+                return
+            futures = [Future() for _ in batch]
+            in_flight.acquire()
+            executor.submit(extract_batch, batch, futures)
+            for (job, _), future in zip(batch, futures):
+                chunk_futures[id(job)].append(future)
+                future.add_done_callback(lambda _, job=job: chunk_done(job))
+        
+        packer = DocumentPacker()
+        
+        def chunk_done(job: Dict):
+            # Counts down the job's chunks (plus one for submission); the last one finishes the job
+            with finish_lock:
+                job['chunks_pending'] -= 1
+                if job['chunks_pending']:
+                    return
+            try:
+                self.finish_extraction(job, [chunk_result(job, f) for f in chunk_futures[id(job)]])
+            except Exception as e:
+                job['entities'] = self.extraction_error(e, job['path'].name)
+        
+        def chunk_result(job: Dict, future: Future) -> Dict:
+            # A request that raised counts as a failed extraction instead of being lost in a callback
+            error = future.exception()
+            if error is not None:
+                return self.extraction_error(error, job['path'].name)
+            return future.result()
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            for job in self.converted_jobs(pending):
+                if job.get('conversion_error'):
+                    job['entities'] = {'error': job['conversion_error']}
+                    self.staging.record_failure(job, job['conversion_error'])
+                if not job['prepared']:
+                    skipped.add(id(job))
+                    continue
+                
+                if self.dedupe:
+                    job['signature'] = minhash_signature(job['text'])
+                    match = near_duplicates.find(job['signature']) if job['signature'] else None
+                    if match:
+                        self.link_duplicate(job, jobs_by_source[match[0]], match[1])
+                        skipped.add(id(job))
+                        continue
+                    if job['signature']:
+                        near_duplicates.add(job['source'], job['signature'])
+                
+                chunks, dropped_tokens = split_into_chunks(job['text'])
+                job['chunk_count'] = len(chunks)
+                if dropped_tokens:
+                    print(f"  ⚠️ {job['path'].name}: token budget reached, ~{dropped_tokens} tokens not sent")
+                    self.stats['tokens_over_budget'] += dropped_tokens
+                self.count('chunks_extracted', len(chunks))
+                
+                job['chunks_pending'] = len(chunks) + 1
+                if self.pack and len(chunks) == 1 and packable(chunks[0]):
+                    submit_batch(packer.add((job, chunks[0]), chunks[0]))
+                else:
+                    for chunk in chunks:
+                        in_flight.acquire()
+                        future = executor.submit(extract, job, chunk)
+                        chunk_futures[id(job)].append(future)
+                        future.add_done_callback(lambda _, job=job: chunk_done(job))
+                chunk_done(job)
+                
+                # Converted text is only needed by the queued chunk requests
+                job['text'] = ""
+            submit_batch(packer.flush())
+        
+        # Failed conversions and extractions are retried on the next build
+        self.failed_sources.extend(job['source'] for job in pending
+                                   if job.get('conversion_error') or (id(job) not in skipped and 'error' in job['entities']))
+        
+        return [job for job in jobs if id(job) not in skipped]
+    
+    def link_duplicate(self, job: Dict, representative: Dict, similarity: float):
+        """Record a near-duplicate document as extra provenance of its representative"""
+        print(f"  🔁 {job['path'].name}: near-duplicate of {representative['path'].name} "
+              f"({similarity:.0%} similar), not extracted")
+        job['duplicate_of'] = representative['source']
+        job['entities'] = {}
+        representative.setdefault('duplicates', []).append(job['source'])
+        self.staging.record_duplicate(job)
+        self.count('near_duplicates')
+    
+    def finish_extraction(self, job: Dict, results: List[Dict]):
+        """Merge a job's chunk results and commit them to the staging store"""
+        job['entities'] = merge_extractions(results or [{}])
+        self.count('sources_extracted')
+        if 'error' in job['entities']:
+            self.staging.record_failure(job, job['entities']['error'])
+        else:
+            self.staging.record_source(job)
+    
+    def store_document_entities(self, job: Dict):
+        """Merge one job's extracted entities into extracted_entities and stage its contribution"""
+        entities = job['entities']
+        if job.get('reused'):
+            status = "Unchanged since last build"
+        elif job.get('chunk_count', 1) > 1:
+            status = f"Analyzed with GPT-4 in {job['chunk_count']} chunks"
+        else:
+            status = "Analyzed with GPT-4"
+        print(f"\n    🤖 {status}: {job['path'].name}")
+        self.log_extraction_summary(entities)
+        
+        before = {category: len(items) for category, items in self.extracted_entities.items()}
+        
+        # Store relationships
+        self.extracted_entities['relationships'].extend(entities.get('relationships', []))
         
-        print(f"\n    🤖 Analyzing with GPT-4: {file_path.name}")
-        entities = self.extract_entities_with_ai(content, str(file_path), "LinkedIn Profile")
+        getattr(self, f"store_{job['handler']}")(job, entities)
         
+        # Near-duplicate copies of this document are additional sources of its people and meetings
+        if job.get('duplicates'):
+            for category in ('people', 'meetings'):
+                for item in self.extracted_entities[category][before[category]:]:
+                    item['also_sources'] = job['duplicates']
+        
+        self.staging.stage_contribution(job['source'], {
+            category: items[before[category]:] for category, items in self.extracted_entities.items()
+        })
+    
+    def store_linkedin_profile(self, job: Dict, entities: Dict):
+        """Store entities extracted from a LinkedIn profile"""
         # Store extracted people
         for person in entities.get('people', []):
-            person['source'] = str(file_path)
+            person['source'] = job['source']
             person['type'] = 'linkedin-profile'
             self.extracted_entities['people'].append(person)
             print(f"      👤 {person.get('name', 'Unknown')} - {person.get('role', 'Unknown Role')}")
@@ -332,16 +970,11 @@ Extract all relevant entities following the HiveMind ontology."""
         self.extracted_entities['organizations'].extend(entities.get('organizations', []))
         self.extracted_entities['technologies'].extend(entities.get('technologies', []))
     
-    def process_meeting_notes(self, file_path: Path):
-        """Process meeting notes with AI"""
-        content = file_path.read_text(encoding='utf-8')
-        
-        print(f"\n    🤖 Analyzing with GPT-4: {file_path.name}")
-        entities = self.extract_entities_with_ai(content, str(file_path), "Meeting Notes")
-        
+    def store_meeting_notes(self, job: Dict, entities: Dict):
+        """Store entities extracted from meeting notes"""
         # Store meetings
         for meeting in entities.get('meetings', []):
-            meeting['source'] = str(file_path)
+            meeting['source'] = job['source']
             self.extracted_entities['meetings'].append(meeting)
             print(f"      📅 {meeting.get('title', 'Meeting')} ({meeting.get('date', 'Unknown date')})")
         
@@ -349,67 +982,31 @@ Extract all relevant entities following the HiveMind ontology."""
         self.extracted_entities['topics'].extend(entities.get('topics', []))
         self.extracted_entities['technologies'].extend(entities.get('technologies', []))
     
-    def process_pdf_document(self, file_path: Path):
-        """Process PDF with AI"""
-        text = self.extract_text_from_pdf(file_path)
-        if not text:
-            return
-        
-        print(f"\n    🤖 Analyzing with GPT-4: {file_path.name}")
-        print(f"      📄 Extracted {len(text)} characters from PDF")
-        
-        # Determine document type
-        if 'annual report' in file_path.name.lower():
-            doc_type = "Annual Report"
-        elif 'plan' in file_path.name.lower():
-            doc_type = "Strategic Plan"
-        else:
-            doc_type = "Technical Document"
-        
-        entities = self.extract_entities_with_ai(text, str(file_path), doc_type)
-        
-        # Store entities
+    def store_pdf_document(self, job: Dict, entities: Dict):
+        """Store entities extracted from a PDF"""
         self.extracted_entities['organizations'].extend(entities.get('organizations', []))
         self.extracted_entities['technologies'].extend(entities.get('technologies', []))
         self.extracted_entities['topics'].extend(entities.get('topics', []))
     
-    def process_docx_document(self, file_path: Path):
-        """Process DOCX with AI"""
-        print(f"\n    🤖 Analyzing with GPT-4: {file_path.name}")
-        text = self.extract_text_from_docx(file_path)
-        if not text or len(text) < 50:  # Skip if extraction failed or too short
-            print(f"      ⚠️ Skipped: Insufficient content")
-            return
-        
-        print(f"      📄 Extracted {len(text)} characters from DOCX")
-        
-        # Determine document type
-        if 'meeting' in file_path.name.lower() or 'transcript' in file_path.name.lower():
-            doc_type = "Meeting Transcript"
-            entities = self.extract_entities_with_ai(text, str(file_path), doc_type)
-            
+    def store_docx_document(self, job: Dict, entities: Dict):
+        """Store entities extracted from a DOCX"""
+        if job['document_type'] == "Meeting Transcript":
             # Store meetings
             for meeting in entities.get('meetings', []):
-                meeting['source'] = str(file_path)
+                meeting['source'] = job['source']
                 self.extracted_entities['meetings'].append(meeting)
             
             # Store topics and technologies
             self.extracted_entities['topics'].extend(entities.get('topics', []))
             self.extracted_entities['technologies'].extend(entities.get('technologies', []))
             
-        elif 'decision' in file_path.name.lower() or 'key' in file_path.name.lower():
-            doc_type = "Decision Makers List"
-            entities = self.extract_entities_with_ai(text, str(file_path), doc_type)
-            
+        elif job['document_type'] == "Decision Makers List":
             # Store people as mentioned (not as full profiles)
             # Store organizations and technologies
             self.extracted_entities['organizations'].extend(entities.get('organizations', []))
             self.extracted_entities['technologies'].extend(entities.get('technologies', []))
         
         else:
-            doc_type = "Document"
-            entities = self.extract_entities_with_ai(text, str(file_path), doc_type)
-            
             # Store all entities
             self.extracted_entities['organizations'].extend(entities.get('organizations', []))
             self.extracted_entities['technologies'].extend(entities.get('technologies', []))
@@ -417,28 +1014,61 @@ Extract all relevant entities following the HiveMind ontology."""
     
     def normalize_name(self, name: str) -> str:
         """Convert name to filename-safe format"""
-        import re
         return re.sub(r'[^\w\s-]', '', name.lower()).replace(' ', '-').strip('-')
     
-    def normalize_tech_name(self, name: str) -> str:
-        """Normalize technology names to consolidate duplicates"""
-        # Common normalization rules
-        replacements = {
-            'M365': 'Microsoft 365',
-            'Enter ID': 'Entra ID',
-            'Windows 65': 'Windows 365',
-            'Copilot Chat': 'Microsoft Copilot',
-            'M365 Copilot': 'Microsoft Copilot',
-            'Azure AI Studio': 'Azure AI',
-            'Azure Machine Learning Workspace': 'Azure Machine Learning',
-        }
-        return replacements.get(name, name)
+    def page_created(self, file_path: Path) -> str:
+        """Creation date for a page: kept from the staging store or the existing file, else today"""
+        created = self.staging.page_created(file_path)
+        if not self.staging.has_page(file_path) and file_path.exists():
+            match = re.search(r'^created: (\S+)$', file_path.read_text(encoding='utf-8'), re.MULTILINE)
+            if match:
+                created = match.group(1)
+        return created
+    
+    def write_page(self, file_path: Path, content: str, created: str):
+        """Queue a rendered page; pages are written by flush_pages (last render of a path wins)"""
+        self.pending_pages[file_path] = (content, created)
+    
+    def emit_page(self, file_path: Path, data: bytes) -> bool:
+        """Write a page atomically unless the file already has identical content"""
+        if file_path.exists() and file_path.stat().st_size == len(data) and file_path.read_bytes() == data:
+            return False
+        
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        # Temp file + rename: a crash never leaves a half-written page
+        tmp_path = file_path.with_name(f".{file_path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, file_path)
+        return True
+    
+    def flush_pages(self):
+        """Write all queued pages in parallel; emit_page skips pages whose file content is identical
+
+        Pages are compared with the file on disk rather than a stored hash, so a page edited or
+        deleted by hand since the last build is rewritten.
+        """
+        pending = [(file_path, content.encode('utf-8'), created)
+                   for file_path, (content, created) in self.pending_pages.items()]
+        self.pending_pages = {}
+        
+        with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as executor:
+            written = executor.map(lambda page: self.emit_page(page[0], page[1]), pending)
+            for (file_path, data, created), was_written in zip(pending, written):
+                if was_written:
+                    self.stats['pages_written'] += 1
+                    if self.profiler:
+                        self.profiler.record_write(len(data))
+                else:
+                    self.stats['pages_unchanged'] += 1
+        self.staging.record_pages((file_path, hashlib.sha256(data).hexdigest(), created)
+                                  for file_path, data, created in pending)
     
     def generate_person_file(self, person_data: Dict):
         """Generate person entity file"""
         name = person_data['name']
         normalized_name = self.normalize_name(name)
         file_path = self.base_path / "entities" / "people" / f"{normalized_name}.md"
+        created = self.page_created(file_path)
         
         # Find relationships for this person
         person_relationships = {
@@ -446,11 +1076,10 @@ Extract all relevant entities following the HiveMind ontology."""
             'attended': [],
             'mentioned_with': []
         }
-        for rel in self.extracted_entities['relationships']:
-            if rel.get('source', '').lower() == name.lower():
-                rel_type = rel.get('type', '')
-                if rel_type in person_relationships:
-                    person_relationships[rel_type].append(rel.get('target', ''))
+        for rel in self.indexes.relationships_from(name):
+            rel_type = rel.get('type', '')
+            if rel_type in person_relationships:
+                person_relationships[rel_type].append(rel.get('target', ''))
         
         skills_text = "\n".join([f"- {skill}" for skill in person_data.get('skills', [])])
         
@@ -463,6 +1092,8 @@ Extract all relevant entities following the HiveMind ontology."""
             if person_relationships['attended']:
                 relationships_yaml += f"  attended: {person_relationships['attended']}\n"
         
+        also_sources_yaml = f"also_sources: {person_data['also_sources']}\n" if person_data.get('also_sources') else ""
+        
         content = f"""---
 type: person
 name: {name}
@@ -471,7 +1102,7 @@ organization: {person_data.get('company', 'Unknown')}
 location: {person_data.get('location', 'Unknown')}
 tags: [linkedin-profile, {self.normalize_name(person_data.get('company', ''))}]
 {relationships_yaml}source: {person_data.get('source', '')}
-created: {datetime.now().strftime('%Y-%m-%d')}
+{also_sources_yaml}created: {created}
 ---
 
 # {name}
@@ -488,26 +1119,21 @@ created: {datetime.now().strftime('%Y-%m-%d')}
 - Organization: [[{self.normalize_name(person_data.get('company', ''))}|{person_data.get('company', '')}]]
 """
         
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        file_path.write_text(content, encoding='utf-8')
+        self.write_page(file_path, content, created)
         self.stats['people_generated'] += 1
     
     def generate_organization_file(self, org_name: str):
         """Generate organization entity file"""
         normalized_name = self.normalize_name(org_name)
         file_path = self.base_path / "entities" / "organizations" / f"{normalized_name}.md"
+        created = self.page_created(file_path)
         
         # Find people from this org
-        people_links = []
-        for person in self.extracted_entities['people']:
-            if person.get('company', '').lower() == org_name.lower():
-                people_links.append(f"- [[{self.normalize_name(person['name'])}|{person['name']}]]")
+        org_people = self.indexes.people_at(org_name)
+        people_links = [f"- [[{self.normalize_name(person['name'])}|{person['name']}]]" for person in org_people]
         
         # Find technologies used by this org
-        org_technologies = []
-        for rel in self.extracted_entities['relationships']:
-            if rel.get('type') == 'uses' and rel.get('source', '').lower() == org_name.lower():
-                org_technologies.append(rel.get('target', ''))
+        org_technologies = [rel.get('target', '') for rel in self.indexes.relationships_from(org_name, 'uses')]
         
         people_section = "\n".join(people_links) if people_links else "- (None listed)"
         
@@ -516,7 +1142,7 @@ created: {datetime.now().strftime('%Y-%m-%d')}
         if people_links or org_technologies:
             relationships_yaml = "relationships:\n"
             if people_links:
-                employee_names = [p.get('name') for p in self.extracted_entities['people'] if p.get('company', '').lower() == org_name.lower()]
+                employee_names = [p.get('name') for p in org_people]
                 relationships_yaml += f"  employs: {employee_names}\n"
             if org_technologies:
                 relationships_yaml += f"  uses_technologies: {org_technologies}\n"
@@ -525,7 +1151,7 @@ created: {datetime.now().strftime('%Y-%m-%d')}
 type: organization
 name: {org_name}
 tags: [organization]
-{relationships_yaml}created: {datetime.now().strftime('%Y-%m-%d')}
+{relationships_yaml}created: {created}
 ---
 
 # {org_name}
@@ -540,24 +1166,23 @@ tags: [organization]
 """
         
         # Add technology links
-        unique_techs = set(self.extracted_entities['technologies'])
-        for tech in sorted(unique_techs):
+        for tech in self.indexes.sorted_technologies:
             content += f"- [[{self.normalize_name(tech)}|{tech}]]\n"
         
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        file_path.write_text(content, encoding='utf-8')
+        self.write_page(file_path, content, created)
         self.stats['orgs_generated'] += 1
     
     def generate_technology_file(self, tech_name: str):
         """Generate technology entity file"""
         normalized_name = self.normalize_name(tech_name)
         file_path = self.base_path / "entities" / "technologies" / f"{normalized_name}.md"
+        created = self.page_created(file_path)
         
         content = f"""---
 type: technology
 name: {tech_name}
 tags: [technology]
-created: {datetime.now().strftime('%Y-%m-%d')}
+created: {created}
 ---
 
 # {tech_name}
@@ -569,32 +1194,23 @@ created: {datetime.now().strftime('%Y-%m-%d')}
 """
         
         # Link to people with this skill
-        for person in self.extracted_entities['people']:
-            skills = person.get('skills', [])
-            if any(tech_name.lower() in skill.lower() for skill in skills):
-                content += f"- [[{self.normalize_name(person['name'])}|{person['name']}]]\n"
+        for person in self.indexes.people_with_skill(tech_name):
+            content += f"- [[{self.normalize_name(person['name'])}|{person['name']}]]\n"
         
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        file_path.write_text(content, encoding='utf-8')
+        self.write_page(file_path, content, created)
         self.stats['tech_generated'] += 1
     
     def generate_topic_file(self, topic_name: str):
         """Generate topic entity file"""
         normalized_name = self.normalize_name(topic_name)
         file_path = self.base_path / "entities" / "topics" / f"{normalized_name}.md"
+        created = self.page_created(file_path)
         
         # Find related meetings
-        related_meetings = []
-        for meeting in self.extracted_entities['meetings']:
-            meeting_topics = [t.lower() for t in meeting.get('topics', [])]
-            if topic_name.lower() in meeting_topics or any(topic_name.lower() in t for t in meeting_topics):
-                related_meetings.append(meeting.get('title', 'Unknown Meeting'))
+        related_meetings = [meeting.get('title', 'Unknown Meeting') for meeting in self.indexes.meetings_for_topic(topic_name)]
         
         # Find related technologies
-        related_techs = []
-        for tech in self.extracted_entities['technologies']:
-            if topic_name.lower() in tech.lower() or tech.lower() in topic_name.lower():
-                related_techs.append(tech)
+        related_techs = self.indexes.technologies_related_to(topic_name)
         
         meetings_section = "\n".join([f"- [[{self.normalize_name(m)}|{m}]]" for m in related_meetings]) if related_meetings else "- (None identified)"
         techs_section = "\n".join([f"- [[{self.normalize_name(t)}|{t}]]" for t in related_techs[:10]]) if related_techs else "- (None identified)"
@@ -605,7 +1221,7 @@ name: {topic_name}
 category: Strategic Initiative
 status: Active
 tags: [topic, strategic]
-created: {datetime.now().strftime('%Y-%m-%d')}
+created: {created}
 ---
 
 # {topic_name}
@@ -620,8 +1236,7 @@ Strategic topic or initiative identified in HiveMind knowledge base.
 {techs_section}
 """
         
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        file_path.write_text(content, encoding='utf-8')
+        self.write_page(file_path, content, created)
         self.stats['topics_generated'] += 1
     
     def generate_meeting_file(self, meeting_data: Dict):
@@ -629,12 +1244,15 @@ Strategic topic or initiative identified in HiveMind knowledge base.
         title = meeting_data.get('title', 'Unknown Meeting')
         normalized_title = self.normalize_name(title[:50])
         file_path = self.base_path / "events" / "meetings" / f"{normalized_title}.md"
+        created = self.page_created(file_path)
         
         # Use resolved attendees if available
         attendees = meeting_data.get('attendees_resolved', meeting_data.get('attendees', []))
         attendees_text = "\n".join([f"- {att}" for att in attendees])
         topics_text = "\n".join([f"- {topic}" for topic in meeting_data.get('topics', [])])
         
+        also_sources_yaml = f"also_sources: {meeting_data['also_sources']}\n" if meeting_data.get('also_sources') else ""
+        
         content = f"""---
 type: meeting
 title: {title}
@@ -642,7 +1260,7 @@ date: {meeting_data.get('date', 'Unknown')}
 attendees: {attendees}
 tags: [meeting]
 source: {meeting_data.get('source', '')}
-created: {datetime.now().strftime('%Y-%m-%d')}
+{also_sources_yaml}created: {created}
 ---
 
 # {title}
@@ -656,10 +1274,87 @@ created: {datetime.now().strftime('%Y-%m-%d')}
 {topics_text}
 """
         
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        file_path.write_text(content, encoding='utf-8')
+        self.write_page(file_path, content, created)
         self.stats['meetings_generated'] += 1
     
+    def plan_request(self, estimate: BuildEstimate, text: str, source_file: str, document_type: str):
+        """Add the single-document request extract_entities_with_ai would send (or a cache hit)"""
+        tier = self.router.route(document_type, text)
+        if self.cache and any(map(self.cache.contains, self.cache_keys(text, document_type, tier))):
+            estimate.count('cached')
+            return
+        prompt_tokens = count_tokens(EXTRACTION_SYSTEM_PROMPT) + count_tokens(extraction_prompt(text, source_file, document_type))
+        estimate.add_request(tier, prompt_tokens, self.router.max_tokens(tier))
+    
+    def plan_batch(self, estimate: BuildEstimate, documents: List[tuple]):
+        """Add the request extract_batch_with_ai would send for packed (text, source, document type) documents"""
+        pending = []
+        for text, source_file, document_type in documents:
+            tier = self.router.route(document_type, text)
+            if self.cache and any(map(self.cache.contains, self.cache_keys(text, document_type, tier))):
+                estimate.count('cached')
+            else:
+                pending.append((text, source_file, document_type, tier))
+        if len(pending) == 1:
+            text, source_file, document_type, tier = pending[0]
+            estimate.add_request(tier, count_tokens(EXTRACTION_SYSTEM_PROMPT) +
+                                 count_tokens(extraction_prompt(text, source_file, document_type)),
+                                 self.router.max_tokens(tier))
+        elif pending:
+            tier = SMALL if all(document[3] == SMALL for document in pending) else LARGE
+            user_prompt = build_batch_prompt([document[:3] for document in pending])
+            estimate.add_request(tier, count_tokens(EXTRACTION_SYSTEM_PROMPT) + count_tokens(user_prompt),
+                                 batch_output_tokens(len(pending)), documents=len(pending))
+    
+    def dry_run(self):
+        """Scan and convert RawInput and project the calls, tokens and time of a build, without calling GPT
+
+        Create the builder with dry_run=True, so the staging store and converted-text store are not written.
+        """
+        print("🧮 HiveMind Knowledge Builder - dry run (no GPT calls, no pages written)")
+        print("=" * 60)
+        
+        jobs = self.collect_documents()
+        pending = [job for job in jobs if job['entities'] is None]
+        print(f"\n🔎 Converting and chunking {len(pending)} new/changed documents "
+              f"({len(jobs) - len(pending)} unchanged)...")
+        
+        estimate = BuildEstimate(self.max_concurrency, calibration=calibrate(latest_profile()))
+        estimate.count('unchanged', len(jobs) - len(pending))
+        near_duplicates = self.near_duplicate_index(jobs)
+        packer = DocumentPacker()
+        
+        for job in self.converted_jobs(pending):
+            estimate.conversion_seconds += job['conversion_seconds']
+            if not job['prepared']:
+                estimate.count('skipped')
+                continue
+            if self.dedupe:
+                signature = minhash_signature(job['text'])
+                if signature and near_duplicates.find(signature):
+                    estimate.count('near_duplicates')
+                    continue
+                if signature:
+                    near_duplicates.add(job['source'], signature)
+            
+            estimate.count('documents')
+            chunks, dropped_tokens = split_into_chunks(job['text'])
+            estimate.count('chunks', len(chunks))
+            estimate.count('tokens_over_budget', dropped_tokens)
+            if self.pack and len(chunks) == 1 and packable(chunks[0]):
+                batch = packer.add((chunks[0], job['source'], job['document_type']), chunks[0])
+                if batch:
+                    self.plan_batch(estimate, batch)
+            else:
+                for chunk in chunks:
+                    self.plan_request(estimate, chunk, job['source'], job['document_type'])
+            job['text'] = ""
+        self.plan_batch(estimate, packer.flush())
+        
+        print(f"\n📈 Projected Build:")
+        print(estimate.summary())
+        return estimate.projection()
+    
     def build(self):
         """Main build process using AI"""
         print("🚀 AI-Powered HiveMind Knowledge Builder")
@@ -676,87 +1371,63 @@ created: {datetime.now().strftime('%Y-%m-%d')}
         
         print("=" * 60)
         
-        # Phase 1: LinkedIn profiles
-        print("\n📋 Phase 1: AI Analysis of LinkedIn Profiles...")
-        linkedin_dir = self.raw_input / "LinkedIn" / "Markdown (enhanced for AI interpretation)"
-        if linkedin_dir.exists():
-            md_files = list(linkedin_dir.glob("*.md"))
-            print(f"  Found {len(md_files)} LinkedIn profiles")
-            for file_path in md_files:
-                self.process_linkedin_profile(file_path)
-        
-        # Phase 2: Meeting notes
-        print("\n📋 Phase 2: AI Analysis of Meeting Notes...")
-        meeting_dirs = [
-            self.raw_input / "Internal Account Discussions",
-            self.raw_input / "NNR meeting"
-        ]
-        total_meetings = 0
-        for meeting_dir in meeting_dirs:
-            if meeting_dir.exists():
-                md_files = list(meeting_dir.glob("*.md"))
-                total_meetings += len(md_files)
-                for file_path in md_files:
-                    self.process_meeting_notes(file_path)
-        print(f"  Processed {total_meetings} meeting files")
-        
-        # Phase 3: PDFs
-        print("\n📋 Phase 3: AI Analysis of PDF Documents...")
-        pdf_files = list(self.raw_input.rglob("*.pdf"))
-        # Filter to strategic docs only (avoid LinkedIn PDFs)
-        strategic_pdfs = [p for p in pdf_files if 'AI Plan' in p.name or 'Annual Report' in p.name.lower()]
-        print(f"  Found {len(strategic_pdfs)} strategic PDF documents")
-        
-        for file_path in strategic_pdfs:
-            self.process_pdf_document(file_path)
-        
-        # Phase 4: DOCX files (meeting transcripts, decision maker lists)
-        print("\n📋 Phase 4: AI Analysis of DOCX Documents...")
-        docx_files = list(self.raw_input.rglob("*.docx"))
-        print(f"  Found {len(docx_files)} DOCX files")
-        
-        if markitdown_converter:
-            for file_path in docx_files:
-                print(f"    🤖 Analyzing with GPT-4: {file_path.name}")
-                self.process_docx_document(file_path)
-        else:
-            print("  ⚠️ markitdown not installed - install with: pip install markitdown")
-        
-        # Deduplicate entities
+        # Collection phases (one per document handler), then extract new/changed documents concurrently
+        self.start_phase('collection')
+        jobs = self.collect_documents()
+        
+        retracted = self.staging.retract_deleted_sources()
+        for source in retracted:
+            print(f"  🗑️ Retracted entities from deleted source: {source}")
+        
+        pending = sum(1 for job in jobs if job['entities'] is None)
+        print(f"\n🤖 Extracting entities from {pending} new/changed documents with GPT-4 "
+              f"({len(jobs) - pending} unchanged, concurrency: {self.max_concurrency})...")
+        self.start_phase('extraction')
+        jobs = self.extract_documents(jobs)
+        self.staging.save()
+        if self.text_store:
+            self.text_store.save()
+        
+        # Stage in collection order so output does not depend on completion order
+        self.start_phase('staging')
+        self.staging.reset_entities()
+        for job in jobs:
+            self.store_document_entities(job)
+        
+        # Resolve name variants, then deduplicate entities
         print("\n📊 Deduplicating and consolidating entities...")
-        org_before = len(self.extracted_entities['organizations'])
-        tech_before = len(self.extracted_entities['technologies'])
-        topics_before = len(self.extracted_entities['topics'])
+        self.start_phase('resolution')
+        self.resolve_entities()
+        self.start_phase('post-processing')
+        
+        org_before = self.staging.count_mentions('organizations')
+        tech_before = self.staging.count_mentions('technologies')
+        topics_before = self.staging.count_mentions('topics')
         
-        self.extracted_entities['organizations'] = list(set(self.extracted_entities['organizations']))
-        self.extracted_entities['technologies'] = list(set(self.extracted_entities['technologies']))
-        self.extracted_entities['topics'] = list(set(self.extracted_entities['topics']))
+        # GROUP BY in first-mention order, so output is stable across runs
+        self.extracted_entities['organizations'] = self.staging.distinct_names('organizations')
+        self.extracted_entities['technologies'] = self.staging.distinct_names('technologies')
+        self.extracted_entities['topics'] = self.staging.distinct_names('topics')
         
         print(f"  Organizations: {org_before} → {len(self.extracted_entities['organizations'])} (-{org_before - len(self.extracted_entities['organizations'])} duplicates)")
         print(f"  Technologies: {tech_before} → {len(self.extracted_entities['technologies'])} (-{tech_before - len(self.extracted_entities['technologies'])} duplicates)")
         print(f"  Topics: {topics_before} → {len(self.extracted_entities['topics'])} (-{topics_before - len(self.extracted_entities['topics'])} duplicates)")
         
-        # Apply MIN_MENTIONS threshold to technologies
+        # Apply MIN_MENTIONS threshold to technologies (counted over all mentions, before dedup)
         MIN_MENTIONS = 2
-        tech_counts = {}
-        for tech in self.extracted_entities['technologies']:
-            tech_counts[tech] = tech_counts.get(tech, 0) + 1
-        
         tech_before_filter = len(self.extracted_entities['technologies'])
-        self.extracted_entities['technologies'] = [
-            tech for tech in self.extracted_entities['technologies'] 
-            if tech_counts.get(tech, 0) >= MIN_MENTIONS or tech.lower() in ['azure', 'microsoft copilot', 'dynamics 365', 'power bi', 'databricks']
-        ]
+        self.extracted_entities['technologies'] = self.staging.distinct_names(
+            'technologies', min_mentions=MIN_MENTIONS,
+            always_keep=['azure', 'microsoft copilot', 'dynamics 365', 'power bi', 'databricks']
+        )
         print(f"  Technology filter (MIN_MENTIONS={MIN_MENTIONS}): {tech_before_filter} → {len(self.extracted_entities['technologies'])} technologies")
         
-        # Consolidate technologies with GPT-4
-        consolidated_tech = self.consolidate_technologies()
-        if consolidated_tech:
-            self.extracted_entities['technologies'] = consolidated_tech
-        
         # Resolve meeting attendees
         print("\n👥 Resolving meeting attendees...")
-        self.resolve_attendees()
+        self.staging.resolve_attendees()
+        self.extracted_entities['people'] = self.staging.people()
+        self.extracted_entities['meetings'] = self.staging.meetings()
+        self.extracted_entities['relationships'] = self.staging.relationships()
         resolved_count = sum(1 for m in self.extracted_entities['meetings'] if m.get('attendees_resolved'))
         print(f"  ✓ Resolved attendees in {resolved_count} meetings")
         
@@ -770,11 +1441,33 @@ created: {datetime.now().strftime('%Y-%m-%d')}
         print(f"  Meetings: {len(self.extracted_entities['meetings'])}")
         print(f"  Relationships: {len(self.extracted_entities['relationships'])}")
         print(f"  AI Calls: {self.stats['ai_extractions']} (Errors: {self.stats['ai_errors']})")
-        
-        # Phase 5: Generate files
-        print("\n📝 Phase 5: Generating Knowledge Base Files...")
+        print(f"  Chunks: {self.stats['chunks_extracted']} (~{self.stats['tokens_over_budget']} tokens over budget)")
+        if self.stats['near_duplicates']:
+            print(f"  Near-duplicates: {self.stats['near_duplicates']} documents linked to a representative, not extracted")
+        if self.pack:
+            print(f"  Packed: {self.stats['batched_documents']} documents in {self.stats['batch_requests']} requests "
+                  f"({self.stats['batch_errors']} batch errors)")
+        if self.stream:
+            print(f"  Streamed: {self.stats['entities_streamed']} entities staged provisionally as they arrived")
+        if self.stats['conversion_errors']:
+            print(f"  Conversion Errors: {self.stats['conversion_errors']}")
+        if self.failed_sources:
+            print(f"  ⚠️ {len(self.failed_sources)} documents failed conversion or extraction (retried next build):")
+            for source in self.failed_sources:
+                print(f"    - {source}")
+        if self.cache:
+            print(f"  Extraction Cache: {self.stats['cache_hits']} hits, {self.stats['cache_misses']} misses")
+        if self.text_store:
+            print(f"  Converted Text Store: {self.stats['text_store_hits']} hits, {self.stats['text_store_misses']} misses")
+        
+        # Final phase: generate files
+        print(f"\n📝 Phase {len(HANDLER_REGISTRY) + 1}: Generating Knowledge Base Files...")
         print("=" * 60)
         
+        # Index relationships and memberships once; generators look up their neighbours
+        self.start_phase('generation')
+        self.indexes = EntityIndexes(self.extracted_entities)
+        
         print(f"\n  👥 Creating {len(self.extracted_entities['people'])} people files...")
         for person in self.extracted_entities['people']:
             self.generate_person_file(person)
@@ -808,12 +1501,35 @@ created: {datetime.now().strftime('%Y-%m-%d')}
                 self.generate_topic_file(topic)
                 print(f"    ✓ {topic}")
         
+        print(f"\n  💾 Writing {len(self.pending_pages)} pages...")
+        self.start_phase('writing')
+        self.flush_pages()
+        print(f"    ✓ {self.stats['pages_written']} written, {self.stats['pages_unchanged']} unchanged")
+        
+        # Remove pages of entities that no longer exist (e.g. from deleted sources)
+        self.start_phase('cleanup')
+        for page in self.staging.stale_pages():
+            page_path = Path(page)
+            if page_path.exists():
+                page_path.unlink()
+                self.stats['pages_removed'] += 1
+        self.staging.save()
+        
+        # Entities, relationships and full-text index queried by knowledge_tools.py
+        database_counts = None
+        if FTS5_AVAILABLE:
+            self.start_phase('indexing')
+            knowledge_db = KnowledgeDatabase(self.base_path / DATABASE_NAME)
+            database_counts = knowledge_db.sync(self.base_path, self.extracted_entities['relationships'])
+            knowledge_db.close()
+        
         # Calculate statistics
         from collections import Counter
         all_techs_raw = []
         for meeting in self.extracted_entities['meetings']:
             all_techs_raw.extend(meeting.get('topics', []))
-        tech_counter = Counter(self.extracted_entities['technologies'])
+        mention_counts = self.staging.mention_counts('technologies')
+        tech_counter = Counter({tech: mention_counts.get(tech, 0) for tech in self.extracted_entities['technologies']})
         
         # Final summary
         print("\n" + "=" * 60)
@@ -823,6 +1539,16 @@ created: {datetime.now().strftime('%Y-%m-%d')}
         print(f"  Technologies: {self.stats['tech_generated']}")
         print(f"  Topics: {self.stats['topics_generated']}")
         print(f"  Meetings: {self.stats['meetings_generated']}")
+        print(f"  Sources: {self.stats['sources_extracted']} extracted, {self.stats['sources_unchanged']} unchanged, {len(retracted)} retracted")
+        print(f"  Pages: {self.stats['pages_written']} written, {self.stats['pages_unchanged']} unchanged, {self.stats['pages_removed']} removed")
+        if database_counts:
+            print(f"  Knowledge Database: {database_counts['updated']} entities indexed, "
+                  f"{database_counts['unchanged']} unchanged, {database_counts['removed']} removed ({DATABASE_NAME})")
+        else:
+            print(f"  ⚠️ Knowledge Database skipped: this Python's SQLite has no FTS5 support")
+        if self.stats['truncated_responses'] or self.stats['schema_repairs']:
+            print(f"  Responses: {self.stats['truncated_responses']} cut off ({self.stats['continuations']} continuation requests), "
+                  f"{self.stats['schema_repairs']} schema repairs")
         
         # Show top technologies
         if tech_counter:
@@ -839,9 +1565,73 @@ created: {datetime.now().strftime('%Y-%m-%d')}
             for rel_type, count in rel_types.most_common():
                 print(f"  • {rel_type}: {count} relationships")
         
+        print(f"\n⏳ Throttling and Retries:")
+        print(self.scheduler.summary())
+        
+        if self.router.enabled:
+            print(f"\n🧭 Model Tiers:")
+            print(self.router.summary())
+        
         print(f"\n🤖 Powered by Azure OpenAI GPT-4 ({self.stats['ai_extractions']} API calls)")
+        
+        if self.profiler:
+            self.profiler.finish()
+            report = self.profiler.report(self.stats)
+            report_path = self.profiler.save(report)
+            print(f"\n⏱️ Build Profile:")
+            print(self.profiler.summary(report))
+            print(f"  Report: {report_path}")
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Build the HiveMind knowledge base from RawInput using Azure OpenAI")
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help=f"Maximum concurrent extraction requests (default: {MAX_CONCURRENCY}, env HIVEMIND_MAX_CONCURRENCY)")
+    parser.add_argument('--conversion-workers', type=int, default=None,
+                        help=f"Worker processes for PDF/DOCX conversion, 0 to convert inline (default: {CONVERSION_WORKERS}, env HIVEMIND_CONVERSION_WORKERS)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Do not read or write the extraction cache or the converted-text store")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Re-extract every document and overwrite its cached result")
+    parser.add_argument('--full', action='store_true',
+                        help="Ignore staged extractions and re-process every source")
+    parser.add_argument('--llm-adjudication', action='store_true',
+                        help="Ask GPT-4 about ambiguous name matches during entity resolution")
+    parser.add_argument('--pack', action='store_true',
+                        help="Pack short documents into shared extraction requests (env HIVEMIND_PACK_TOKENS)")
+    parser.add_argument('--keep-duplicates', action='store_true',
+                        help="Extract near-duplicate documents too instead of linking them to one representative")
+    parser.add_argument('--small-model', default=None,
+                        help="Deployment for simple documents, escalating to the large model when its result "
+                             "fails validation (env HIVEMIND_SMALL_MODEL; routing is off when unset)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Record phase times, conversion times, LLM latency/tokens and writes; "
+                             "print percentiles and save a JSON report to .hivemind_cache/profiles/")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Scan, convert and chunk RawInput, then print projected calls, tokens and time "
+                             "without calling GPT or writing pages")
+    parser.add_argument('--stream', action='store_true',
+                        help="Stream completions and parse them incrementally, emitting each entity as it is generated")
+    args = parser.parse_args()
+    
+    builder = AIKnowledgeBuilder(max_concurrency=args.concurrency,
+                                 conversion_workers=args.conversion_workers,
+                                 use_cache=not args.no_cache,
+                                 refresh_cache=args.refresh,
+                                 incremental=not args.full and not args.refresh,
+                                 llm_adjudication=args.llm_adjudication,
+                                 profile=args.profile,
+                                 pack=args.pack,
+                                 dedupe=not args.keep_duplicates,
+                                 small_model=args.small_model,
+                                 stream=args.stream,
+                                 dry_run=args.dry_run)
+    if args.dry_run:
+        builder.dry_run()
+    else:
+        builder.build()
 
 
 if __name__ == "__main__":
-    builder = AIKnowledgeBuilder()
-    builder.build()
+    main()
@@ -0,0 +1,92 @@
+"""
+Batched Extraction for the HiveMind Knowledge Builder
+Packs short documents (LinkedIn profiles, meeting notes) into one extraction
+request up to a token budget, so they share a single copy of the ontology
+system prompt, and splits the per-document keyed JSON answer back to its sources
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+from chunked_extraction import estimate_tokens
+
+
+# Documents up to this many tokens are packed; a request holds at most
+# PACK_TOKENS of document text and PACK_MAX_DOCUMENTS documents
+PACK_DOCUMENT_TOKENS = int(os.getenv("HIVEMIND_PACK_DOCUMENT_TOKENS", "1500"))
+PACK_TOKENS = int(os.getenv("HIVEMIND_PACK_TOKENS", "8000"))
+PACK_MAX_DOCUMENTS = int(os.getenv("HIVEMIND_PACK_MAX_DOCUMENTS", "16"))
+
+# Completion budget per packed document, and for the whole response
+PACK_OUTPUT_TOKENS_PER_DOCUMENT = 1200
+PACK_MAX_OUTPUT_TOKENS = 16000
+
+
+def packable(text: str) -> bool:
+    """True if a (single-chunk) document is short enough to share a request"""
+    return estimate_tokens(text) <= PACK_DOCUMENT_TOKENS
+
+
+def document_id(position: int) -> str:
+    return f"doc{position + 1}"
+
+
+class DocumentPacker:
+    """Groups short documents into batches within the token and document limits"""
+
+    def __init__(self, max_tokens: int = PACK_TOKENS, max_documents: int = PACK_MAX_DOCUMENTS):
+        self.max_tokens = max_tokens
+        self.max_documents = max_documents
+        self.items: List[Tuple] = []
+        self.tokens = 0
+
+    def add(self, item: Tuple, text: str) -> Optional[List[Tuple]]:
+        """Add an item; returns the previous batch if the item did not fit in it"""
+        tokens = estimate_tokens(text)
+        full = None
+        if self.items and (self.tokens + tokens > self.max_tokens or len(self.items) >= self.max_documents):
+            full = self.flush()
+        self.items.append(item)
+        self.tokens += tokens
+        return full
+
+    def flush(self) -> List[Tuple]:
+        """Return and clear the current batch"""
+        items, self.items, self.tokens = self.items, [], 0
+        return items
+
+
+def build_batch_prompt(documents: List[Tuple[str, str, str]]) -> str:
+    """User prompt for (text, source, document type) documents, keyed doc1..docN"""
+    sections = []
+    for position, (text, source_file, document_type) in enumerate(documents):
+        sections.append(f"""=== {document_id(position)} ===
+Document Type: {document_type}
+Source: {source_file}
+
+Document Content:
+{text}""")
+
+    ids = ", ".join(f'"{document_id(p)}"' for p in range(len(documents)))
+    return f"""The following {len(documents)} documents are independent. Extract entities from each document separately.
+
+{chr(10).join(sections)}
+
+Extract all relevant entities following the HiveMind ontology.
+Return ONE JSON object keyed by document id ({ids}); each value uses the exact JSON format above,
+for that document alone. Include every id, with empty arrays if nothing applies."""
+
+
+def batch_output_tokens(count: int) -> int:
+    return min(PACK_MAX_OUTPUT_TOKENS, PACK_OUTPUT_TOKENS_PER_DOCUMENT * count)
+
+
+def split_batch_result(data, count: int) -> List[Optional[Dict]]:
+    """Per-document results of a batched answer, in order (None where an id is missing)"""
+    if not isinstance(data, dict):
+        return [None] * count
+    results = []
+    for position in range(count):
+        result = data.get(document_id(position))
+        results.append(result if isinstance(result, dict) else None)
+    return results
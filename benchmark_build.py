@@ -0,0 +1,140 @@
+"""
+Build Benchmark for the HiveMind Knowledge Builder
+Generates synthetic RawInput corpora (synthetic_corpus.py) and runs full
+AIKnowledgeBuilder builds against the offline mock LLM (mock_llm.py), reporting
+end-to-end throughput in documents/sec and entities/sec per corpus size
+
+Usage:
+    python benchmark_build.py                       # 100, 1000, 10000 documents
+    python benchmark_build.py --sizes 100,1000 --latency 0.5 --error-rate 0.05
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+from typing import Dict, List
+
+# Fix Windows encoding for emojis
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+from mock_llm import MockChatClient
+from synthetic_corpus import generate_corpus
+import ai_knowledge_builder
+
+
+DEFAULT_SIZES = [100, 1000, 10000]
+
+
+def run_build(documents: int, args) -> Dict:
+    """Generate a corpus of `documents` files in a temp workspace and build it once"""
+    workspace = Path(tempfile.mkdtemp(prefix=f"hivemind-bench-{documents}-"))
+    counts = generate_corpus(workspace, documents, seed=args.seed)
+
+    client = MockChatClient(latency=args.latency, jitter=args.jitter,
+                            error_rate=args.error_rate, seed=args.seed)
+    cwd = os.getcwd()
+    os.chdir(workspace)  # The builder works on ./RawInput and ./markdown_files
+    try:
+        builder = ai_knowledge_builder.AIKnowledgeBuilder(
+            client=client,
+            max_concurrency=args.concurrency,
+            conversion_workers=args.conversion_workers,
+            use_cache=False,
+            profile=args.profile
+        )
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()) as log:
+            builder.build()
+        seconds = time.perf_counter() - started
+    finally:
+        os.chdir(cwd)
+
+    entities = sum(len(items) for items in builder.extracted_entities.values())
+    result = {
+        'documents': documents,
+        'corpus': counts,
+        'seconds': round(seconds, 3),
+        'docs_per_sec': round(documents / seconds, 2),
+        'entities': entities,
+        'entities_per_sec': round(entities / seconds, 2),
+        'llm_calls': client.calls,
+        'llm_errors': client.errors,
+        'pages_written': builder.stats['pages_written']
+    }
+    if args.profile:
+        result['profile'] = builder.profiler.report(builder.stats)
+    if args.verbose:
+        print(log.getvalue())
+
+    if args.keep:
+        result['workspace'] = str(workspace)
+    else:
+        shutil.rmtree(workspace, ignore_errors=True)
+    return result
+
+
+def parse_sizes(value: str) -> List[int]:
+    return [int(size) for size in value.split(',') if size.strip()]
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark full knowledge-base builds on synthetic corpora with a mock LLM")
+    parser.add_argument('--sizes', type=parse_sizes, default=DEFAULT_SIZES,
+                        help="Comma-separated corpus sizes in documents (default: 100,1000,10000)")
+    parser.add_argument('--latency', type=float, default=0.2,
+                        help="Mock LLM latency per call in seconds (default: 0.2)")
+    parser.add_argument('--jitter', type=float, default=0.1,
+                        help="Extra random latency per call in seconds (default: 0.1)")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="Fraction of mock calls failing with HTTP 429 (default: 0)")
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help="Maximum concurrent extraction requests (default: builder setting)")
+    parser.add_argument('--conversion-workers', type=int, default=None,
+                        help="Worker processes for PDF/DOCX conversion (default: builder setting)")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="Seed for the corpus and the mock LLM (default: 0)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Include each build's profiler report in the JSON output")
+    parser.add_argument('--output', type=Path, default=None,
+                        help="Write results as JSON to this file")
+    parser.add_argument('--keep', action='store_true',
+                        help="Keep the generated workspaces (RawInput and markdown_files)")
+    parser.add_argument('--verbose', action='store_true',
+                        help="Show the builder's output")
+    args = parser.parse_args()
+
+    print("🏁 HiveMind Build Benchmark")
+    print(f"  Mock LLM: {args.latency}s latency (+{args.jitter}s jitter), {args.error_rate:.0%} errors")
+    print("=" * 60)
+
+    results = []
+    for documents in args.sizes:
+        print(f"\n📦 {documents} documents...")
+        result = run_build(documents, args)
+        results.append(result)
+        print(f"  ✓ {result['seconds']:.1f}s: {result['docs_per_sec']:.1f} docs/sec, "
+              f"{result['entities_per_sec']:.1f} entities/sec "
+              f"({result['entities']} entities, {result['llm_calls']} LLM calls, {result['llm_errors']} errors)")
+
+    print("\n" + "=" * 60)
+    print(f"{'Documents':>10} {'Seconds':>9} {'Docs/sec':>10} {'Entities/sec':>13} {'LLM calls':>10}")
+    for result in results:
+        print(f"{result['documents']:>10} {result['seconds']:>9.1f} {result['docs_per_sec']:>10.1f} "
+              f"{result['entities_per_sec']:>13.1f} {result['llm_calls']:>10}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=1, ensure_ascii=False), encoding='utf-8')
+        print(f"\n💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Build Estimator for the HiveMind Knowledge Builder
+Projects the LLM calls, prompt/completion tokens and wall-clock time of a
+planned build (ai_knowledge_builder.py --dry-run) from the exact requests it
+would send, calibrated by the latest --profile report when one exists
+"""
+
+import os
+import json
+import heapq
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from build_profiler import PROFILE_DIR
+from chunked_extraction import estimate_tokens
+from llm_scheduler import RPM_LIMIT, TPM_LIMIT
+from model_routing import SMALL
+
+try:
+    import tiktoken
+    TOKENIZER = tiktoken.get_encoding("o200k_base")  # GPT-4.1 / GPT-4o encoding
+except Exception:
+    TOKENIZER = None
+
+
+# Defaults used when there is no profile report to calibrate from
+DEFAULT_COMPLETION_TOKENS_PER_DOCUMENT = int(os.getenv("HIVEMIND_ESTIMATE_COMPLETION_TOKENS", "600"))
+DEFAULT_OUTPUT_TOKENS_PER_SECOND = float(os.getenv("HIVEMIND_ESTIMATE_OUTPUT_TPS", "60"))
+
+# Fixed part of a request's latency (prompt processing, network) for the defaults
+CALL_OVERHEAD_SECONDS = 1.0
+
+
+def count_tokens(text: str) -> int:
+    """Prompt tokens of a text: exact with tiktoken installed, else the chars/4 estimate"""
+    if TOKENIZER is not None:
+        return len(TOKENIZER.encode(text, disallowed_special=()))
+    return estimate_tokens(text)
+
+
+def latest_profile(profile_dir: Path = PROFILE_DIR) -> Optional[Dict]:
+    """Most recent --profile report, or None"""
+    reports = sorted(Path(profile_dir).glob("build-*.json")) if Path(profile_dir).exists() else []
+    for path in reversed(reports):
+        try:
+            return json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def calibrate(report: Optional[Dict]) -> Dict:
+    """Completion tokens per document and latency per completion token measured by a profiled build
+
+    A request's projected latency is overhead_seconds + completion tokens * seconds_per_token;
+    measured latencies already include the overhead, so it is 0 when calibrated.
+    """
+    calibration = {
+        'completion_tokens_per_document': DEFAULT_COMPLETION_TOKENS_PER_DOCUMENT,
+        'seconds_per_token': 1.0 / DEFAULT_OUTPUT_TOKENS_PER_SECOND,
+        'overhead_seconds': CALL_OVERHEAD_SECONDS,
+        'source': "defaults"
+    }
+    calls = [call for call in (report or {}).get('calls', [])
+             if call['phase'] == 'extraction' and 'error' not in call and call['completion_tokens']]
+    if not calls:
+        return calibration
+
+    # Batched calls are labelled "batch of N"
+    documents = sum(int(call['label'].rsplit(' ', 1)[1]) if str(call['label']).startswith('batch of ') else 1
+                    for call in calls)
+    completion = sum(call['completion_tokens'] for call in calls)
+    calibration.update({
+        'completion_tokens_per_document': max(1, round(completion / documents)),
+        'seconds_per_token': sum(call['seconds'] for call in calls) / completion,
+        'overhead_seconds': 0.0,
+        'source': f"profile of {report.get('started', 'an earlier build')} ({len(calls)} calls)"
+    })
+    return calibration
+
+
+class BuildEstimate:
+    """Requests a build would send, and the calls, tokens and time they add up to"""
+
+    def __init__(self, max_concurrency: int, calibration: Optional[Dict] = None,
+                 rpm_limit: int = RPM_LIMIT, tpm_limit: int = TPM_LIMIT):
+        self.max_concurrency = max_concurrency
+        self.calibration = calibration or calibrate(None)
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+
+        self.requests: List[Dict] = []
+        self.counts = defaultdict(int)
+        self.conversion_seconds = 0.0
+
+    def add_request(self, tier: str, prompt_tokens: int, max_tokens: int, documents: int = 1):
+        """A request that would be sent; completion tokens are projected, capped at max_tokens"""
+        completion = min(max_tokens, self.calibration['completion_tokens_per_document'] * documents)
+        self.requests.append({
+            'tier': tier,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion,
+            'max_tokens': max_tokens,
+            'seconds': self.calibration['overhead_seconds'] + completion * self.calibration['seconds_per_token']
+        })
+
+    def count(self, key: str, amount: int = 1):
+        self.counts[key] += amount
+
+    def wall_seconds(self) -> float:
+        """Extraction time with max_concurrency requests in flight, in submission order
+
+        Bounded below by the RPM/TPM limits when they are set.
+        """
+        workers = [0.0] * min(self.max_concurrency, max(1, len(self.requests)))
+        for request in self.requests:
+            heapq.heappush(workers, heapq.heappop(workers) + request['seconds'])
+        seconds = max(workers)
+
+        if self.rpm_limit:
+            seconds = max(seconds, 60.0 * len(self.requests) / self.rpm_limit)
+        if self.tpm_limit:
+            tokens = sum(r['prompt_tokens'] + r['max_tokens'] for r in self.requests)
+            seconds = max(seconds, 60.0 * tokens / self.tpm_limit)
+        return seconds
+
+    def projection(self) -> Dict:
+        by_tier = defaultdict(lambda: {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0})
+        for request in self.requests:
+            tier = by_tier[request['tier']]
+            tier['calls'] += 1
+            tier['prompt_tokens'] += request['prompt_tokens']
+            tier['completion_tokens'] += request['completion_tokens']
+        return {
+            'calls': len(self.requests),
+            'prompt_tokens': sum(r['prompt_tokens'] for r in self.requests),
+            'completion_tokens': sum(r['completion_tokens'] for r in self.requests),
+            'max_completion_tokens': sum(r['max_tokens'] for r in self.requests),
+            'tiers': dict(by_tier),
+            'wall_seconds': self.wall_seconds() if self.requests else 0.0,
+            'conversion_seconds': self.conversion_seconds,
+            'counts': dict(self.counts)
+        }
+
+    def summary(self) -> str:
+        projection = self.projection()
+        counts = projection['counts']
+        minutes = projection['wall_seconds'] / 60
+        lines = [
+            f"  • Documents: {counts.get('documents', 0)} to extract, {counts.get('unchanged', 0)} unchanged, "
+            f"{counts.get('near_duplicates', 0)} near-duplicates, {counts.get('skipped', 0)} skipped",
+            f"  • Requests: {projection['calls']} calls for {counts.get('chunks', 0)} chunks "
+            f"({counts.get('cached', 0)} served from the extraction cache)",
+            f"  • Tokens: {projection['prompt_tokens']:,} prompt + ~{projection['completion_tokens']:,} completion "
+            f"(at most {projection['max_completion_tokens']:,})"
+            + ("" if TOKENIZER else ", prompt counted at ~4 chars/token (pip install tiktoken for exact counts)")
+        ]
+        for tier, data in sorted(projection['tiers'].items()):
+            lines.append(f"  • {tier}: {data['calls']} calls, {data['prompt_tokens']:,} prompt + "
+                         f"~{data['completion_tokens']:,} completion tokens"
+                         + (" (plus large-tier calls for any escalations)" if tier == SMALL else ""))
+        if counts.get('tokens_over_budget'):
+            lines.append(f"  • ~{counts['tokens_over_budget']:,} tokens over the document budget would not be sent")
+        lines.append(f"  • Extraction time: ~{minutes:.1f} min at concurrency {self.max_concurrency}"
+                     + (f", RPM limit {self.rpm_limit}" if self.rpm_limit else "")
+                     + (f", TPM limit {self.tpm_limit}" if self.tpm_limit else ""))
+        lines.append(f"  • Conversion took {projection['conversion_seconds']:.1f}s (overlaps extraction in a real build)")
+        lines.append(f"  • Calibration: {self.calibration['completion_tokens_per_document']} completion tokens/document, "
+                     f"{1000 * self.calibration['seconds_per_token']:.1f}ms/token "
+                     f"+ {self.calibration['overhead_seconds']:.1f}s per call ({self.calibration['source']})")
+        return "\n".join(lines)
@@ -0,0 +1,181 @@
+"""
+Build Profiler for the HiveMind Knowledge Builder
+Records wall time per build phase, per-document conversion time, per-call LLM
+latency and token usage, retries and bytes written, and turns them into a JSON
+report plus a percentile summary (ai_knowledge_builder.py --profile)
+"""
+
+import os
+import json
+import math
+import time
+import threading
+from pathlib import Path
+from datetime import datetime
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+
+# Where --profile reports are written (one JSON file per build)
+PROFILE_DIR = Path(os.getenv("HIVEMIND_PROFILE_DIR", ".hivemind_cache/profiles"))
+
+PROFILE_VERSION = 1
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def distribution(values: List[float]) -> Dict:
+    """Count, total and p50/p90/p99/max of a list of measurements"""
+    return {
+        'count': len(values),
+        'total': round(sum(values), 4),
+        'p50': round(percentile(values, 50), 4),
+        'p90': round(percentile(values, 90), 4),
+        'p99': round(percentile(values, 99), 4),
+        'max': round(max(values), 4) if values else 0.0
+    }
+
+
+class BuildProfiler:
+    """Thread-safe collector of build timings and LLM call telemetry"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.started_at = datetime.now().isoformat()
+
+        # Phases run one after another: (name, seconds), in order
+        self.phases: List[tuple] = []
+        self.current_phase: Optional[str] = None
+        self.phase_started = self.started
+
+        self.conversions: List[Dict] = []
+        self.calls: List[Dict] = []
+        self.first_entities: List[float] = []
+        self.bytes_written = 0
+        self.pages_written = 0
+        self.finished = None
+
+    def start_phase(self, name: str):
+        """End the running phase (if any) and start timing the next one"""
+        now = time.perf_counter()
+        with self.lock:
+            if self.current_phase:
+                self.phases.append((self.current_phase, now - self.phase_started))
+            self.current_phase = name
+            self.phase_started = now
+
+    def finish(self):
+        """End the last phase and stop the build clock"""
+        self.start_phase(None)
+        self.finished = time.perf_counter()
+
+    def record_conversion(self, source: str, handler: str, seconds: float, chars: int):
+        with self.lock:
+            self.conversions.append({'source': source, 'handler': handler,
+                                     'seconds': round(seconds, 4), 'chars': chars})
+
+    def record_call(self, phase: str, label: Optional[str], seconds: float, attempts: int,
+                    usage=None, error: Optional[str] = None):
+        """One scheduled LLM call: latency of the successful attempt, attempts made, token usage"""
+        call = {
+            'phase': phase,
+            'label': label,
+            'seconds': round(seconds, 4),
+            'attempts': attempts,
+            'prompt_tokens': getattr(usage, 'prompt_tokens', None) or 0,
+            'completion_tokens': getattr(usage, 'completion_tokens', None) or 0
+        }
+        if error:
+            call['error'] = error
+        with self.lock:
+            self.calls.append(call)
+
+    def record_first_entity(self, seconds: float):
+        """Time from sending a streamed request to its first completed entity"""
+        with self.lock:
+            self.first_entities.append(round(seconds, 4))
+
+    def record_write(self, size: int):
+        with self.lock:
+            self.bytes_written += size
+            self.pages_written += 1
+
+    def report(self, stats: Optional[Dict] = None) -> Dict:
+        """Machine-readable report of the build"""
+        wall = (self.finished or time.perf_counter()) - self.started
+        with self.lock:
+            calls = list(self.calls)
+            conversions = list(self.conversions)
+            phases = list(self.phases)
+            first_entities = list(self.first_entities)
+
+        calls_by_phase = defaultdict(list)
+        for call in calls:
+            calls_by_phase[call['phase']].append(call)
+
+        llm = {}
+        for phase, phase_calls in calls_by_phase.items():
+            llm[phase] = {
+                'latency': distribution([c['seconds'] for c in phase_calls if 'error' not in c]),
+                'errors': sum(1 for c in phase_calls if 'error' in c),
+                'retries': sum(c['attempts'] - 1 for c in phase_calls),
+                'prompt_tokens': sum(c['prompt_tokens'] for c in phase_calls),
+                'completion_tokens': sum(c['completion_tokens'] for c in phase_calls)
+            }
+
+        conversion_by_handler = defaultdict(list)
+        for conversion in conversions:
+            conversion_by_handler[conversion['handler']].append(conversion['seconds'])
+
+        return {
+            'version': PROFILE_VERSION,
+            'started': self.started_at,
+            'wall_seconds': round(wall, 4),
+            'phases': [{'name': name, 'seconds': round(seconds, 4)} for name, seconds in phases],
+            'conversion': {handler: distribution(seconds) for handler, seconds in conversion_by_handler.items()},
+            'llm': llm,
+            'first_entity': distribution(first_entities),
+            'writes': {'pages': self.pages_written, 'bytes': self.bytes_written},
+            'stats': dict(stats or {}),
+            'documents': conversions,
+            'calls': calls
+        }
+
+    def save(self, report: Dict, path: Optional[Path] = None) -> Path:
+        """Write a report as JSON (default: PROFILE_DIR/build-<timestamp>.json)"""
+        if path is None:
+            path = PROFILE_DIR / f"build-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=1, ensure_ascii=False), encoding='utf-8')
+        return path
+
+    def summary(self, report: Dict) -> str:
+        """Human-readable phase times and percentiles"""
+        wall = report['wall_seconds'] or 1.0
+        lines = [f"  Wall time: {report['wall_seconds']:.1f}s"]
+        for phase in report['phases']:
+            lines.append(f"  • {phase['name']}: {phase['seconds']:.2f}s ({100 * phase['seconds'] / wall:.0f}%)")
+        for handler, dist in report['conversion'].items():
+            lines.append(f"  • convert {handler}: {dist['count']} docs, "
+                         f"p50 {dist['p50']:.2f}s, p90 {dist['p90']:.2f}s, max {dist['max']:.2f}s")
+        for phase, data in report['llm'].items():
+            dist = data['latency']
+            lines.append(f"  • LLM {phase}: {dist['count']} calls, p50 {dist['p50']:.2f}s, p90 {dist['p90']:.2f}s, "
+                         f"p99 {dist['p99']:.2f}s, {data['retries']} retries, {data['errors']} errors, "
+                         f"{data['prompt_tokens']} prompt + {data['completion_tokens']} completion tokens")
+        first_entity = report.get('first_entity', {})
+        if first_entity.get('count'):
+            lines.append(f"  • Time to first entity (streamed): p50 {first_entity['p50']:.2f}s, "
+                         f"p90 {first_entity['p90']:.2f}s, max {first_entity['max']:.2f}s")
+        writes = report['writes']
+        lines.append(f"  • Writes: {writes['pages']} pages, {writes['bytes'] / 1024:.1f} KiB")
+        return "\n".join(lines)
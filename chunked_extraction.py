@@ -0,0 +1,170 @@
+"""
+Chunked Extraction for the HiveMind Knowledge Builder
+Splits long documents into overlapping chunks on section/page boundaries
+(map) and merges the per-chunk extraction results into one entity set (reduce)
+"""
+
+import os
+import re
+from typing import Dict, List, Tuple
+
+
+# Token budgets (tokens are estimated at ~4 characters each)
+CHARS_PER_TOKEN = 4
+CHUNK_TOKENS = int(os.getenv("HIVEMIND_CHUNK_TOKENS", "2000"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("HIVEMIND_CHUNK_OVERLAP_TOKENS", "150"))
+DOCUMENT_TOKEN_BUDGET = int(os.getenv("HIVEMIND_DOCUMENT_TOKEN_BUDGET", "24000"))
+
+# A block starting with a markdown heading (or following a page break) opens a new section
+HEADING_PATTERN = re.compile(r'^\s{0,3}#{1,6}\s')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count used for chunk and document budgets"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_blocks(text: str) -> List[Tuple[str, bool]]:
+    """Split text into paragraphs, flagging those that start a section or page"""
+    blocks = []
+    for page_number, page in enumerate(text.split('\f')):
+        paragraphs = [p.strip('\n') for p in re.split(r'\n\s*\n', page)]
+        first = True
+        for paragraph in paragraphs:
+            if not paragraph.strip():
+                continue
+            starts_section = (first and page_number > 0) or bool(HEADING_PATTERN.match(paragraph))
+            blocks.append((paragraph, starts_section))
+            first = False
+    return blocks
+
+
+def split_oversized(block: str, max_chars: int) -> List[str]:
+    """Hard-split a single block that does not fit in a chunk, on line or word boundaries"""
+    pieces = []
+    while len(block) > max_chars:
+        cut = block.rfind('\n', 0, max_chars)
+        if cut < max_chars // 2:
+            cut = block.rfind(' ', 0, max_chars)
+        if cut < max_chars // 2:
+            cut = max_chars
+        pieces.append(block[:cut])
+        block = block[cut:].lstrip()
+    if block:
+        pieces.append(block)
+    return pieces
+
+
+def overlap_tail(chunk: str, overlap_chars: int) -> str:
+    """Last overlap_chars of a chunk, starting at a word boundary"""
+    if overlap_chars <= 0 or len(chunk) <= overlap_chars:
+        return ""
+    tail = chunk[-overlap_chars:]
+    space = tail.find(' ')
+    return tail[space + 1:] if 0 <= space < len(tail) // 2 else tail
+
+
+def split_into_chunks(text: str,
+                      chunk_tokens: int = CHUNK_TOKENS,
+                      overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+                      document_budget: int = DOCUMENT_TOKEN_BUDGET) -> Tuple[List[str], int]:
+    """Split text into overlapping chunks of at most chunk_tokens each
+
+    Chunks are cut on page breaks and markdown headings where possible, and on
+    paragraph boundaries otherwise. Chunks beyond the per-document token budget
+    are dropped. Returns (chunks, dropped_tokens).
+    """
+    max_chars = chunk_tokens * CHARS_PER_TOKEN
+    overlap_chars = min(overlap_tokens * CHARS_PER_TOKEN, max_chars // 4)
+
+    if len(text) <= max_chars:
+        return ([text] if text.strip() else []), 0
+
+    chunks = []
+    current = ""
+    for block, starts_section in split_blocks(text):
+        for piece in split_oversized(block, max_chars - overlap_chars):
+            candidate = f"{current}\n\n{piece}" if current else piece
+            # Prefer to cut at a section start once the chunk is half full
+            cut_here = starts_section and len(current) >= max_chars // 2
+            if current and (len(candidate) > max_chars or cut_here):
+                chunks.append(current)
+                tail = overlap_tail(current, overlap_chars)
+                current = f"{tail}\n\n{piece}" if tail else piece
+            else:
+                current = candidate
+            starts_section = False
+    if current.strip():
+        chunks.append(current)
+
+    # Enforce the per-document budget
+    kept, used = [], 0
+    for chunk in chunks:
+        tokens = estimate_tokens(chunk)
+        if kept and used + tokens > document_budget:
+            break
+        kept.append(chunk)
+        used += tokens
+    dropped = sum(estimate_tokens(chunk) for chunk in chunks[len(kept):])
+    return kept, dropped
+
+
+def merge_extractions(results: List[Dict]) -> Dict:
+    """Reduce per-chunk extraction results into one entity set, deduplicating across chunks"""
+    if len(results) == 1:
+        return results[0]
+
+    merged = {'people': [], 'organizations': [], 'technologies': [], 'topics': [], 'meetings': [], 'relationships': []}
+    people = {}
+    meetings = {}
+    seen_names = {'organizations': set(), 'technologies': set(), 'topics': set()}
+    seen_relationships = set()
+    errors = []
+
+    for result in results:
+        if 'error' in result:
+            errors.append(result['error'])
+
+        for person in result.get('people', []):
+            key = person.get('name', '').strip().lower()
+            if not key:
+                continue
+            if key not in people:
+                people[key] = dict(person, skills=list(person.get('skills', [])))
+                merged['people'].append(people[key])
+                continue
+            # Same person seen in another chunk: fill gaps and union skills
+            existing = people[key]
+            for field, value in person.items():
+                if field == 'skills':
+                    existing['skills'].extend(s for s in value if s not in existing['skills'])
+                elif value and not existing.get(field):
+                    existing[field] = value
+
+        for category in ('organizations', 'technologies', 'topics'):
+            for name in result.get(category, []):
+                if isinstance(name, str) and name.strip().lower() not in seen_names[category]:
+                    seen_names[category].add(name.strip().lower())
+                    merged[category].append(name)
+
+        for meeting in result.get('meetings', []):
+            key = (meeting.get('title', '').strip().lower(), meeting.get('date', ''))
+            if key not in meetings:
+                meetings[key] = dict(meeting,
+                                     attendees=list(meeting.get('attendees', [])),
+                                     topics=list(meeting.get('topics', [])))
+                merged['meetings'].append(meetings[key])
+                continue
+            existing = meetings[key]
+            for field in ('attendees', 'topics'):
+                existing[field].extend(v for v in meeting.get(field, []) if v not in existing[field])
+
+        for rel in result.get('relationships', []):
+            key = (rel.get('type', ''), rel.get('source', '').lower(), rel.get('target', '').lower())
+            if key not in seen_relationships:
+                seen_relationships.add(key)
+                merged['relationships'].append(rel)
+
+    if errors:
+        merged['error'] = '; '.join(errors)
+    return merged
@@ -0,0 +1,156 @@
+"""
+Converted Text Store for the HiveMind Knowledge Builder
+Persists MarkItDown / pypdf output per source file, keyed by content hash and
+converter version, so rebuilds, prompt experiments and re-chunking reuse the
+text without converting PDFs and DOCX files again. Texts are zlib-compressed
+into one append-only pack file and read back through mmap.
+"""
+
+import os
+import json
+import mmap
+import time
+import zlib
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from extraction_cache import CACHE_DIR
+
+
+# Size bound of the pack file; least recently used texts are dropped when compacting
+TEXT_STORE_MAX_MB = int(os.getenv("HIVEMIND_TEXT_STORE_MAX_MB", "512"))
+
+INDEX_VERSION = 1
+
+
+class ConvertedTextStore:
+    """Compressed converted texts in a single pack file with a JSON index"""
+
+    def __init__(self, store_dir: Path = CACHE_DIR / "converted",
+                 max_bytes: int = TEXT_STORE_MAX_MB * 1024 * 1024,
+                 read: bool = True, write: bool = True):
+        self.store_dir = Path(store_dir)
+        self.pack_path = self.store_dir / "texts.pack"
+        self.index_path = self.store_dir / "index.json"
+        self.max_bytes = max_bytes
+        self.read = read
+        self.write = write
+        self.lock = threading.Lock()
+
+        # key -> {'offset', 'length', 'stat', 'used'}
+        self.index: Dict[str, Dict] = {}
+        self.pack_size = 0
+        self.map: Optional[mmap.mmap] = None
+        self.map_file = None
+        self.dirty = False
+        self.load()
+
+    @staticmethod
+    def make_key(content_hash: str, handler: str, converter_version: str) -> str:
+        """Hash everything that determines the converted text"""
+        return hashlib.sha256(f"{content_hash}\x00{handler}\x00{converter_version}".encode('utf-8')).hexdigest()
+
+    def load(self):
+        """Load the index, keeping only entries that lie within the pack file"""
+        self.pack_size = self.pack_path.stat().st_size if self.pack_path.exists() else 0
+        if not self.index_path.exists():
+            return
+        try:
+            data = json.loads(self.index_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️ Ignoring unreadable converted-text index: {e}")
+            return
+        if data.get('version') != INDEX_VERSION:
+            return
+        self.index = {key: entry for key, entry in data.get('entries', {}).items()
+                      if entry['offset'] + entry['length'] <= self.pack_size}
+
+    def view(self) -> Optional[mmap.mmap]:
+        """Read-only map of the pack file, remapped when the file has grown"""
+        if self.pack_size == 0:
+            return None
+        if self.map is None or len(self.map) < self.pack_size:
+            self.close_map()
+            self.map_file = open(self.pack_path, 'rb')
+            self.map = mmap.mmap(self.map_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.map
+
+    def close_map(self):
+        if self.map is not None:
+            self.map.close()
+            self.map_file.close()
+            self.map = None
+            self.map_file = None
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a stored conversion ({'text', 'stat', 'messages'}), or None on a miss"""
+        if not self.read:
+            return None
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None:
+                return None
+            try:
+                view = self.view()
+                text = zlib.decompress(view[entry['offset']:entry['offset'] + entry['length']]).decode('utf-8')
+            except (OSError, ValueError, zlib.error):
+                # Corrupt entry: forget it and treat as a miss
+                del self.index[key]
+                self.dirty = True
+                return None
+            entry['used'] = time.time()
+            self.dirty = True
+            return {'text': text, 'stat': entry['stat'], 'messages': []}
+
+    def put(self, key: str, conversion: Dict):
+        """Append a conversion's text to the pack"""
+        if not self.write:
+            return
+        data = zlib.compress(conversion['text'].encode('utf-8'), 6)
+        with self.lock:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.pack_path, 'ab') as pack:
+                offset = pack.tell()
+                pack.write(data)
+            self.pack_size = offset + len(data)
+            self.index[key] = {'offset': offset, 'length': len(data), 'stat': conversion['stat'], 'used': time.time()}
+            self.dirty = True
+
+    def compact(self):
+        """Rewrite the pack with live entries only, most recently used first, within max_bytes"""
+        view = self.view()
+        kept = {}
+        size = 0
+        tmp_path = self.pack_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as pack:
+            for key, entry in sorted(self.index.items(), key=lambda item: item[1]['used'], reverse=True):
+                if size + entry['length'] > self.max_bytes:
+                    continue
+                pack.write(view[entry['offset']:entry['offset'] + entry['length']])
+                kept[key] = dict(entry, offset=size)
+                size += entry['length']
+        self.close_map()
+        os.replace(tmp_path, self.pack_path)
+        self.index = kept
+        self.pack_size = size
+
+    def save(self):
+        """Compact when the pack holds dead or excess bytes, then write the index atomically"""
+        with self.lock:
+            if not self.write or not self.dirty:
+                return
+            live_bytes = sum(entry['length'] for entry in self.index.values())
+            if self.pack_size > self.max_bytes or self.pack_size > 2 * live_bytes:
+                self.compact()
+
+            data = {'version': INDEX_VERSION, 'entries': self.index}
+            tmp_path = self.index_path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(data), encoding='utf-8')
+            os.replace(tmp_path, self.index_path)
+            self.dirty = False
+
+    def close(self):
+        with self.lock:
+            self.close_map()
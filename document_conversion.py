@@ -0,0 +1,122 @@
+"""
+Document Conversion for the HiveMind Knowledge Builder
+Converts RawInput files to text with MarkItDown / pypdf. The functions here are
+module-level so they can run in worker processes, ahead of the LLM extraction stage
+"""
+
+import os
+import time
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Dict
+
+# For PDF extraction
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+# For document conversion (DOCX, PDF, etc.)
+try:
+    from markitdown import MarkItDown
+except ImportError:
+    MarkItDown = None
+
+
+# Worker processes for CPU-bound conversion, and how many converted documents
+# may wait for the extraction stage before conversion pauses (backpressure)
+CONVERSION_WORKERS = int(os.getenv("HIVEMIND_CONVERSION_WORKERS", str(min(4, os.cpu_count() or 1))))
+CONVERSION_QUEUE_SIZE = int(os.getenv("HIVEMIND_CONVERSION_QUEUE_SIZE", "8"))
+
+# Handlers whose files need a converter (the rest are plain markdown)
+CONVERTED_HANDLERS = {'pdf_document', 'docx_document'}
+
+# Bump when convert_* output changes, so stored converted texts are not reused
+CONVERSION_FORMAT_VERSION = 1
+
+# One MarkItDown instance per process, created on first use
+_markitdown_converter = None
+
+
+def markitdown_available() -> bool:
+    """True if MarkItDown is installed"""
+    return MarkItDown is not None
+
+
+@lru_cache(maxsize=None)
+def converter_version(handler: str) -> str:
+    """Identifies the converter output for a handler (format version plus library versions)"""
+    versions = [f"format={CONVERSION_FORMAT_VERSION}"]
+    for package in ('markitdown', 'pypdf'):
+        try:
+            versions.append(f"{package}={metadata.version(package)}")
+        except metadata.PackageNotFoundError:
+            versions.append(f"{package}=none")
+    return f"{handler};" + ";".join(versions)
+
+
+def get_markitdown():
+    """Return this process's MarkItDown converter"""
+    global _markitdown_converter
+    if _markitdown_converter is None and MarkItDown is not None:
+        _markitdown_converter = MarkItDown()
+    return _markitdown_converter
+
+
+def convert_pdf(pdf_path: str) -> Dict:
+    """Extract text from PDF file using markitdown or pypdf (full text; chunked later)"""
+    name = Path(pdf_path).name
+    messages = []
+
+    # Try markitdown first for better extraction
+    converter = get_markitdown()
+    if converter:
+        try:
+            result = converter.convert(pdf_path)
+            text = result.text_content if hasattr(result, 'text_content') else str(result)
+            return {'text': text, 'stat': 'pdf_processed', 'messages': messages}
+        except Exception as e:
+            messages.append(f"  ⚠️ Markitdown error for {name}: {e}, trying pypdf...")
+
+    # Fallback to pypdf
+    if pypdf is None:
+        return {'text': "", 'stat': 'pdf_skipped', 'messages': messages}
+
+    try:
+        reader = pypdf.PdfReader(pdf_path)
+        # Form feeds mark page boundaries for the chunker
+        text = "\f".join(page.extract_text() for page in reader.pages)
+        return {'text': text, 'stat': 'pdf_processed', 'messages': messages}
+    except Exception as e:
+        messages.append(f"  ⚠️ Error reading PDF {name}: {e}")
+        return {'text': "", 'stat': 'pdf_errors', 'messages': messages}
+
+
+def convert_docx(docx_path: str) -> Dict:
+    """Extract text from DOCX file using markitdown"""
+    converter = get_markitdown()
+    if converter is None:
+        return {'text': "", 'stat': 'docx_skipped',
+                'messages': ["  ⚠️ markitdown not installed - install with: pip install markitdown"]}
+
+    try:
+        result = converter.convert(docx_path)
+        text = result.text_content if hasattr(result, 'text_content') else str(result)
+        return {'text': text, 'stat': 'docx_processed', 'messages': []}
+    except Exception as e:
+        return {'text': "", 'stat': 'docx_errors',
+                'messages': [f"  ⚠️ Error reading DOCX {Path(docx_path).name}: {e}"]}
+
+
+def convert_document(handler: str, file_path: str) -> Dict:
+    """Convert one source file to text for the given document handler (timed in 'seconds')"""
+    started = time.perf_counter()
+    if handler == 'pdf_document':
+        conversion = convert_pdf(file_path)
+    elif handler == 'docx_document':
+        conversion = convert_docx(file_path)
+    else:
+        conversion = {'text': Path(file_path).read_text(encoding='utf-8'), 'stat': None, 'messages': []}
+    conversion['seconds'] = time.perf_counter() - started
+    return conversion
@@ -0,0 +1,134 @@
+"""
+Document Scanner for the HiveMind Knowledge Builder
+Walks RawInput once with os.scandir and classifies every file through a
+registry of document handlers (extension, path rule, content sniffing).
+New document types plug in with register_handler plus the builder's
+prepare_<name> / store_<name> methods.
+"""
+
+import os
+from pathlib import Path, PurePosixPath
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from document_conversion import markitdown_available
+
+
+# Handlers in phase order; the first handler whose rules match a file gets it
+HANDLER_REGISTRY: List[Dict] = []
+
+# How many leading bytes a content sniffer sees
+SNIFF_BYTES = 8
+
+
+def register_handler(name: str, label: str, extensions: Iterable[str],
+                     path_rule: Optional[Callable[[PurePosixPath], bool]] = None,
+                     sniff: Optional[Callable[[bytes], bool]] = None,
+                     available: Optional[Callable[[], bool]] = None,
+                     unavailable_message: str = ""):
+    """Add a document handler; `name` selects the builder's prepare_/store_ methods
+
+    path_rule gets the path relative to RawInput, sniff the file's first bytes,
+    available whether the handler's converter is installed.
+    """
+    HANDLER_REGISTRY.append({
+        'name': name,
+        'label': label,
+        'extensions': {extension.lower() for extension in extensions},
+        'path_rule': path_rule,
+        'sniff': sniff,
+        'available': available,
+        'unavailable_message': unavailable_message
+    })
+
+
+def read_head(path: str) -> bytes:
+    try:
+        with open(path, 'rb') as f:
+            return f.read(SNIFF_BYTES)
+    except OSError:
+        return b""
+
+
+def classify(relative: PurePosixPath, path: str) -> Tuple[Optional[str], Optional[str]]:
+    """(accepting handler, None), or (None, handler whose sniffer rejected the content)
+
+    The accepting handler is the first whose extension, path rule and sniffer accept the file.
+    """
+    extension = relative.suffix.lower()
+    head = None
+    rejected_by = None
+    for handler in HANDLER_REGISTRY:
+        if extension not in handler['extensions']:
+            continue
+        if handler['path_rule'] and not handler['path_rule'](relative):
+            continue
+        if handler['sniff']:
+            if head is None:
+                head = read_head(path)
+            if not handler['sniff'](head):
+                rejected_by = rejected_by or handler['name']
+                continue
+        return handler['name'], None
+    return None, rejected_by
+
+
+def scan_raw_input(raw_input: Path) -> Tuple[Dict[str, List[Path]], Dict[str, List[Path]]]:
+    """One traversal of raw_input, returning two maps of handler name -> sorted files
+
+    The first holds the files each handler accepts; the second, files with a
+    handler's extension whose content it rejected (e.g. encrypted or legacy formats).
+    """
+    found = {handler['name']: [] for handler in HANDLER_REGISTRY}
+    rejected = {handler['name']: [] for handler in HANDLER_REGISTRY}
+    if not raw_input.exists():
+        return found, rejected
+
+    stack = [(str(raw_input), PurePosixPath())]
+    while stack:
+        directory, relative_dir = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            relative = relative_dir / entry.name
+            if entry.is_dir(follow_symlinks=False):
+                stack.append((entry.path, relative))
+            elif entry.is_file():
+                name, rejected_by = classify(relative, entry.path)
+                if name:
+                    found[name].append(raw_input.joinpath(*relative.parts))
+                elif rejected_by:
+                    rejected[rejected_by].append(raw_input.joinpath(*relative.parts))
+
+    for files in list(found.values()) + list(rejected.values()):
+        files.sort()
+    return found, rejected
+
+
+# --- Built-in handlers (RawInput layout) ---
+
+LINKEDIN_MARKDOWN_DIR = PurePosixPath("LinkedIn/Markdown (enhanced for AI interpretation)")
+MEETING_NOTE_DIRS = {PurePosixPath("Internal Account Discussions"), PurePosixPath("NNR meeting")}
+
+register_handler(
+    'linkedin_profile', "LinkedIn Profiles", ['.md'],
+    path_rule=lambda relative: relative.parent == LINKEDIN_MARKDOWN_DIR
+)
+register_handler(
+    'meeting_notes', "Meeting Notes", ['.md'],
+    path_rule=lambda relative: relative.parent in MEETING_NOTE_DIRS
+)
+register_handler(
+    # Strategic docs only (avoid LinkedIn PDFs)
+    'pdf_document', "PDF Documents", ['.pdf'],
+    path_rule=lambda relative: 'AI Plan' in relative.name or 'annual report' in relative.name.lower(),
+    sniff=lambda head: head.startswith(b'%PDF')
+)
+register_handler(
+    # Meeting transcripts, decision maker lists
+    'docx_document', "DOCX Documents", ['.docx'],
+    sniff=lambda head: head.startswith(b'PK'),
+    available=markitdown_available,
+    unavailable_message="markitdown not installed - install with: pip install markitdown"
+)
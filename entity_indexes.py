@@ -0,0 +1,127 @@
+"""
+Entity Indexes for the HiveMind Knowledge Builder
+Adjacency and membership indexes built once after consolidation, so entity
+page generation looks up its neighbours instead of rescanning every list
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a lower-cased string"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SubstringIndex:
+    """Maps character trigrams to the positions of the names containing them
+
+    Finds substring matches between names (e.g. a technology within a skill)
+    by intersecting trigram postings instead of comparing every pair.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names = [name.lower() for name in names]
+        self.postings = defaultdict(set)
+        self.short = []  # Names too short to have a trigram
+        for position, name in enumerate(self.names):
+            grams = trigrams(name)
+            if not grams:
+                self.short.append(position)
+            for gram in grams:
+                self.postings[gram].add(position)
+
+    def containing(self, phrase: str) -> List[int]:
+        """Positions of names that contain phrase, in order"""
+        phrase = phrase.lower()
+        grams = trigrams(phrase)
+        if not grams:
+            candidates = range(len(self.names))
+        else:
+            candidates = set.intersection(*(self.postings.get(gram, set()) for gram in grams))
+        return sorted(p for p in candidates if phrase in self.names[p])
+
+    def contained_in(self, phrase: str) -> List[int]:
+        """Positions of names that occur inside phrase, in order"""
+        phrase = phrase.lower()
+        candidates = set(self.short)
+        for gram in trigrams(phrase):
+            candidates |= self.postings.get(gram, set())
+        return sorted(p for p in candidates if self.names[p] in phrase)
+
+
+class EntityIndexes:
+    """Lookups over extracted_entities used by the generate_*_file methods"""
+
+    def __init__(self, extracted_entities: Dict[str, list]):
+        self.people = extracted_entities['people']
+        self.meetings = extracted_entities['meetings']
+        self.technologies = extracted_entities['technologies']
+
+        # Relationships by source, target and type (names lower-cased)
+        self.by_source = defaultdict(list)
+        self.by_target = defaultdict(list)
+        self.by_type = defaultdict(list)
+        for rel in extracted_entities['relationships']:
+            self.by_source[(rel.get('source') or '').lower()].append(rel)
+            self.by_target[(rel.get('target') or '').lower()].append(rel)
+            self.by_type[rel.get('type', '')].append(rel)
+
+        # Organization -> people
+        self.people_by_org = defaultdict(list)
+        for person in self.people:
+            self.people_by_org[(person.get('company') or '').lower()].append(person)
+
+        # Skill -> people: substring index over each person's skills
+        self.skill_owner = []
+        skills = []
+        for person in self.people:
+            for skill in person.get('skills', []):
+                self.skill_owner.append(person)
+                skills.append(skill)
+        self.skill_index = SubstringIndex(skills)
+
+        # Topic -> meetings: substring index over each meeting's topics
+        self.meeting_topic_owner = []
+        meeting_topics = []
+        for position, meeting in enumerate(self.meetings):
+            for topic in meeting.get('topics', []):
+                self.meeting_topic_owner.append(position)
+                meeting_topics.append(topic)
+        self.meeting_topic_index = SubstringIndex(meeting_topics)
+
+        self.technology_index = SubstringIndex(self.technologies)
+        self.sorted_technologies = sorted(set(self.technologies))
+
+    def relationships_from(self, source: str, rel_type: str = None) -> List[Dict]:
+        """Relationships whose source is the given entity"""
+        rels = self.by_source.get(source.lower(), [])
+        return [rel for rel in rels if rel.get('type') == rel_type] if rel_type else rels
+
+    def relationships_to(self, target: str, rel_type: str = None) -> List[Dict]:
+        """Relationships whose target is the given entity"""
+        rels = self.by_target.get(target.lower(), [])
+        return [rel for rel in rels if rel.get('type') == rel_type] if rel_type else rels
+
+    def people_at(self, org_name: str) -> List[Dict]:
+        """People whose company is the given organization"""
+        return self.people_by_org.get(org_name.lower(), [])
+
+    def people_with_skill(self, tech_name: str) -> List[Dict]:
+        """People with a skill mentioning the technology, each once, in people order"""
+        found = {}
+        for position in self.skill_index.containing(tech_name):
+            person = self.skill_owner[position]
+            found.setdefault(id(person), person)
+        return list(found.values())
+
+    def meetings_for_topic(self, topic_name: str) -> List[Dict]:
+        """Meetings with a topic mentioning the given topic, in meeting order"""
+        positions = sorted({self.meeting_topic_owner[p] for p in self.meeting_topic_index.containing(topic_name)})
+        return [self.meetings[p] for p in positions]
+
+    def technologies_related_to(self, topic_name: str) -> List[str]:
+        """Technologies whose name contains, or is contained in, the topic name"""
+        positions = set(self.technology_index.containing(topic_name))
+        positions.update(self.technology_index.contained_in(topic_name))
+        return [self.technologies[p] for p in sorted(positions)]
@@ -0,0 +1,204 @@
+"""
+Entity Resolution for the HiveMind Knowledge Builder
+Merges variant spellings of technology, organization and topic names locally:
+normalized keys and alias tables first, then blocking plus character n-gram
+similarity clustering. Pairs in the ambiguous similarity band can optionally be
+sent to an adjudicator (e.g. GPT-4) in small batches.
+"""
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from itertools import combinations
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Known variants -> canonical name (keys are normalized with normalize_key)
+TECHNOLOGY_ALIASES = {
+    'm365': 'Microsoft 365',
+    'o365': 'Microsoft 365',
+    'office 365': 'Microsoft 365',
+    'enter id': 'Entra ID',
+    'azure ad': 'Entra ID',
+    'azure active directory': 'Entra ID',
+    'microsoft entra id': 'Entra ID',
+    'windows 65': 'Windows 365',
+    'copilot chat': 'Microsoft Copilot',
+    'm365 copilot': 'Microsoft Copilot',
+    'microsoft 365 copilot': 'Microsoft Copilot',
+    'azure ai studio': 'Azure AI',
+    'azure machine learning workspace': 'Azure Machine Learning',
+    'azure ml': 'Azure Machine Learning',
+    'aoai': 'Azure OpenAI',
+    'azure openai service': 'Azure OpenAI',
+    'd365': 'Dynamics 365',
+    'microsoft dynamics 365': 'Dynamics 365',
+    'powerbi': 'Power BI',
+    'microsoft power bi': 'Power BI',
+    'ms teams': 'Microsoft Teams',
+    'aks': 'Azure Kubernetes Service',
+    'k8s': 'Kubernetes',
+}
+
+ORGANIZATION_ALIASES = {
+    'msft': 'Microsoft',
+    'microsoft corporation': 'Microsoft',
+}
+
+TOPIC_ALIASES: Dict[str, str] = {}
+
+# Legal-form suffixes ignored when comparing organization names
+LEGAL_SUFFIXES = {'sa', 'nv', 'bv', 'inc', 'ltd', 'llc', 'gmbh', 'plc', 'corp', 'ag', 'srl', 'co'}
+
+# Blocks larger than this are too generic to compare pairwise (e.g. every name containing "azure")
+MAX_BLOCK_SIZE = 200
+
+
+def normalize_key(name: str, strip_legal_suffixes: bool = False) -> str:
+    """Case-, accent- and punctuation-insensitive comparison key"""
+    text = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').lower()
+    text = text.replace('&', ' and ')
+    text = re.sub(r'[^\w\s+#]', ' ', text)  # Keep '+' and '#' (C++, C#)
+    tokens = text.split()
+    if strip_legal_suffixes:
+        while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+            tokens.pop()
+    return ' '.join(tokens)
+
+
+def ngram_set(key: str, n: int = 3) -> set:
+    """Character n-grams of a key, padded so short names still get n-grams"""
+    padded = f" {key} "
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+def similarity(a: set, b: set) -> float:
+    """Jaccard similarity of two n-gram sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class EntityResolver:
+    """Clusters name variants and maps every surface form to a canonical name"""
+
+    def __init__(self, aliases: Optional[Dict[str, str]] = None,
+                 strip_legal_suffixes: bool = False,
+                 merge_threshold: float = 0.85,
+                 ambiguous_threshold: float = 0.6,
+                 adjudicator: Optional[Callable[[List[Tuple[str, str]]], List[bool]]] = None,
+                 batch_size: int = 20):
+        self.strip_legal_suffixes = strip_legal_suffixes
+        self.aliases = {self.key(k): v for k, v in (aliases or {}).items()}
+        self.merge_threshold = merge_threshold
+        self.ambiguous_threshold = ambiguous_threshold
+        self.adjudicator = adjudicator
+        self.batch_size = batch_size
+        self.stats = Counter()
+
+    def key(self, name: str) -> str:
+        return normalize_key(name, self.strip_legal_suffixes)
+
+    def resolve(self, names: Iterable[str]) -> Dict[str, str]:
+        """Map each surface form in names (a mention list, duplicates allowed) to its canonical name"""
+        mentions = Counter(name for name in names if isinstance(name, str) and name.strip())
+        surfaces = list(mentions)
+        if not surfaces:
+            return {}
+
+        # 1. Exact merge on the alias target or the space-insensitive key
+        groups = defaultdict(list)
+        group_names = {}
+        for surface in surfaces:
+            key = self.key(surface)
+            alias = self.aliases.get(key)
+            name_key = self.key(alias) if alias else key
+            groups[name_key.replace(' ', '')].append(surface)
+            group_names.setdefault(name_key.replace(' ', ''), name_key)
+        group_keys = list(groups)
+        parent = list(range(len(group_keys)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i: int, j: int):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        # 2. Blocking: only compare groups sharing a word or a 4-character prefix
+        grams = []
+        blocks = defaultdict(list)
+        for index, group_key in enumerate(group_keys):
+            grams.append(ngram_set(group_key))
+            for token in set(group_names[group_key].split()):
+                if len(token) >= 3:
+                    blocks[f"w:{token}"].append(index)
+            blocks[f"p:{group_key[:4]}"].append(index)
+
+        # 3. Similarity clustering within blocks
+        compared = set()
+        ambiguous = []
+        for members in blocks.values():
+            if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+                continue
+            for i, j in combinations(members, 2):
+                if (i, j) in compared:
+                    continue
+                compared.add((i, j))
+                score = similarity(grams[i], grams[j])
+                if score >= self.merge_threshold:
+                    union(i, j)
+                    self.stats['similar_merges'] += 1
+                elif score >= self.ambiguous_threshold:
+                    ambiguous.append((i, j))
+        self.stats['pairs_compared'] += len(compared)
+        self.stats['ambiguous_pairs'] += len(ambiguous)
+
+        # 4. Optional adjudication of ambiguous pairs, in small batches
+        if self.adjudicator and ambiguous:
+            for start in range(0, len(ambiguous), self.batch_size):
+                batch = ambiguous[start:start + self.batch_size]
+                pairs = [(groups[group_keys[i]][0], groups[group_keys[j]][0]) for i, j in batch]
+                verdicts = self.adjudicator(pairs)
+                for (i, j), same in zip(batch, verdicts):
+                    if same:
+                        union(i, j)
+                        self.stats['adjudicated_merges'] += 1
+
+        # 5. Canonical name per cluster: alias target, else the most mentioned surface form
+        clusters = defaultdict(list)
+        for index, group_key in enumerate(group_keys):
+            clusters[find(index)].extend(groups[group_key])
+
+        mapping = {}
+        for members in clusters.values():
+            canonical = None
+            for surface in members:
+                alias = self.aliases.get(self.key(surface))
+                if alias:
+                    canonical = alias
+                    break
+            if canonical is None:
+                # Most mentions wins; ties go to the first seen (members keep mention order)
+                canonical = max(members, key=lambda surface: mentions[surface])
+            for surface in members:
+                mapping[surface] = canonical
+        self.stats['names'] += len(surfaces)
+        self.stats['entities'] += len(clusters)
+        return mapping
+
+
+def technology_resolver(adjudicator=None) -> EntityResolver:
+    return EntityResolver(TECHNOLOGY_ALIASES, adjudicator=adjudicator)
+
+
+def organization_resolver(adjudicator=None) -> EntityResolver:
+    return EntityResolver(ORGANIZATION_ALIASES, strip_legal_suffixes=True, adjudicator=adjudicator)
+
+
+def topic_resolver(adjudicator=None) -> EntityResolver:
+    return EntityResolver(TOPIC_ALIASES, merge_threshold=0.9, adjudicator=adjudicator)
@@ -0,0 +1,124 @@
+"""
+Extraction Cache for the HiveMind Knowledge Builder
+Content-addressed on-disk store of GPT extraction results, so unchanged
+documents are not sent to Azure OpenAI again on every rebuild
+"""
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+# Default cache location and size bound
+CACHE_DIR = Path(os.getenv("HIVEMIND_CACHE_DIR", ".hivemind_cache"))
+CACHE_MAX_MB = int(os.getenv("HIVEMIND_CACHE_MAX_MB", "256"))
+
+
+class ExtractionCache:
+    """Size-bounded LRU cache of extraction results, one JSON file per key"""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR / "extractions",
+                 max_bytes: int = CACHE_MAX_MB * 1024 * 1024,
+                 read: bool = True, write: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.read = read
+        self.write = write
+        self.lock = threading.Lock()
+
+        # key -> file size, least recently used first (loaded lazily)
+        self.entries: Optional[OrderedDict] = None
+        self.total_bytes = 0
+
+    @staticmethod
+    def make_key(text: str, document_type: str, system_prompt: str, model: str, temperature: float) -> str:
+        """Hash everything that determines the extraction result"""
+        payload = json.dumps([text, document_type, system_prompt, model, temperature], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """Cache file for a key (sharded by the first two hex digits)"""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def load_entries(self):
+        """Index existing cache files by last use (file mtime), oldest first"""
+        if self.entries is not None:
+            return
+
+        found = []
+        if self.cache_dir.exists():
+            for shard in os.scandir(self.cache_dir):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith('.json'):
+                        stat = entry.stat()
+                        found.append((stat.st_mtime, entry.name[:-5], stat.st_size))
+
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        for _, key, size in sorted(found):
+            self.entries[key] = size
+            self.total_bytes += size
+
+    def contains(self, key: str) -> bool:
+        """True if a key is cached (without reading it or marking it as used)"""
+        if not self.read:
+            return False
+        with self.lock:
+            self.load_entries()
+            return key in self.entries
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached result for a key, or None on a miss"""
+        if not self.read:
+            return None
+
+        path = self.path_for(key)
+        with self.lock:
+            self.load_entries()
+            if key not in self.entries:
+                return None
+            try:
+                value = json.loads(path.read_text(encoding='utf-8'))
+                os.utime(path)  # Mark as recently used for the next run
+            except (OSError, ValueError):
+                # Missing or corrupt file: forget it and treat as a miss
+                self.total_bytes -= self.entries.pop(key)
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Dict):
+        """Store a result and evict least recently used entries over the size bound"""
+        if not self.write:
+            return
+
+        data = json.dumps(value, ensure_ascii=False).encode('utf-8')
+        path = self.path_for(key)
+        with self.lock:
+            self.load_entries()
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Write to a temp file first so a crash never leaves a truncated entry
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+            self.total_bytes += len(data) - self.entries.pop(key, 0)
+            self.entries[key] = len(data)
+            self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            key, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                self.path_for(key).unlink()
+            except OSError:
+                pass
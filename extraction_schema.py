@@ -0,0 +1,172 @@
+"""
+Extraction Schema for the HiveMind Knowledge Builder
+The ontology's JSON answer format as a schema, compiled once into a validator
+that repairs what it can (numbers where strings belong, a single string where a
+list belongs) and drops malformed entities instead of rejecting the whole answer.
+Also builds the follow-up prompt that asks only for the part of a truncated
+answer that is missing.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Entity lists in the order the extraction prompt asks for them
+ENTITY_KEYS = ('people', 'organizations', 'technologies', 'topics', 'meetings', 'relationships')
+
+STRING = {'type': 'string'}
+OPTIONAL_STRING = {'type': 'string', 'nullable': True}
+STRING_LIST = {'type': 'array', 'items': STRING}
+
+ONTOLOGY_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'people': {'type': 'array', 'items': {
+            'type': 'object',
+            'required': ['name'],
+            'properties': {'name': STRING, 'role': OPTIONAL_STRING, 'company': OPTIONAL_STRING,
+                           'location': OPTIONAL_STRING, 'skills': STRING_LIST}
+        }},
+        'organizations': STRING_LIST,
+        'technologies': STRING_LIST,
+        'topics': STRING_LIST,
+        'meetings': {'type': 'array', 'items': {
+            'type': 'object',
+            'required': ['title'],
+            'properties': {'title': STRING, 'date': OPTIONAL_STRING,
+                           'attendees': STRING_LIST, 'topics': STRING_LIST}
+        }},
+        'relationships': {'type': 'array', 'items': {
+            'type': 'object',
+            'required': ['type', 'source', 'target'],
+            'properties': {'type': STRING, 'source': STRING, 'target': STRING}
+        }}
+    }
+}
+
+
+class Invalid(Exception):
+    """A value that cannot be repaired; its container drops it"""
+
+
+def compile_schema(schema: Dict) -> Callable:
+    """Turn a schema into a function check(value, path, errors) returning the repaired value
+
+    Raises Invalid for values that must be dropped; every repair or drop is appended to errors.
+    """
+    kind = schema['type']
+
+    if kind == 'string':
+        nullable = schema.get('nullable', False)
+
+        def check_string(value, path: str, errors: List[str]):
+            if isinstance(value, str):
+                if not value.strip() and not nullable:
+                    raise Invalid(f"{path}: empty")
+                return value
+            if value is None and nullable:
+                return value
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                errors.append(f"{path}: number converted to text")
+                return str(value)
+            raise Invalid(f"{path}: expected text, got {type(value).__name__}")
+        return check_string
+
+    if kind == 'array':
+        check_item = compile_schema(schema['items'])
+
+        def check_array(value, path: str, errors: List[str]):
+            if value is None:
+                errors.append(f"{path}: null replaced by []")
+                return []
+            if not isinstance(value, list):
+                if isinstance(value, (str, dict)):
+                    errors.append(f"{path}: single value wrapped in a list")
+                    value = [value]
+                else:
+                    raise Invalid(f"{path}: expected a list, got {type(value).__name__}")
+            items = []
+            for position, item in enumerate(value):
+                try:
+                    items.append(check_item(item, f"{path}[{position}]", errors))
+                except Invalid as e:
+                    errors.append(f"{e} (dropped)")
+            return items
+        return check_array
+
+    if kind == 'object':
+        required = set(schema.get('required', []))
+        properties = {name: compile_schema(sub) for name, sub in schema.get('properties', {}).items()}
+
+        def check_object(value, path: str, errors: List[str]):
+            if not isinstance(value, dict):
+                raise Invalid(f"{path}: expected an object, got {type(value).__name__}")
+            for name in required:
+                if name not in value:
+                    raise Invalid(f"{path}: missing '{name}'")
+            checked = dict(value)  # Properties outside the schema are kept as they are
+            for name, check_property in properties.items():
+                if name not in value:
+                    continue
+                try:
+                    checked[name] = check_property(value[name], f"{path}.{name}" if path else name, errors)
+                except Invalid as e:
+                    if name in required:
+                        raise
+                    errors.append(f"{e} (dropped)")
+                    del checked[name]
+            return checked
+        return check_object
+
+    raise ValueError(f"unsupported schema type: {kind}")
+
+
+check_ontology = compile_schema(ONTOLOGY_SCHEMA)
+check_entities = {key: compile_schema(ONTOLOGY_SCHEMA['properties'][key]['items']) for key in ENTITY_KEYS}
+
+
+def validate_extraction(entities) -> Tuple[Dict, List[str]]:
+    """(repaired entities, list of repairs and dropped values); the answer itself must be an object"""
+    errors: List[str] = []
+    try:
+        return check_ontology(entities, "", errors), errors
+    except Invalid as e:
+        return {}, [str(e).lstrip(': ') or "not a JSON object"]
+
+
+def check_entity(category: str, entity) -> Optional[object]:
+    """A single streamed entity of an entity list, repaired, or None if it is malformed"""
+    try:
+        return check_entities[category](entity, category, [])
+    except Invalid:
+        return None
+
+
+def continuation_prompt(user_prompt: str, entities: Dict, complete_keys: Iterable[str],
+                        open_key: Optional[str]) -> str:
+    """Follow-up request for the entity lists missing from a truncated answer
+
+    Lists already complete are not asked for again; for the list that was cut off
+    (open_key), the entities already received are named so only the rest is returned.
+    """
+    complete = [key for key in ENTITY_KEYS if key in complete_keys]
+    remaining = [key for key in ENTITY_KEYS if key not in complete]
+
+    received = ""
+    if open_key in ENTITY_KEYS and entities.get(open_key):
+        names = [entity_label(entity) for entity in entities[open_key]]
+        received = f"\nAlready received in \"{open_key}\" (do not repeat): {'; '.join(names)}"
+
+    return f"""{user_prompt}
+
+Your previous answer was cut off before it was complete.
+Already complete (do not return again): {', '.join(complete) or 'none'}{received}
+Return the same JSON format with only these keys: {', '.join(remaining)}, containing only entities not received yet."""
+
+
+def entity_label(entity) -> str:
+    """Short identification of an entity for the continuation prompt"""
+    if isinstance(entity, dict):
+        if 'type' in entity and 'source' in entity:
+            return f"{entity.get('source')} {entity.get('type')} {entity.get('target')}"
+        return str(entity.get('name') or entity.get('title'))
+    return str(entity)
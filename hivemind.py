@@ -24,7 +24,8 @@ from knowledge_tools import (
     find_entity_knowledge,
     get_knowledge_summary,
     find_relationships,
-    get_entity_network
+    get_entity_network,
+    knowledge_base_changed
 )
 
 
@@ -85,6 +86,7 @@ def create_markdown_file(
     
     try:
         file_path.write_text(content, encoding="utf-8")
+        knowledge_base_changed(MARKDOWN_DIR)
         return f"Successfully created '{filename}' with {len(content)} characters."
     except Exception as e:
         return f"Error creating file: {str(e)}"
@@ -102,6 +104,7 @@ def update_markdown_file(
     
     try:
         file_path.write_text(content, encoding="utf-8")
+        knowledge_base_changed(MARKDOWN_DIR)
         return f"Successfully updated '{filename}' with {len(content)} characters."
     except Exception as e:
         return f"Error updating file: {str(e)}"
@@ -120,6 +123,7 @@ def append_to_markdown_file(
     try:
         with open(file_path, "a", encoding="utf-8") as f:
             f.write(f"\n\n{content}")
+        knowledge_base_changed(MARKDOWN_DIR)
         return f"Successfully appended {len(content)} characters to '{filename}'."
     except Exception as e:
         return f"Error appending to file: {str(e)}"
@@ -136,6 +140,7 @@ def delete_markdown_file(
     
     try:
         file_path.unlink()
+        knowledge_base_changed(MARKDOWN_DIR)
         return f"Successfully deleted '{filename}'."
     except Exception as e:
         return f"Error deleting file: {str(e)}"
@@ -210,7 +215,7 @@ KNOWLEDGE BASE (Time-Aware Query System with Relationships):
 - Find knowledge about specific entities (people, organizations, technologies, topics)
 - Full-text search across all ingested knowledge
 - Get summaries and overviews of the knowledge base
-- **NEW: Find relationships between entities** (who works where, who uses what tech, who attended meetings)
+- **NEW: Find relationships between entities** (who works where, who uses what tech, who attended meetings; use direction='incoming' for inverse questions such as who works for an organization or which organizations use a technology)
 - **NEW: Explore entity networks** (discover connections between people, orgs, and technologies)
 
 MARKDOWN FILES (Active Working Documents):
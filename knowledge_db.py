@@ -0,0 +1,313 @@
+"""
+Knowledge Database for the HiveMind Knowledge Builder
+A single SQLite file next to the markdown pages, written by every build: an
+entities table (one row per page with its frontmatter and body), the
+relationships between entities, and an FTS5 index over page names,
+frontmatter and bodies. Every page in the query categories is indexed,
+including pages written by hand. KnowledgeQuery answers from it while every
+page still has the mtime and size recorded at the last sync, so cold-start
+queries do not read every page.
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from knowledge_index import FIELD_WEIGHTS, UNINDEXED_FRONTMATTER, parse_query
+from knowledge_snapshot import CATEGORY_DIRS, CHECK_INTERVAL_SECONDS, list_pages, parse_markdown
+
+DATABASE_NAME = ".hivemind_knowledge.db"
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,                -- relative to the knowledge base root
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT,
+    sha256 TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,                -- file stat at the last sync, compared by is_current
+    size INTEGER NOT NULL,
+    frontmatter TEXT NOT NULL,                -- JSON
+    fields TEXT NOT NULL,                     -- indexed frontmatter values
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entities_category ON entities(category);
+
+CREATE TABLE IF NOT EXISTS relationships (
+    id INTEGER PRIMARY KEY,
+    type TEXT,
+    source TEXT,
+    target TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_relationships_source ON relationships(source);
+CREATE INDEX IF NOT EXISTS idx_relationships_target ON relationships(target);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS entities_fts USING fts5(
+    name, fields, content, content='entities', content_rowid='id'
+);
+
+-- Keep the full-text index in step with the entities table
+CREATE TRIGGER IF NOT EXISTS entities_insert AFTER INSERT ON entities BEGIN
+    INSERT INTO entities_fts(rowid, name, fields, content) VALUES (new.id, new.name, new.fields, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS entities_delete AFTER DELETE ON entities BEGIN
+    INSERT INTO entities_fts(entities_fts, rowid, name, fields, content)
+    VALUES ('delete', old.id, old.name, old.fields, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS entities_update AFTER UPDATE ON entities BEGIN
+    INSERT INTO entities_fts(entities_fts, rowid, name, fields, content)
+    VALUES ('delete', old.id, old.name, old.fields, old.content);
+    INSERT INTO entities_fts(rowid, name, fields, content) VALUES (new.id, new.name, new.fields, new.content);
+END;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def fts5_available() -> bool:
+    """True if this Python's SQLite was compiled with FTS5"""
+    try:
+        sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE probe USING fts5(text)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+FTS5_AVAILABLE = fts5_available()
+
+
+def fts_query(query: str) -> str:
+    """The search syntax of knowledge_index.py (words, "phrases", prefix*) as an FTS5 query
+
+    Every token is quoted, so FTS5 operators and punctuation in the input cannot break the query.
+    """
+    clauses = []
+    for kind, tokens in parse_query(query):
+        phrase = '"' + ' '.join(tokens) + '"'
+        clauses.append(phrase + '*' if kind == 'prefix' else phrase)
+    return ' '.join(clauses)
+
+
+class KnowledgeDatabase:
+    """Entities, relationships and full-text index of a knowledge base in SQLite"""
+
+    def __init__(self, db_path: Path, check_interval: float = CHECK_INTERVAL_SECONDS):
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+        self.check_interval = check_interval
+        self.checked: Optional[Tuple[float, bool]] = None  # (time, result) of the last is_current check
+
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, SCHEMA_VERSION):
+                for table in ('entities_fts', 'entities', 'relationships', 'meta'):
+                    self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # --- Builder ---
+
+    def sync(self, kb_dir: Path, relationships: List[Dict]) -> Dict[str, int]:
+        """Make the database match the pages on disk in one transaction
+
+        Every page of the query categories is indexed, whether the builder or a person wrote
+        it. Pages whose mtime and size are unchanged are skipped without being read, and only
+        pages whose content hash changed are re-parsed and re-indexed.
+        """
+        counts = {'updated': 0, 'unchanged': 0, 'removed': 0}
+        with self.lock, self.conn:
+            stored = {row['path']: (row['sha256'], (row['mtime_ns'], row['size']))
+                      for row in self.conn.execute("SELECT path, sha256, mtime_ns, size FROM entities")}
+            current = set()
+            for category, directory in CATEGORY_DIRS.items():
+                for file_path, signature in list_pages(kb_dir / directory):
+                    path = file_path.relative_to(kb_dir).as_posix()
+                    stored_hash, stored_signature = stored.get(path, (None, None))
+                    if stored_signature == signature:
+                        current.add(path)
+                        counts['unchanged'] += 1
+                        continue
+                    try:
+                        page = file_path.read_text(encoding='utf-8')
+                    except FileNotFoundError:
+                        continue
+                    current.add(path)
+                    content_hash = hashlib.sha256(page.encode('utf-8')).hexdigest()
+                    if stored_hash == content_hash:
+                        # Touched but not changed
+                        self.conn.execute("UPDATE entities SET mtime_ns = ?, size = ? WHERE path = ?",
+                                          signature + (path,))
+                        counts['unchanged'] += 1
+                        continue
+                    frontmatter, body = parse_markdown(page)
+                    fields = ' '.join(value for key, value in frontmatter.items() if key not in UNINDEXED_FRONTMATTER)
+                    self.conn.execute("""
+                        INSERT INTO entities (path, category, name, type, sha256, mtime_ns, size, frontmatter, fields, content)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(path) DO UPDATE SET category = excluded.category, name = excluded.name,
+                            type = excluded.type, sha256 = excluded.sha256, mtime_ns = excluded.mtime_ns,
+                            size = excluded.size, frontmatter = excluded.frontmatter,
+                            fields = excluded.fields, content = excluded.content
+                    """, (path, category, frontmatter.get('name', file_path.stem), frontmatter.get('type', category),
+                          content_hash) + signature + (json.dumps(frontmatter), fields, body))
+                    counts['updated'] += 1
+
+            removed = [(path,) for path in stored if path not in current]
+            self.conn.executemany("DELETE FROM entities WHERE path = ?", removed)
+            counts['removed'] = len(removed)
+
+            self.conn.execute("DELETE FROM relationships")
+            self.conn.executemany("INSERT INTO relationships (type, source, target) VALUES (?, ?, ?)", [
+                (rel.get('type'), rel.get('source'), rel.get('target')) for rel in relationships
+            ])
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('synced_ns', ?)",
+                              (str(time.time_ns()),))
+            self.checked = None
+        return counts
+
+    # --- Queries ---
+
+    def is_current(self, kb_dir: Path) -> bool:
+        """False if a page was added, removed or edited since the last sync
+
+        Compares every page's mtime and size with the values stored by sync (an edit in place
+        does not change the directory's mtime). The result is reused for check_interval
+        seconds, or until invalidate().
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.checked and now - self.checked[0] < self.check_interval:
+                return self.checked[1]
+            if self.synced() is None:
+                current = False
+            else:
+                stored = {row['path']: (row['mtime_ns'], row['size'])
+                          for row in self.conn.execute("SELECT path, mtime_ns, size FROM entities")}
+                on_disk = {file_path.relative_to(kb_dir).as_posix(): signature
+                           for directory in CATEGORY_DIRS.values()
+                           for file_path, signature in list_pages(kb_dir / directory)}
+                current = on_disk == stored
+            self.checked = (now, current)
+            return current
+
+    def invalidate(self):
+        """Check the pages again on the next is_current (after a page was written in this process)"""
+        with self.lock:
+            self.checked = None
+
+    def artifacts(self, kb_dir: Path, category: str, name_contains: Optional[str] = None) -> List[Dict]:
+        """Artifacts of a category, optionally only those whose name contains a text (case-insensitive)"""
+        with self.lock:
+            if name_contains is None:
+                rows = self.conn.execute("SELECT * FROM entities WHERE category = ? ORDER BY id",
+                                         (category.lower(),)).fetchall()
+            else:
+                # Names are matched with Python's lower(); SQLite's only folds ASCII letters
+                ids = [row[0] for row in self.conn.execute(
+                    "SELECT id, name FROM entities WHERE category = ? ORDER BY id", (category.lower(),))
+                    if name_contains.lower() in row[1].lower()]
+                rows = [self.conn.execute("SELECT * FROM entities WHERE id = ?", (entity_id,)).fetchone()
+                        for entity_id in ids]
+        return [self.artifact(kb_dir, row) for row in rows]
+
+    def synced(self) -> Optional[int]:
+        """Time of the last build's sync (ns), identifying the database's current contents"""
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'synced_ns'").fetchone()
+        return int(row[0]) if row else None
+
+    def relationships(self) -> List[tuple]:
+        """(type, source, target) of every extracted relationship"""
+        with self.lock:
+            return [tuple(row) for row in self.conn.execute("SELECT type, source, target FROM relationships ORDER BY id")]
+
+    def names(self, category: str) -> List[str]:
+        with self.lock:
+            return [row[0] for row in self.conn.execute(
+                "SELECT name FROM entities WHERE category = ? ORDER BY id", (category.lower(),))]
+
+    def search(self, kb_dir: Path, query: str, categories: Iterable[str]) -> List[Dict]:
+        """Artifacts of the given categories matching the query, most relevant first
+
+        FTS5's bm25() normalizes by the length of the whole page, so a long page named after
+        the query can rank below short pages that mention it; pages whose name matches the
+        query therefore come first (the most specific name first), then the rest by bm25.
+        """
+        match = fts_query(query)
+        categories = [category.lower() for category in categories]
+        if not match or not categories:
+            return []
+        weights = ', '.join(str(weight) for weight in FIELD_WEIGHTS)
+        with self.lock:
+            rows = self.conn.execute(f"""
+                SELECT entities.*, entities.id IN (
+                    SELECT rowid FROM entities_fts WHERE entities_fts MATCH ?
+                ) AS name_match
+                FROM entities_fts JOIN entities ON entities.id = entities_fts.rowid
+                WHERE entities_fts MATCH ? AND entities.category IN ({', '.join('?' * len(categories))})
+                ORDER BY name_match DESC, CASE WHEN name_match THEN length(entities.name) END,
+                         bm25(entities_fts, {weights})
+            """, [f"name : ({match})", match] + categories).fetchall()
+        return [self.artifact(kb_dir, row) for row in rows]
+
+    @staticmethod
+    def artifact(kb_dir: Path, row: sqlite3.Row) -> Dict:
+        return {
+            'category': row['category'],
+            'source': str(kb_dir / row['path']),
+            'name': row['name'],
+            'type': row['type'],
+            'frontmatter': json.loads(row['frontmatter']),
+            'content': row['content']
+        }
+
+
+_databases: Dict[str, tuple] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(kb_dir: Path) -> Optional[KnowledgeDatabase]:
+    """The process-wide connection to a knowledge base's database, or None if there is none"""
+    db_path = Path(kb_dir) / DATABASE_NAME
+    if not FTS5_AVAILABLE:
+        return None
+    try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+    key = os.path.abspath(db_path)
+    with _databases_lock:
+        identity, database = _databases.get(key, (None, None))
+        # Reopen if the file was replaced (e.g. deleted and rebuilt)
+        if identity != (stat.st_dev, stat.st_ino):
+            if database is not None:
+                database.close()
+            database = KnowledgeDatabase(db_path)
+            _databases[key] = ((stat.st_dev, stat.st_ino), database)
+        return database
+
+
+def invalidate_database(kb_dir: Path):
+    """Make an open database of a knowledge base re-check its pages on the next query"""
+    with _databases_lock:
+        _, database = _databases.get(os.path.abspath(Path(kb_dir) / DATABASE_NAME), (None, None))
+    if database is not None:
+        database.invalidate()
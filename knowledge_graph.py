@@ -0,0 +1,196 @@
+"""
+Knowledge Graph - Relationship graph of the knowledge base
+Entities are integer node ids; typed edges are kept deduplicated in forward
+(source -> targets) and reverse (target -> sources) adjacency lists, so both
+outgoing and incoming relationships of a node are found in O(degree).
+Multi-hop questions ("connections of connections") run as a bounded
+breadth-first traversal with depth, edge-type and fan-out limits.
+"""
+
+import os
+import ast
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+OUTGOING = 'outgoing'
+INCOMING = 'incoming'
+BOTH = 'both'
+
+# Most neighbours expanded per node, and most entities returned by a traversal
+MAX_FANOUT = int(os.getenv("HIVEMIND_GRAPH_MAX_FANOUT", "50"))
+MAX_NODES = int(os.getenv("HIVEMIND_GRAPH_MAX_NODES", "500"))
+
+# Most entities a name that is not an exact match may resolve to
+MAX_NAME_MATCHES = 20
+
+# Categories whose page frontmatter holds relationships
+GRAPH_CATEGORIES = ('people', 'organizations', 'meetings')
+
+# Frontmatter key -> (edge type, True if the page is the edge's target)
+FRONTMATTER_EDGES = {
+    'works_for': ('works_for', False),
+    'attended': ('attended', False),
+    'employs': ('works_for', True),
+    'uses_technologies': ('uses', False),
+    'attendees': ('attended', True)
+}
+
+
+def node_key(name: str) -> str:
+    """Case- and whitespace-insensitive identity of an entity name"""
+    return ' '.join(name.split()).lower()
+
+
+def frontmatter_list(value) -> List[str]:
+    """Names in a frontmatter value: a single name or a list written as ['a', 'b']"""
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    value = str(value).strip()
+    if value.startswith('['):
+        try:
+            return [str(item) for item in ast.literal_eval(value)]
+        except (ValueError, SyntaxError):
+            return [item.strip(" '\"") for item in value.strip('[]').split(',') if item.strip(" '\"")]
+    return [value] if value else []
+
+
+def frontmatter_edges(artifacts: Iterable[Dict]) -> List[Tuple[str, str, str]]:
+    """(type, source, target) relationships written into page frontmatter by the builder
+
+    Used when there is no current knowledge database; inverse keys (an organization's
+    employs, a meeting's attendees) are turned back into the extracted edge direction.
+    """
+    edges = []
+    for artifact in artifacts:
+        frontmatter = artifact['frontmatter']
+        name = artifact['name']
+        if artifact['category'] == 'meetings':
+            name = frontmatter.get('title') or name  # Relationships name meetings by title
+        for key, value in frontmatter.items():
+            if key not in FRONTMATTER_EDGES:
+                continue
+            edge_type, inverse = FRONTMATTER_EDGES[key]
+            for other in frontmatter_list(value):
+                edges.append((edge_type, other, name) if inverse else (edge_type, name, other))
+    return edges
+
+
+class KnowledgeGraph:
+    """Typed, deduplicated adjacency lists over integer node ids"""
+
+    def __init__(self, edges: Iterable[Tuple[str, str, str]] = ()):
+        self.ids: Dict[str, int] = {}      # node key -> id
+        self.names: List[str] = []         # id -> name as first seen
+        self.type_ids: Dict[str, int] = {}
+        self.type_names: List[str] = []
+        # id -> {edge type id: {neighbour id: None}} (dicts as insertion-ordered sets)
+        self.forward: List[Dict[int, Dict[int, None]]] = []
+        self.reverse: List[Dict[int, Dict[int, None]]] = []
+        self.edge_count = 0
+        for edge_type, source, target in edges:
+            self.add_edge(edge_type, source, target)
+
+    def add_node(self, name: str) -> int:
+        key = node_key(name)
+        node = self.ids.get(key)
+        if node is None:
+            node = self.ids[key] = len(self.names)
+            self.names.append(name.strip())
+            self.forward.append({})
+            self.reverse.append({})
+        return node
+
+    def add_edge(self, edge_type: str, source: str, target: str):
+        """Add a relationship; repeated and incomplete edges are ignored"""
+        if not edge_type or not isinstance(source, str) or not isinstance(target, str):
+            return
+        if not source.strip() or not target.strip():
+            return
+        type_id = self.type_ids.get(edge_type)
+        if type_id is None:
+            type_id = self.type_ids[edge_type] = len(self.type_names)
+            self.type_names.append(edge_type)
+        source_id, target_id = self.add_node(source), self.add_node(target)
+        targets = self.forward[source_id].setdefault(type_id, {})
+        if target_id not in targets:
+            targets[target_id] = None
+            self.reverse[target_id].setdefault(type_id, {})[source_id] = None
+            self.edge_count += 1
+
+    def match(self, name: str) -> List[int]:
+        """Nodes for a name: the exact entity if there is one, else those whose name contains it"""
+        key = node_key(name)
+        if key in self.ids:
+            return [self.ids[key]]
+        if not key:
+            return []
+        return [node for node_name, node in self.ids.items() if key in node_name][:MAX_NAME_MATCHES]
+
+    def neighbors(self, node: int, direction: str = BOTH, edge_types: Optional[Iterable[str]] = None):
+        """(edge type, neighbour id, incoming) of a node's edges in the given direction"""
+        type_ids = None
+        if edge_types is not None:
+            type_ids = {self.type_ids[t] for t in edge_types if t in self.type_ids}
+        for incoming, adjacency in ((False, self.forward), (True, self.reverse)):
+            if direction == (OUTGOING if incoming else INCOMING):
+                continue
+            for type_id, neighbors in adjacency[node].items():
+                if type_ids is None or type_id in type_ids:
+                    edge_type = self.type_names[type_id]
+                    for neighbor in neighbors:
+                        yield edge_type, neighbor, incoming
+
+    def edges(self, node: int, direction: str = BOTH,
+              edge_types: Optional[Iterable[str]] = None) -> List[Tuple[str, str, str]]:
+        """(source, type, target) of a node's relationships, outgoing first; O(degree)"""
+        return [(self.names[neighbor], edge_type, self.names[node]) if incoming
+                else (self.names[node], edge_type, self.names[neighbor])
+                for edge_type, neighbor, incoming in self.neighbors(node, direction, edge_types)]
+
+    def traverse(self, starts: List[int], depth: int, direction: str = BOTH,
+                 edge_types: Optional[Iterable[str]] = None, max_fanout: int = MAX_FANOUT,
+                 max_nodes: int = MAX_NODES) -> Tuple[List[Dict], bool]:
+        """Breadth-first search from the start nodes, up to depth hops
+
+        Returns each reached entity once, nearest first, as {'node', 'name', 'depth', 'via',
+        'type', 'incoming'} (the edge it was first reached by), and whether a fan-out or
+        size limit cut the traversal short.
+        """
+        edge_types = list(edge_types) if edge_types is not None else None
+        visited = set(starts)
+        frontier = list(starts)
+        found = []
+        truncated = False
+        for level in range(1, depth + 1):
+            next_frontier = []
+            for node in frontier:
+                expanded = 0
+                for edge_type, neighbor, incoming in self.neighbors(node, direction, edge_types):
+                    if neighbor in visited:
+                        continue
+                    if expanded >= max_fanout or len(found) >= max_nodes:
+                        truncated = True
+                        break
+                    visited.add(neighbor)
+                    found.append({'node': neighbor, 'name': self.names[neighbor], 'depth': level,
+                                  'via': self.names[node], 'type': edge_type, 'incoming': incoming})
+                    next_frontier.append(neighbor)
+                    expanded += 1
+            frontier = next_frontier
+            if not frontier:
+                break
+        return found, truncated
+
+
+_graphs: Dict[str, tuple] = {}
+_graphs_lock = threading.Lock()
+
+
+def get_graph(kb_key: str, version, load_edges: Callable[[], Iterable[Tuple[str, str, str]]]) -> KnowledgeGraph:
+    """The process-wide graph of a knowledge base, rebuilt from load_edges() when version changes"""
+    with _graphs_lock:
+        cached_version, graph = _graphs.get(kb_key, (None, None))
+        if graph is None or cached_version != version:
+            graph = KnowledgeGraph(load_edges())
+            _graphs[kb_key] = (version, graph)
+        return graph
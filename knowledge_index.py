@@ -0,0 +1,215 @@
+"""
+Knowledge Index - Ranked full-text search over the knowledge base
+A tokenized inverted index over each page's name, frontmatter and body,
+scored with field-weighted BM25 (BM25F). Queries match whole words, "quoted
+phrases" and prefix* terms; pages are added, replaced and removed one at a
+time, so the index follows the knowledge snapshot as pages change.
+"""
+
+import re
+import math
+import heapq
+import bisect
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+FIELDS = ('name', 'frontmatter', 'body')
+
+# A match in the name counts more than one in the frontmatter or body
+FIELD_WEIGHTS = (6.0, 1.0, 1.0)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Frontmatter keys that describe the page file rather than its subject
+UNINDEXED_FRONTMATTER = {'name', 'source', 'created'}
+
+# Most vocabulary terms a prefix* query expands to
+MAX_PREFIX_TERMS = 500
+
+TOKEN_PATTERN = re.compile(r'\w+')
+CLAUSE_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def parse_query(query: str) -> List[Tuple[str, List[str]]]:
+    """Clauses of a query: ('term', [t]), ('prefix', [p]) or ('phrase', [t1, t2, ...])
+
+    A word that splits into several tokens (e.g. "Van-Geel") is a phrase.
+    """
+    clauses = []
+    for phrase, word in CLAUSE_PATTERN.findall(query):
+        if phrase:
+            tokens = tokenize(phrase)
+        elif word.endswith('*') and len(tokenize(word)) == 1:
+            clauses.append(('prefix', tokenize(word)))
+            continue
+        else:
+            tokens = tokenize(word)
+        if len(tokens) == 1:
+            clauses.append(('term', tokens))
+        elif tokens:
+            clauses.append(('phrase', tokens))
+    return clauses
+
+
+class KnowledgeIndex:
+    """Inverted index of pages keyed by their file path"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}      # key -> document id
+        self.documents: Dict[int, Dict] = {}
+        # term -> {document id: [name tf, frontmatter tf, body tf, positions]}; positions run
+        # over name, frontmatter and body with a gap between fields, so phrases never span two
+        self.postings: Dict[str, Dict[int, list]] = {}
+        self.sorted_terms: Optional[List[str]] = None  # For prefix queries, sorted on demand
+        self.field_totals = [0] * len(FIELDS)
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, key: str, category: str, name: str, frontmatter: Dict[str, str], body: str):
+        """Index a page, replacing an earlier version with the same key"""
+        self.remove(key)
+        fields = (
+            tokenize(name),
+            tokenize(' '.join(value for field, value in frontmatter.items() if field not in UNINDEXED_FRONTMATTER)),
+            tokenize(body)
+        )
+
+        entries: Dict[str, list] = {}
+        position = 0
+        for field, tokens in enumerate(fields):
+            for token in tokens:
+                entry = entries.get(token)
+                if entry is None:
+                    entry = entries[token] = [0, 0, 0, []]
+                entry[field] += 1
+                entry[3].append(position)
+                position += 1
+            position += 1
+
+        doc_id = self.next_id
+        self.next_id += 1
+        for token, entry in entries.items():
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = {}
+                self.sorted_terms = None
+            postings[doc_id] = entry
+
+        lengths = tuple(len(tokens) for tokens in fields)
+        for field, length in enumerate(lengths):
+            self.field_totals[field] += length
+        self.ids[key] = doc_id
+        self.documents[doc_id] = {'key': key, 'category': category, 'lengths': lengths, 'terms': list(entries)}
+
+    def remove(self, key: str):
+        doc_id = self.ids.pop(key, None)
+        if doc_id is None:
+            return
+        document = self.documents.pop(doc_id)
+        for field, length in enumerate(document['lengths']):
+            self.field_totals[field] -= length
+        for term in document['terms']:
+            postings = self.postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self.postings[term]
+                self.sorted_terms = None
+
+    def search(self, query: str, categories: Optional[Iterable[str]] = None,
+               limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(key, score) of pages matching every clause of the query, best first"""
+        clauses = parse_query(query)
+        if not clauses or not self.documents:
+            return []
+
+        # Each clause gives {document id: [tf per field, ...]}; intersect starting with the rarest
+        matches = sorted((self.clause_matches(kind, tokens) for kind, tokens in clauses), key=len)
+        candidates = matches[0].keys()
+        for clause in matches[1:]:
+            candidates = candidates & clause.keys()
+        if categories is not None:
+            categories = set(categories)
+            candidates = [doc_id for doc_id in candidates if self.documents[doc_id]['category'] in categories]
+        if not candidates:
+            return []
+
+        total = len(self.documents)
+        averages = [max(1.0, field_total / total) for field_total in self.field_totals]
+        idfs = [math.log(1 + (total - len(clause) + 0.5) / (len(clause) + 0.5)) for clause in matches]
+        name_weight, frontmatter_weight, body_weight = FIELD_WEIGHTS
+        ranked = []
+        for doc_id in candidates:
+            document = self.documents[doc_id]
+            name_length, frontmatter_length, body_length = document['lengths']
+            # Weight over BM25 length normalization, per field
+            name_factor = name_weight / (1 - BM25_B + BM25_B * name_length / averages[0])
+            frontmatter_factor = frontmatter_weight / (1 - BM25_B + BM25_B * frontmatter_length / averages[1])
+            body_factor = body_weight / (1 - BM25_B + BM25_B * body_length / averages[2])
+            score = 0.0
+            for idf, clause in zip(idfs, matches):
+                tf = clause[doc_id]
+                weighted = tf[0] * name_factor + tf[1] * frontmatter_factor + tf[2] * body_factor
+                score += idf * weighted / (BM25_K1 + weighted)
+            ranked.append((document['key'], score))
+
+        if limit is not None:
+            return heapq.nlargest(limit, ranked, key=lambda hit: hit[1])
+        ranked.sort(key=lambda hit: hit[1], reverse=True)
+        return ranked
+
+    def clause_matches(self, kind: str, tokens: List[str]) -> Dict[int, list]:
+        """{document id: [name tf, frontmatter tf, body tf, positions]} where a term, prefix or phrase occurs"""
+        if kind == 'term':
+            return self.postings.get(tokens[0], {})
+
+        if kind == 'prefix':
+            if self.sorted_terms is None:
+                self.sorted_terms = sorted(self.postings)
+            prefix = tokens[0]
+            start = bisect.bisect_left(self.sorted_terms, prefix)
+            matches: Dict[int, list] = {}
+            for term in self.sorted_terms[start:start + MAX_PREFIX_TERMS]:
+                if not term.startswith(prefix):
+                    break
+                for doc_id, entry in self.postings[term].items():
+                    match = matches.get(doc_id)
+                    if match is None:
+                        matches[doc_id] = [entry[0], entry[1], entry[2], entry[3]]
+                    else:
+                        match[0] += entry[0]
+                        match[1] += entry[1]
+                        match[2] += entry[2]
+                        match[3] = sorted(match[3] + entry[3])
+            return matches
+
+        # Phrase: positions of the first token followed by the others in order
+        postings = sorted((self.postings.get(token) or {} for token in tokens), key=len)
+        documents = postings[0].keys()
+        for term_postings in postings[1:]:
+            documents = documents & term_postings.keys()
+        first = self.postings[tokens[0]] if documents else {}
+        following = [self.postings[token] for token in tokens[1:]]
+        matches = {}
+        for doc_id in documents:
+            starts = set(first[doc_id][3])
+            for offset, term_postings in enumerate(following, 1):
+                starts.intersection_update(position - offset for position in term_postings[doc_id][3])
+                if not starts:
+                    break
+            if starts:
+                matches[doc_id] = self.field_counts(doc_id, sorted(starts))
+        return matches
+
+    def field_counts(self, doc_id: int, positions: List[int]) -> list:
+        """[name tf, frontmatter tf, body tf, positions] for match positions in a document"""
+        name_length, frontmatter_length, _ = self.documents[doc_id]['lengths']
+        in_name = bisect.bisect_left(positions, name_length)
+        in_frontmatter = bisect.bisect_left(positions, name_length + 1 + frontmatter_length) - in_name
+        return [in_name, in_frontmatter, len(positions) - in_name - in_frontmatter, positions]
@@ -0,0 +1,169 @@
+"""
+Knowledge Snapshot - Shared in-memory view of the knowledge base
+Parses every markdown page once and keeps its frontmatter and body in memory
+for all KnowledgeQuery instances of the process. A query re-scans a category
+directory at most every CHECK_INTERVAL_SECONDS (or after invalidate()) and reads
+again only the pages whose mtime or size changed, so agent tool calls become
+in-memory lookups. Page text is kept in a ranked
+search index (knowledge_index.py) that is updated along with the pages.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from knowledge_index import KnowledgeIndex
+
+
+# Category -> directory below the knowledge base root
+CATEGORY_DIRS = {
+    'people': Path('entities') / 'people',
+    'organizations': Path('entities') / 'organizations',
+    'technologies': Path('entities') / 'technologies',
+    'topics': Path('entities') / 'topics',
+    'meetings': Path('events') / 'meetings',
+    'decisions': Path('events') / 'decisions',
+    'milestones': Path('events') / 'milestones'
+}
+
+# Minimum seconds between two scans of a category directory (0 = scan on every query).
+# A scan stats every page, since editing a page in place does not change its directory's mtime
+CHECK_INTERVAL_SECONDS = float(os.getenv("HIVEMIND_SNAPSHOT_CHECK_SECONDS", "2"))
+
+
+def parse_markdown(content: str) -> Tuple[Dict[str, str], str]:
+    """(frontmatter, body) of a markdown page with simple key: value YAML frontmatter"""
+    frontmatter = {}
+    if content.startswith('---'):
+        parts = content.split('---', 2)
+        if len(parts) >= 3:
+            yaml_content = parts[1].strip()
+            for line in yaml_content.split('\n'):
+                if ':' in line:
+                    key, value = line.split(':', 1)
+                    frontmatter[key.strip()] = value.strip()
+
+            # Content is after second ---
+            return frontmatter, parts[2].strip()
+    return frontmatter, content
+
+
+class KnowledgeSnapshot:
+    """Parsed pages of one knowledge base directory, refreshed by mtime/size"""
+
+    def __init__(self, kb_dir: Path, check_interval: float = CHECK_INTERVAL_SECONDS):
+        self.kb_dir = Path(kb_dir)
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.pages: Dict[str, Dict] = {}  # file path -> {'stat', 'artifact'}
+        self.categories: Dict[str, List[Dict]] = {}
+        self.checked: Dict[str, float] = {}  # category -> time of the last scan
+        self.index = KnowledgeIndex()
+        self.version = 0  # Incremented whenever a page is added, changed or removed
+
+    def artifacts(self, category: str) -> List[Dict]:
+        """Artifacts of a category in directory order; the dicts are shared and must not be modified"""
+        category = category.lower()
+        if category not in CATEGORY_DIRS:
+            return []
+        with self.lock:
+            now = time.monotonic()
+            last = self.checked.get(category)
+            if last is None or now - last >= self.check_interval:
+                self.categories[category] = self.scan(category)
+                self.checked[category] = now
+            return list(self.categories[category])
+
+    def invalidate(self):
+        """Re-scan every category on its next query (after a page was written in this process)"""
+        with self.lock:
+            self.checked.clear()
+
+    def search(self, query: str, categories: Iterable[str]) -> List[Dict]:
+        """Artifacts of the given categories matching the query, most relevant first"""
+        categories = [category.lower() for category in categories if category.lower() in CATEGORY_DIRS]
+        for category in categories:
+            self.artifacts(category)  # Refresh the pages (and their index entries)
+        with self.lock:
+            return [self.pages[path]['artifact'] for path, score in self.index.search(query, categories)]
+
+    def scan(self, category: str) -> List[Dict]:
+        """Current pages of a category, re-reading only new or changed files"""
+        category_dir = self.kb_dir / CATEGORY_DIRS[category]
+        prefix = str(category_dir) + os.sep
+        artifacts = []
+        seen = set()
+        for file_path, signature in list_pages(category_dir):
+            path = str(file_path)
+            seen.add(path)
+            page = self.pages.get(path)
+            if page is None or page['stat'] != signature:
+                try:
+                    content = file_path.read_text(encoding='utf-8')
+                except FileNotFoundError:
+                    continue
+                frontmatter, body = parse_markdown(content)
+                page = {'stat': signature, 'artifact': {
+                    'category': category,
+                    'source': path,
+                    'name': frontmatter.get('name', file_path.stem),
+                    'type': frontmatter.get('type', category),
+                    'frontmatter': frontmatter,
+                    'content': body
+                }}
+                self.pages[path] = page
+                self.version += 1
+                self.index.add(path, category, page['artifact']['name'], frontmatter, body)
+            artifacts.append(page['artifact'])
+
+        # Forget pages of this category that were deleted
+        for path in [p for p in self.pages if p.startswith(prefix) and p not in seen]:
+            del self.pages[path]
+            self.version += 1
+            self.index.remove(path)
+        return artifacts
+
+
+def list_pages(category_dir: Path) -> List[Tuple[Path, Tuple[int, int]]]:
+    """(path, (mtime_ns, size)) of the pages in a category directory, in directory order"""
+    try:
+        entries = list(os.scandir(category_dir))
+    except OSError:
+        return []
+
+    pages = []
+    for entry in entries:
+        # Same files as Path.glob('*.md'): no hidden files (the builder's temp files) or templates
+        if not entry.name.endswith('.md') or entry.name.startswith('.') or entry.name == 'TEMPLATE.md':
+            continue
+        try:
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+        except OSError:
+            continue
+        pages.append((category_dir / entry.name, (stat.st_mtime_ns, stat.st_size)))
+    return pages
+
+
+_snapshots: Dict[Tuple[str, str], KnowledgeSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_snapshot(kb_dir: Path) -> KnowledgeSnapshot:
+    """The process-wide snapshot of a knowledge base directory, created on first use"""
+    key = (str(kb_dir), os.path.abspath(kb_dir))
+    with _snapshots_lock:
+        if key not in _snapshots:
+            _snapshots[key] = KnowledgeSnapshot(kb_dir)
+        return _snapshots[key]
+
+
+def invalidate_snapshots(kb_dir: Path):
+    """Re-scan the snapshots of a knowledge base directory, however its path was spelled, on their next query"""
+    with _snapshots_lock:
+        snapshots = [snapshot for (_, path), snapshot in _snapshots.items() if path == os.path.abspath(kb_dir)]
+    for snapshot in snapshots:
+        snapshot.invalidate()
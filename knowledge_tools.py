@@ -3,12 +3,20 @@ Knowledge System Tools - Integration with HiveMind Agent
 Provides tools for querying and managing the time-aware knowledge base
 """
 
+import os
 import json
 import re
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from knowledge_snapshot import get_snapshot, invalidate_snapshots, parse_markdown
+from knowledge_db import KnowledgeDatabase, get_database, invalidate_database
+from knowledge_graph import (
+    KnowledgeGraph, GRAPH_CATEGORIES, FRONTMATTER_EDGES, MAX_FANOUT, MAX_NODES, OUTGOING, INCOMING, BOTH,
+    frontmatter_edges, get_graph
+)
+
 
 class KnowledgeQuery:
     """Query interface for the markdown-based knowledge base"""
@@ -18,66 +26,56 @@ class KnowledgeQuery:
         self.entities_dir = self.kb_dir / "entities"
         self.events_dir = self.kb_dir / "events"
         self.temporal_dir = self.kb_dir / "temporal"
+        self.snapshot = get_snapshot(self.kb_dir)
     
     def parse_markdown_frontmatter(self, file_path: Path) -> Dict[str, Any]:
         """Parse YAML frontmatter and content from markdown file"""
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Extract YAML frontmatter
-        frontmatter = {}
-        if content.startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                yaml_content = parts[1].strip()
-                for line in yaml_content.split('\n'):
-                    if ':' in line:
-                        key, value = line.split(':', 1)
-                        frontmatter[key.strip()] = value.strip()
-                
-                # Content is after second ---
-                body = parts[2].strip()
-            else:
-                body = content
-        else:
-            body = content
-        
+        frontmatter, body = parse_markdown(file_path.read_text(encoding='utf-8'))
         return {
             'frontmatter': frontmatter,
             'content': body,
             'file_path': str(file_path)
         }
     
+    def current_database(self) -> Optional[KnowledgeDatabase]:
+        """The builder's knowledge database if no page was added, removed or edited since it was written"""
+        database = get_database(self.kb_dir)
+        if database is not None and database.is_current(self.kb_dir):
+            return database
+        return None
+    
     def query_by_category(self, category: str) -> List[Dict]:
-        """Retrieve all artifacts from a specific category"""
-        category_map = {
-            'people': self.entities_dir / 'people',
-            'organizations': self.entities_dir / 'organizations',
-            'technologies': self.entities_dir / 'technologies',
-            'topics': self.entities_dir / 'topics',
-            'meetings': self.events_dir / 'meetings',
-            'decisions': self.events_dir / 'decisions',
-            'milestones': self.events_dir / 'milestones'
-        }
+        """Retrieve all artifacts from a specific category
         
-        category_dir = category_map.get(category.lower())
-        if not category_dir or not category_dir.exists():
-            return []
+        Served from the knowledge database when it is current, else from the process-wide
+        snapshot, where pages are only re-read when they change on disk.
+        """
+        database = self.current_database()
+        if database:
+            artifacts = database.artifacts(self.kb_dir, category)
+        else:
+            artifacts = self.snapshot.artifacts(category)
+        if category != category.lower():
+            # Artifacts carry the category as it was asked for
+            artifacts = [dict(artifact, category=category) for artifact in artifacts]
+        return artifacts
+    
+    def graph(self) -> KnowledgeGraph:
+        """Relationship graph, shared by the process and rebuilt only when the knowledge base changes
         
-        artifacts = []
-        for md_file in category_dir.glob('*.md'):
-            if md_file.name == 'TEMPLATE.md':
-                continue
-            parsed = self.parse_markdown_frontmatter(md_file)
-            artifacts.append({
-                'category': category,
-                'source': str(md_file),
-                'name': parsed['frontmatter'].get('name', md_file.stem),
-                'type': parsed['frontmatter'].get('type', category),
-                'frontmatter': parsed['frontmatter'],
-                'content': parsed['content']
-            })
+        Edges come from page frontmatter (e.g. resolved meeting attendees) plus, when the knowledge
+        database is current, every relationship the builder extracted (such as discussed_in).
+        """
+        database = self.current_database()
+        if database:
+            return get_graph(os.path.abspath(self.kb_dir), ('database', database.synced()), lambda: (
+                database.relationships() + frontmatter_edges(
+                    artifact for category in GRAPH_CATEGORIES for artifact in database.artifacts(self.kb_dir, category))
+            ))
         
-        return artifacts
+        artifacts = [artifact for category in GRAPH_CATEGORIES for artifact in self.snapshot.artifacts(category)]
+        return get_graph(os.path.abspath(self.kb_dir), ('snapshot', self.snapshot.version),
+                         lambda: frontmatter_edges(artifacts))
     
     def query_by_temporal_context(self, temporal_context: str) -> List[Dict]:
         """Retrieve artifacts from a specific time period"""
@@ -94,6 +92,13 @@ class KnowledgeQuery:
     
     def query_by_entity(self, entity_type: str, entity_name: str) -> List[Dict]:
         """Find artifacts mentioning a specific entity"""
+        database = self.current_database()
+        if database:
+            matches = database.artifacts(self.kb_dir, entity_type, name_contains=entity_name)
+            if entity_type != entity_type.lower():
+                matches = [dict(artifact, category=entity_type) for artifact in matches]
+            return matches
+        
         matches = self.query_by_category(entity_type)
         
         # Filter by name
@@ -113,43 +118,47 @@ class KnowledgeQuery:
             'total_artifacts': 0
         }
         
-        # Count entities
-        for entity_type in ['people', 'organizations', 'technologies', 'topics']:
-            artifacts = self.query_by_category(entity_type)
-            stats['categories'][entity_type] = [a['name'] for a in artifacts]
-            stats['total_artifacts'] += len(artifacts)
+        database = self.current_database()
         
-        # Count events
-        for event_type in ['meetings', 'decisions', 'milestones']:
-            artifacts = self.query_by_category(event_type)
-            stats['categories'][event_type] = [a['name'] for a in artifacts]
-            stats['total_artifacts'] += len(artifacts)
+        # Count entities, then events
+        for category in ['people', 'organizations', 'technologies', 'topics', 'meetings', 'decisions', 'milestones']:
+            if database:
+                names = database.names(category)
+            else:
+                names = [a['name'] for a in self.query_by_category(category)]
+            stats['categories'][category] = names
+            stats['total_artifacts'] += len(names)
         
         return stats
     
     def search_content(self, query: str, category: str = None) -> List[Dict]:
-        """Search for text across artifacts"""
-        results = []
+        """Search for text across artifacts, most relevant first
         
+        Pages must contain every word of the query (in the name, frontmatter or body);
+        "quoted phrases" must appear as written and word* matches any word starting with it.
+        """
         # Determine which categories to search
         if category:
             categories_to_search = [category]
         else:
             categories_to_search = ['people', 'organizations', 'technologies', 'topics', 'meetings']
         
-        for cat in categories_to_search:
-            artifacts = self.query_by_category(cat)
-            for artifact in artifacts:
-                # Search in both name and content
-                name = artifact.get('name', '').lower()
-                content = artifact.get('content', '').lower()
-                
-                if query.lower() in name or query.lower() in content:
-                    results.append(artifact)
-        
+        database = self.current_database()
+        if database:
+            results = database.search(self.kb_dir, query, categories_to_search)
+        else:
+            results = self.snapshot.search(query, categories_to_search)
+        if category and category != category.lower():
+            results = [dict(artifact, category=category) for artifact in results]
         return results
 
 
+def knowledge_base_changed(knowledge_base_dir: Path = Path("markdown_files")):
+    """Make the next query re-check the pages on disk; call after writing a page in this process"""
+    invalidate_snapshots(knowledge_base_dir)
+    invalidate_database(knowledge_base_dir)
+
+
 # Tool functions for HiveMind agent
 
 def list_knowledge_categories() -> str:
@@ -229,10 +238,10 @@ def query_temporal_knowledge(time_period: str) -> str:
 
 
 def search_knowledge(query: str, category: str = None) -> str:
-    """Search for specific content across the knowledge base.
+    """Search for specific content across the knowledge base, best matches first.
     
     Args:
-        query: Text to search for
+        query: Words to search for; use "quotes" for an exact phrase and word* for a prefix
         category: Optional category to limit search to
     """
     kb = KnowledgeQuery()
@@ -350,76 +359,78 @@ def get_knowledge_summary() -> str:
     
     return "\n".join(output)
 
-def find_relationships(entity_name: str, relationship_type: str = None) -> str:
-    """Find relationships for a specific entity.
+def find_relationships(entity_name: str, relationship_type: str = None, direction: str = BOTH) -> str:
+    """Find relationships for a specific entity, in either direction.
     
     Args:
         entity_name: Name of the entity to find relationships for
-        relationship_type: Optional filter for specific relationship type (works_for, uses, attended, etc.)
+        relationship_type: Optional filter for specific relationship type (works_for, uses, attended, discussed_in)
+        direction: 'outgoing' for the entity's own relationships (e.g. who a person works for),
+            'incoming' for relationships pointing at it (e.g. who works for an organization,
+            which organizations use a technology), or 'both'
     """
-    kb = KnowledgeQuery()
-    relationships = []
+    if direction not in (OUTGOING, INCOMING, BOTH):
+        return f"Unknown direction '{direction}': use '{OUTGOING}', '{INCOMING}' or '{BOTH}'"
     
-    # Search for entity across all categories
-    for category in ['people', 'organizations', 'technologies', 'topics', 'meetings']:
-        artifacts = kb.query_by_category(category)
-        for artifact in artifacts:
-            name = artifact.get('name', '').lower()
-            if entity_name.lower() in name:
-                # Check frontmatter for relationships
-                frontmatter = artifact.get('frontmatter', {})
-                if 'relationships' in str(frontmatter):
-                    # Parse relationships from frontmatter
-                    for key, value in frontmatter.items():
-                        if key in ['works_for', 'employs', 'uses_technologies', 'attended', 'discussed_in']:
-                            if not relationship_type or key == relationship_type:
-                                relationships.append({
-                                    'entity': artifact.get('name'),
-                                    'type': key,
-                                    'target': value
-                                })
+    edge_types = [relationship_type] if relationship_type else None
+    edge_type, inverse = FRONTMATTER_EDGES.get(relationship_type, (relationship_type, False))
+    if edge_type != relationship_type:
+        # Frontmatter names (employs, uses_technologies, attendees) stand for an extracted relationship
+        edge_types = [edge_type]
+        direction = INCOMING if inverse else OUTGOING
+    
+    kb = KnowledgeQuery()
+    graph = kb.graph()
+    relationships = [edge for node in graph.match(entity_name) for edge in graph.edges(node, direction, edge_types)]
     
     if not relationships:
         return f"No relationships found for '{entity_name}'"
     
-    output = [f"🔗 Relationships for '{entity_name}':\n"]
-    for rel in relationships:
-        output.append(f"  • {rel['type']}: {rel['target']}")
+    output = [f"🔗 Relationships for '{entity_name}' ({len(relationships)}):\n"]
+    for source, rel_type, target in relationships[:MAX_NODES]:
+        output.append(f"  • {source} {rel_type} {target}")
+    
+    if len(relationships) > MAX_NODES:
+        output.append(f"\n   ... and {len(relationships) - MAX_NODES} more")
     
     return "\n".join(output)
 
 
-def get_entity_network(entity_name: str, depth: int = 1) -> str:
+def get_entity_network(entity_name: str, depth: int = 1, relationship_types: str = None,
+                       max_per_entity: int = MAX_FANOUT) -> str:
     """Get the network of entities connected to the given entity.
     
     Args:
         entity_name: Name of the entity
         depth: How many levels deep to traverse (1 = direct connections, 2 = connections of connections)
+        relationship_types: Optional comma-separated relationship types to follow (works_for, uses, attended, discussed_in)
+        max_per_entity: Most connections followed from each entity
     """
     kb = KnowledgeQuery()
-    network = {entity_name: []}
+    graph = kb.graph()
+    starts = graph.match(entity_name)
+    edge_types = [t.strip() for t in relationship_types.split(',') if t.strip()] if relationship_types else None
+    depth = max(1, depth)
+    connections, truncated = graph.traverse(starts, depth, edge_types=edge_types, max_fanout=max_per_entity)
     
-    # Find direct relationships
-    for category in ['people', 'organizations', 'technologies', 'topics', 'meetings']:
-        artifacts = kb.query_by_category(category)
-        for artifact in artifacts:
-            name = artifact.get('name', '').lower()
-            if entity_name.lower() in name:
-                frontmatter = artifact.get('frontmatter', {})
-                # Extract all relationship values
-                for key, value in frontmatter.items():
-                    if key in ['works_for', 'organization', 'employs', 'uses_technologies', 'attended']:
-                        if isinstance(value, list):
-                            network[entity_name].extend(value)
-                        else:
-                            network[entity_name].append(value)
-    
-    if not network[entity_name]:
+    if not connections:
         return f"No connections found for '{entity_name}'"
     
     output = [f"🕸️  Entity Network for '{entity_name}':\n"]
-    output.append(f"Direct Connections ({len(network[entity_name])}):")
-    for conn in set(network[entity_name]):
-        output.append(f"  • {conn}")
+    if len(starts) > 1:
+        output.append(f"Matching entities: {', '.join(graph.names[node] for node in starts)}\n")
+    
+    for level in range(1, depth + 1):
+        reached = [c for c in connections if c['depth'] == level]
+        if not reached:
+            break
+        output.append(f"{'Direct Connections' if level == 1 else f'Depth {level}'} ({len(reached)}):")
+        for conn in reached:
+            relation = f"{conn['type']}, incoming" if conn['incoming'] else conn['type']
+            via = f" via {conn['via']}" if level > 1 or len(starts) > 1 else ""
+            output.append(f"  • {conn['name']} ({relation}{via})")
+    
+    if truncated:
+        output.append(f"\n   ... more connections not shown (at most {max_per_entity} per entity, {MAX_NODES} in total)")
     
-    return "\n".join(output)
\ No newline at end of file
+    return "\n".join(output)
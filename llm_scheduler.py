@@ -0,0 +1,183 @@
+"""
+Request Scheduler for Azure OpenAI calls
+Retries throttled and transient failures (honoring Retry-After, with jittered
+exponential backoff), adapts concurrency with additive-increase /
+multiplicative-decrease, keeps requests under optional RPM/TPM limits,
+and records throttling time per build phase (and per-call telemetry for a profiler)
+"""
+
+import os
+import time
+import random
+import threading
+from collections import defaultdict, deque
+from typing import Callable, Optional
+
+
+# Retry policy
+MAX_RETRIES = int(os.getenv("HIVEMIND_MAX_RETRIES", "6"))
+BASE_DELAY = 1.0    # seconds, first backoff step
+MAX_DELAY = 60.0    # seconds, backoff ceiling
+
+# Deployment limits (0 = unknown; rely on 429 feedback only)
+RPM_LIMIT = int(os.getenv("HIVEMIND_RPM_LIMIT", "0"))
+TPM_LIMIT = int(os.getenv("HIVEMIND_TPM_LIMIT", "0"))
+
+# HTTP statuses worth retrying
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Server-requested delay from a throttling response, if any"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    for header, scale in (('retry-after-ms', 0.001), ('retry-after', 1.0)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue  # HTTP-date form: fall back to backoff
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Throttling, server errors, timeouts and dropped connections are retried"""
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    # openai.APIConnectionError / APITimeoutError carry no status code
+    return type(error).__name__ in ('APIConnectionError', 'APITimeoutError') or isinstance(error, (ConnectionError, TimeoutError))
+
+
+class RequestScheduler:
+    """Runs chat-completion calls under an adaptive concurrency limit with retries"""
+
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1,
+                 max_retries: int = MAX_RETRIES, rpm_limit: int = RPM_LIMIT, tpm_limit: int = TPM_LIMIT,
+                 profiler=None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max_retries
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+
+        # Adaptive limit (AIMD): starts at the configured maximum
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+
+        # Sliding one-minute window of (timestamp, estimated tokens) for RPM/TPM pacing
+        self.window = deque()
+        self.window_tokens = 0
+
+        # Per-phase statistics
+        self.throttle_seconds = defaultdict(float)
+        self.retries = defaultdict(int)
+        self.throttled = defaultdict(int)
+        
+        # Optional BuildProfiler receiving latency, attempts and token usage of every call
+        self.profiler = profiler
+
+    def acquire(self, phase: str, estimated_tokens: int):
+        """Wait for a concurrency slot and room in the RPM/TPM window"""
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                wait = 0.0 if self.in_flight < int(self.limit) else None
+                if wait is not None:
+                    wait = self.window_wait(now, estimated_tokens)
+                if wait == 0.0:
+                    self.in_flight += 1
+                    self.window.append((now, estimated_tokens))
+                    self.window_tokens += estimated_tokens
+                    return
+                started = time.monotonic()
+                self.condition.wait(timeout=wait)
+                if wait is not None:
+                    # Time spent waiting for the rate window counts as throttling
+                    self.throttle_seconds[phase] += time.monotonic() - started
+
+    def window_wait(self, now: float, estimated_tokens: int) -> float:
+        """Seconds until the next request fits the RPM/TPM limits (0 if it fits now)"""
+        while self.window and now - self.window[0][0] >= 60.0:
+            self.window_tokens -= self.window.popleft()[1]
+        if not self.window:
+            return 0.0
+        over_rpm = self.rpm_limit and len(self.window) >= self.rpm_limit
+        over_tpm = self.tpm_limit and self.window_tokens + estimated_tokens > self.tpm_limit
+        if not (over_rpm or over_tpm):
+            return 0.0
+        return max(0.01, 60.0 - (now - self.window[0][0]))
+
+    def release(self, success: bool, throttled: bool):
+        """Free a slot and adapt the concurrency limit"""
+        with self.condition:
+            self.in_flight -= 1
+            if throttled:
+                # Multiplicative decrease, at most once per second so a burst of 429s halves once
+                now = time.monotonic()
+                if now - self.last_decrease > 1.0:
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    self.last_decrease = now
+            elif success:
+                # Additive increase: about +1 slot per `limit` successful calls
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+            self.condition.notify_all()
+
+    def backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Retry-After if the server sent one, otherwise jittered exponential backoff"""
+        delay = retry_after_seconds(error)
+        if delay is not None:
+            return delay + random.uniform(0, 0.5)
+        return random.uniform(0.5, 1.0) * min(MAX_DELAY, BASE_DELAY * (2 ** attempt))
+
+    def call(self, request: Callable, phase: str = 'extraction', estimated_tokens: int = 0,
+             label: Optional[str] = None, consume: Optional[Callable] = None, **kwargs):
+        """Run request(**kwargs), retrying retryable failures; re-raises the last error
+
+        consume(result), if given, runs while the request still holds its slot (e.g. reading
+        a streamed response); a failure while consuming retries the whole request.
+        """
+        attempt = 0
+        while True:
+            self.acquire(phase, estimated_tokens)
+            started = time.perf_counter()
+            try:
+                result = request(**kwargs)
+                if consume:
+                    result = consume(result)
+            except Exception as e:
+                throttled = getattr(e, 'status_code', None) == 429
+                self.release(success=False, throttled=throttled)
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    if self.profiler:
+                        self.profiler.record_call(phase, label, time.perf_counter() - started, attempt + 1,
+                                                  error=type(e).__name__)
+                    raise
+                delay = self.backoff_delay(attempt, e)
+                with self.condition:
+                    self.retries[phase] += 1
+                    self.throttle_seconds[phase] += delay
+                    if throttled:
+                        self.throttled[phase] += 1
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.release(success=True, throttled=False)
+            if self.profiler:
+                self.profiler.record_call(phase, label, time.perf_counter() - started, attempt + 1,
+                                          usage=getattr(result, 'usage', None))
+            return result
+
+    def summary(self) -> str:
+        """One line per phase with retries, 429s and time lost to throttling"""
+        phases = sorted(set(self.throttle_seconds) | set(self.retries))
+        lines = [f"  • {phase}: {self.retries[phase]} retries ({self.throttled[phase]} throttled), "
+                 f"{self.throttle_seconds[phase]:.1f}s waiting" for phase in phases]
+        lines.append(f"  • concurrency limit now {int(self.limit)}/{self.max_concurrency}")
+        return "\n".join(lines)
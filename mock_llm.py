@@ -0,0 +1,195 @@
+"""
+Mock LLM Backend for the HiveMind Knowledge Builder
+Deterministic offline stand-in for the Azure OpenAI chat client: same
+`client.chat.completions.create(...)` interface, configurable latency and
+error rate, and entity JSON derived from the input text. Used by
+benchmark_build.py and for running builds without the live endpoint.
+"""
+
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+
+# Vocabularies recognised in document text (kept in sync with synthetic_corpus.py)
+KNOWN_TECHNOLOGIES = [
+    'Azure', 'Azure OpenAI', 'Microsoft Copilot', 'Microsoft 365', 'Dynamics 365', 'Power BI',
+    'Databricks', 'Microsoft Fabric', 'Entra ID', 'Microsoft Teams', 'GitHub Copilot',
+    'Azure Kubernetes Service', 'Microsoft Purview', 'Microsoft Sentinel', 'Defender for Cloud',
+    'Azure Machine Learning', 'Azure AI Search', 'Power Platform', 'SAP', 'Salesforce', 'ServiceNow'
+]
+
+KNOWN_ORGANIZATIONS = ['Proximus', 'Microsoft', 'Accenture', 'Deloitte', 'Telenet', 'Orange Belgium', 'BICS']
+
+# Matches the adjudication prompt of AIKnowledgeBuilder.adjudicate_names
+ADJUDICATION_MARKER = "deduplicating entity names"
+
+# Section headers of a packed multi-document prompt (batched_extraction.build_batch_prompt)
+BATCH_SECTION = re.compile(r'^=== (doc\d+) ===$', re.MULTILINE)
+
+# Streamed responses (stream=True): share of the latency before the first delta, delta size
+STREAM_FIRST_TOKEN_SHARE = 0.2
+STREAM_CHUNK_CHARS = 16
+
+
+class MockAPIError(Exception):
+    """Injected API failure, shaped like openai.APIStatusError (status_code, response.headers)"""
+
+    def __init__(self, status_code: int, retry_after_ms: Optional[int] = None):
+        super().__init__(f"Mock API error {status_code}")
+        self.status_code = status_code
+        headers = {'retry-after-ms': str(retry_after_ms)} if retry_after_ms is not None else {}
+        self.response = SimpleNamespace(headers=headers)
+
+
+def field(text: str, label: str) -> Optional[str]:
+    """Value of a 'Label: value' line (markdown bold allowed), if present"""
+    match = re.search(rf'^\W*{re.escape(label)}\W*:[\\*\s]*(.+)$', text, re.MULTILINE | re.IGNORECASE)
+    return match.group(1).strip() if match else None
+
+
+def split_list(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in re.split(r'[,;]', value or '') if item.strip()]
+
+
+def mentioned(text: str, vocabulary: List[str]) -> List[str]:
+    """Vocabulary entries that occur in text as whole words, in vocabulary order
+
+    Longer entries match first, so "Azure OpenAI" does not also count as "Azure".
+    """
+    found = set()
+    for term in sorted(vocabulary, key=len, reverse=True):
+        pattern = rf'(?<!\w){re.escape(term)}(?!\w)'
+        if re.search(pattern, text):
+            found.add(term)
+            text = re.sub(pattern, ' ', text)
+    return [term for term in vocabulary if term in found]
+
+
+def extract_entities(user_prompt: str) -> Dict:
+    """Deterministic entity JSON for an extraction prompt"""
+    document_type = field(user_prompt, 'Document Type') or 'Document'
+    content = user_prompt.split('Document Content:', 1)[-1]
+
+    technologies = mentioned(content, KNOWN_TECHNOLOGIES)
+    organizations = mentioned(content, KNOWN_ORGANIZATIONS)
+    topics = split_list(field(content, 'Topics'))[:7]
+    entities = {'people': [], 'organizations': organizations, 'technologies': technologies,
+                'topics': topics, 'meetings': [], 'relationships': []}
+
+    if document_type == 'LinkedIn Profile':
+        heading = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
+        name = field(content, 'Name') or (heading.group(1).strip() if heading else None)
+        if name:
+            company = field(content, 'Company') or (organizations[0] if organizations else 'Unknown')
+            entities['people'].append({
+                'name': name,
+                'role': field(content, 'Role') or 'Unknown Role',
+                'company': company,
+                'location': field(content, 'Location') or 'Unknown',
+                'skills': split_list(field(content, 'Skills'))[:10]
+            })
+            entities['relationships'].append({'type': 'works_for', 'source': name, 'target': company})
+            if company not in organizations:
+                organizations.append(company)
+
+    elif document_type in ('Meeting Notes', 'Meeting Transcript'):
+        heading = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
+        title = field(content, 'Title') or (heading.group(1).strip() if heading else 'Meeting')
+        date = re.search(r'\b\d{4}-\d{2}-\d{2}\b', content)
+        attendees = split_list(field(content, 'Attendees'))
+        entities['meetings'].append({'title': title, 'date': date.group(0) if date else 'Unknown',
+                                     'attendees': attendees, 'topics': topics[:3]})
+        entities['relationships'].extend({'type': 'attended', 'source': a, 'target': title} for a in attendees)
+        entities['relationships'].extend({'type': 'discussed_in', 'source': t, 'target': title}
+                                         for t in technologies + topics)
+
+    for org in organizations:
+        entities['relationships'].extend({'type': 'uses', 'source': org, 'target': tech}
+                                         for tech in technologies[:3])
+    return entities
+
+
+class MockChatClient:
+    """Offline chat-completions client with deterministic latency, failures and output
+
+    Latency, injected errors and responses depend only on the prompt (and the
+    attempt number for errors), so runs are reproducible at any concurrency.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 429, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.seed = seed
+
+        self.lock = threading.Lock()
+        self.attempts: Dict[str, int] = {}
+        self.calls = 0
+        self.errors = 0
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model: str, messages: List[Dict], **kwargs):
+        """Mimics client.chat.completions.create"""
+        system = next((m['content'] for m in messages if m['role'] == 'system'), '')
+        user = messages[-1]['content']
+        key = hashlib.sha256(f"{self.seed}\x00{system}\x00{user}".encode('utf-8')).hexdigest()
+
+        with self.lock:
+            self.calls += 1
+            attempt = self.attempts.get(key, 0)
+            self.attempts[key] = attempt + 1
+
+        rng = random.Random(f"{key}:{attempt}")
+        latency = self.latency + rng.random() * self.jitter
+        stream = kwargs.get('stream', False)
+        time.sleep(latency * STREAM_FIRST_TOKEN_SHARE if stream else latency)
+        if rng.random() < self.error_rate:
+            with self.lock:
+                self.errors += 1
+            raise MockAPIError(self.error_status, retry_after_ms=10 if self.error_status == 429 else None)
+
+        if ADJUDICATION_MARKER in system:
+            pairs = [line for line in user.splitlines() if line.strip()]
+            content = json.dumps([False] * len(pairs))
+        elif BATCH_SECTION.search(user):
+            # doc id, body, doc id, body, ...
+            parts = BATCH_SECTION.split(user)[1:]
+            batch = {doc_id: extract_entities(body) for doc_id, body in zip(parts[::2], parts[1::2])}
+            content = "```json\n" + json.dumps(batch, ensure_ascii=False) + "\n```"
+        else:
+            content = "```json\n" + json.dumps(extract_entities(user), ensure_ascii=False) + "\n```"
+
+        prompt_tokens = (len(system) + len(user)) // 4
+        completion_tokens = len(content) // 4
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                total_tokens=prompt_tokens + completion_tokens)
+        if stream:
+            # As the API does, usage is only sent in a final chunk when stream_options asks for it
+            include_usage = (kwargs.get('stream_options') or {}).get('include_usage', False)
+            return self.stream_chunks(content, latency * (1 - STREAM_FIRST_TOKEN_SHARE),
+                                      usage if include_usage else None)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason='stop')],
+            usage=usage
+        )
+
+    @staticmethod
+    def stream_chunks(content: str, seconds: float, usage):
+        """Mimics a streamed completion: content deltas spread over `seconds`, then a usage chunk
+        (when usage is given)"""
+        pieces = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+        for piece in pieces:
+            time.sleep(seconds / len(pieces))
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece), finish_reason=None)],
+                                  usage=None)
+        if usage is not None:
+            yield SimpleNamespace(choices=[], usage=usage)
@@ -0,0 +1,109 @@
+"""
+Model Routing for the HiveMind Knowledge Builder
+Sends simple documents (short LinkedIn profiles, meeting notes) to a cheaper,
+faster deployment and escalates to the large model when the small model's
+result fails validation or confidence checks. Keeps per-tier call, latency
+and escalation stats.
+"""
+
+import os
+import threading
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from chunked_extraction import estimate_tokens
+from extraction_schema import ENTITY_KEYS, validate_extraction
+
+
+SMALL = 'small'
+LARGE = 'large'
+
+# Small-tier deployment; routing is off (everything goes to the large model) when unset
+SMALL_MODEL = os.getenv("HIVEMIND_SMALL_MODEL", "")
+SMALL_MAX_TOKENS = int(os.getenv("HIVEMIND_SMALL_MAX_TOKENS", "1500"))
+
+# Document types routed to the small tier, and the largest input it gets
+SMALL_DOCUMENT_TYPES = [t.strip() for t in os.getenv(
+    "HIVEMIND_SMALL_DOCUMENT_TYPES", "LinkedIn Profile,Meeting Notes").split(",") if t.strip()]
+SMALL_MAX_INPUT_TOKENS = int(os.getenv("HIVEMIND_SMALL_MAX_INPUT_TOKENS", "1500"))
+
+# Inputs at least this long should yield some entities; an empty result is escalated
+MIN_TOKENS_FOR_ENTITIES = 200
+
+
+def check_extraction(entities, document_type: str, text: str) -> Optional[str]:
+    """Reason a result should not be trusted (None if it passes the schema and confidence checks)"""
+    if not isinstance(entities, dict):
+        return "not a JSON object"
+    entities, repairs = validate_extraction(entities)
+    dropped = [repair for repair in repairs if repair.endswith("(dropped)")]
+    if dropped:
+        return dropped[0]
+
+    if document_type == "LinkedIn Profile" and not entities.get('people'):
+        return "no person in a LinkedIn profile"
+    if document_type in ("Meeting Notes", "Meeting Transcript") and not entities.get('meetings'):
+        return "no meeting in meeting notes"
+    if estimate_tokens(text) >= MIN_TOKENS_FOR_ENTITIES and not any(entities.get(key) for key in ENTITY_KEYS):
+        return "no entities"
+    return None
+
+
+class ModelRouter:
+    """Chooses a model tier per document and collects per-tier stats"""
+
+    def __init__(self, large_model: str, large_max_tokens: int,
+                 small_model: str = SMALL_MODEL, small_max_tokens: int = SMALL_MAX_TOKENS,
+                 small_document_types: Iterable[str] = SMALL_DOCUMENT_TYPES,
+                 small_max_input_tokens: int = SMALL_MAX_INPUT_TOKENS):
+        self.tiers = {
+            LARGE: {'model': large_model, 'max_tokens': large_max_tokens},
+            SMALL: {'model': small_model, 'max_tokens': small_max_tokens}
+        }
+        self.enabled = bool(small_model)
+        self.small_document_types = set(small_document_types)
+        self.small_max_input_tokens = small_max_input_tokens
+
+        self.lock = threading.Lock()
+        self.calls = defaultdict(int)
+        self.seconds = defaultdict(float)
+        self.failures = defaultdict(int)
+        self.escalations = defaultdict(int)  # reason -> count
+
+    def route(self, document_type: str, text: str) -> str:
+        """Tier for a document (or chunk) of the given type and text"""
+        if (self.enabled and document_type in self.small_document_types
+                and estimate_tokens(text) <= self.small_max_input_tokens):
+            return SMALL
+        return LARGE
+
+    def model(self, tier: str) -> str:
+        return self.tiers[tier]['model']
+
+    def max_tokens(self, tier: str) -> int:
+        return self.tiers[tier]['max_tokens']
+
+    def record_call(self, tier: str, seconds: float, success: bool):
+        with self.lock:
+            self.calls[tier] += 1
+            self.seconds[tier] += seconds
+            if not success:
+                self.failures[tier] += 1
+
+    def record_escalation(self, reason: str):
+        with self.lock:
+            self.escalations[reason] += 1
+
+    def summary(self) -> str:
+        """One line per tier with calls, mean latency and failures, plus escalation reasons"""
+        lines = []
+        for tier in (SMALL, LARGE):
+            if self.calls[tier]:
+                mean = self.seconds[tier] / self.calls[tier]
+                lines.append(f"  • {tier} ({self.model(tier)}): {self.calls[tier]} calls, "
+                             f"{mean:.2f}s mean latency, {self.failures[tier]} failed")
+        escalated = sum(self.escalations.values())
+        if escalated:
+            reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(self.escalations.items()))
+            lines.append(f"  • {escalated} escalated to {LARGE} ({reasons})")
+        return "\n".join(lines)
@@ -0,0 +1,102 @@
+"""
+Near-Duplicate Detection for the HiveMind Knowledge Builder
+MinHash signatures over word shingles plus LSH banding, so re-exported or
+slightly edited copies of a document are found without comparing every pair.
+Only the first copy (the representative) is sent to GPT; the others are
+linked to it as additional provenance.
+"""
+
+import os
+import re
+import hashlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+
+# Estimated Jaccard similarity of word shingles above which two documents are duplicates
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("HIVEMIND_NEAR_DUPLICATE_THRESHOLD", "0.85"))
+
+SHINGLE_WORDS = 5
+MIN_SHINGLES = 10        # Shorter documents are too small to compare reliably
+
+# One-permutation MinHash: 128 bins, banded 16 x 8 for LSH (candidate threshold ~0.7)
+SIGNATURE_BINS = 128
+LSH_BANDS = 16
+
+# Offset added to densified bins so they rarely collide with real minima
+DENSIFY_OFFSET = 1 << 57
+
+
+def shingle_hashes(text: str) -> set:
+    """64-bit hashes of the document's overlapping word 5-grams (case-insensitive)"""
+    words = re.findall(r'\w+', text.lower())
+    hashes = set()
+    for i in range(max(0, len(words) - SHINGLE_WORDS + 1)):
+        shingle = ' '.join(words[i:i + SHINGLE_WORDS])
+        hashes.add(int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big'))
+    return hashes
+
+
+def minhash_signature(text: str) -> Optional[List[int]]:
+    """One-permutation MinHash signature with densification (None for very short texts)
+
+    Each shingle hash is assigned to one bin (h mod bins) and every bin keeps its
+    minimum; empty bins borrow from the next filled bin, so a single hash per shingle
+    gives SIGNATURE_BINS comparable minima.
+    """
+    hashes = shingle_hashes(text)
+    if len(hashes) < MIN_SHINGLES:
+        return None
+
+    bins: List[Optional[int]] = [None] * SIGNATURE_BINS
+    for h in hashes:
+        position, value = h % SIGNATURE_BINS, h // SIGNATURE_BINS
+        if bins[position] is None or value < bins[position]:
+            bins[position] = value
+
+    signature = []
+    for position in range(SIGNATURE_BINS):
+        step = 0
+        while bins[(position + step) % SIGNATURE_BINS] is None:
+            step += 1
+        signature.append(bins[(position + step) % SIGNATURE_BINS] + step * DENSIFY_OFFSET)
+    return signature
+
+
+def estimated_similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+class NearDuplicateIndex:
+    """LSH index of representative documents' signatures"""
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD, bands: int = LSH_BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = SIGNATURE_BINS // bands
+        self.buckets = defaultdict(list)
+        self.signatures: Dict[str, List[int]] = {}
+
+    def band_keys(self, signature: List[int]):
+        for band in range(self.bands):
+            yield band, tuple(signature[band * self.rows:(band + 1) * self.rows])
+
+    def add(self, key: str, signature: List[int]):
+        """Register a representative document"""
+        self.signatures[key] = signature
+        for band_key in self.band_keys(signature):
+            self.buckets[band_key].append(key)
+
+    def find(self, signature: List[int]) -> Optional[Tuple[str, float]]:
+        """Most similar registered document at or above the threshold, with its similarity"""
+        candidates = []
+        for band_key in self.band_keys(signature):
+            candidates.extend(self.buckets.get(band_key, []))
+
+        best = None
+        for key in dict.fromkeys(candidates):  # First-registered wins ties
+            score = estimated_similarity(signature, self.signatures[key])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
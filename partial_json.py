@@ -0,0 +1,222 @@
+"""
+Partial JSON Parsing for the HiveMind Knowledge Builder
+An incremental JSON parser that can be fed a model response piece by piece.
+It ignores markdown code fences and reports each value as soon as it closes.
+On truncated output it still returns every element that was completed, so a
+response cut off at max_tokens keeps its finished entities.
+"""
+
+import re
+import json
+from typing import Callable, List, Optional, Tuple
+
+NUMBER_PATTERN = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?')
+NUMBER_CHARS = set('0123456789+-.eE')
+LITERALS = {'true': True, 'false': False, 'null': None}
+
+
+class IncrementalJSONParser:
+    """Parses one JSON document fed in pieces; text before the root value (e.g. ```json) is skipped
+
+    on_value(path, value) is called for every completed value inside a container,
+    where path is the tuple of keys/indices of that container
+    (e.g. ('people',) for each person of {"people": [...]}).
+    """
+
+    def __init__(self, on_value: Optional[Callable[[tuple, object], None]] = None):
+        self.on_value = on_value
+        self.buffer = ""
+        self.position = 0
+        # Open containers: {'value', 'key' (path element in the parent), 'expect'}
+        self.stack: List[dict] = []
+        self.root = None
+        self.complete = False
+        self.error: Optional[str] = None
+
+    def path(self) -> tuple:
+        return tuple(frame['key'] for frame in self.stack[1:])
+
+    def feed(self, text: str):
+        """Parse as much of the document as the text received so far allows"""
+        if self.complete or self.error:
+            return
+        self.buffer += text
+        try:
+            self.parse(final=False)
+        except ValueError as e:
+            self.error = str(e)
+        # Drop consumed text so long streams do not re-scan it
+        self.buffer = self.buffer[self.position:]
+        self.position = 0
+
+    def finish(self) -> bool:
+        """End of input: parse a trailing number/literal; True if the document was complete"""
+        if not self.complete and not self.error:
+            try:
+                self.parse(final=True)
+            except ValueError as e:
+                self.error = str(e)
+        return self.complete
+
+    def parse(self, final: bool):
+        buffer = self.buffer
+        while not self.complete:
+            # Skip whitespace, separators and (before the root) anything that is not JSON
+            while self.position < len(buffer):
+                char = buffer[self.position]
+                if char.isspace():
+                    self.position += 1
+                elif not self.stack and char not in '{[':
+                    self.position += 1
+                else:
+                    break
+            if self.position >= len(buffer):
+                return
+
+            char = buffer[self.position]
+            frame = self.stack[-1] if self.stack else None
+            if char in '{[':
+                self.expect_value(frame)
+                container = {} if char == '{' else []
+                self.stack.append({'value': container, 'key': self.next_key(frame),
+                                   'expect': 'key' if char == '{' else 'value'})
+                self.position += 1
+            elif char in '}]':
+                if frame is None or (char == '}') != isinstance(frame['value'], dict):
+                    raise ValueError(f"unexpected '{char}' at {self.position}")
+                if frame['expect'] in ('colon', 'key_value'):
+                    raise ValueError(f"unexpected '{char}' after a key at {self.position}")
+                self.stack.pop()
+                self.position += 1
+                self.add_value(frame['value'])
+            elif char == ',':
+                if frame is None or frame['expect'] != 'comma':
+                    raise ValueError(f"unexpected ',' at {self.position}")
+                frame['expect'] = 'key' if isinstance(frame['value'], dict) else 'value'
+                self.position += 1
+            elif char == ':':
+                if frame is None or frame['expect'] != 'colon':
+                    raise ValueError(f"unexpected ':' at {self.position}")
+                frame['expect'] = 'key_value'
+                self.position += 1
+            elif char == '"':
+                end = self.string_end(buffer, self.position)
+                if end is None:
+                    return  # Wait for the rest of the string
+                value = json.loads(buffer[self.position:end])
+                self.position = end
+                if frame['expect'] == 'key':
+                    frame['pending_key'] = value
+                    frame['expect'] = 'colon'
+                else:
+                    self.expect_value(frame)
+                    self.add_value(value)
+            else:
+                end = self.position
+                while end < len(buffer) and buffer[end] in NUMBER_CHARS:
+                    end += 1
+                if end > self.position:
+                    if end == len(buffer) and not final:
+                        return  # The number may continue in the next piece
+                    text = buffer[self.position:end]
+                    if not NUMBER_PATTERN.fullmatch(text):
+                        raise ValueError(f"invalid number '{text}' at {self.position}")
+                    value = float(text) if any(c in text for c in '.eE') else int(text)
+                else:
+                    literal = next((word for word in LITERALS if buffer.startswith(word, self.position)), None)
+                    if literal is None:
+                        if not final and any(word.startswith(buffer[self.position:]) for word in LITERALS):
+                            return
+                        raise ValueError(f"unexpected '{char}' at {self.position}")
+                    end = self.position + len(literal)
+                    value = LITERALS[literal]
+                self.expect_value(frame)
+                self.position = end
+                self.add_value(value)
+
+    @staticmethod
+    def string_end(buffer: str, start: int) -> Optional[int]:
+        """Index after the closing quote of the string starting at start, or None if not closed yet"""
+        position = start + 1
+        while True:
+            position = buffer.find('"', position)
+            if position < 0:
+                return None
+            backslashes = 0
+            while buffer[position - 1 - backslashes] == '\\':
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return position + 1
+            position += 1
+
+    def expect_value(self, frame: Optional[dict]):
+        if frame is not None and frame['expect'] not in ('value', 'key_value'):
+            raise ValueError(f"unexpected value at {self.position}")
+
+    @staticmethod
+    def next_key(frame: Optional[dict]):
+        if frame is None:
+            return None
+        if isinstance(frame['value'], dict):
+            return frame['pending_key']
+        return len(frame['value'])
+
+    def add_value(self, value):
+        """Attach a completed value to its container (or make it the root)"""
+        if not self.stack:
+            self.root = value
+            self.complete = True
+            return
+        frame = self.stack[-1]
+        if isinstance(frame['value'], dict):
+            frame['value'][frame['pending_key']] = value
+        else:
+            frame['value'].append(value)
+        frame['expect'] = 'comma'
+        if self.on_value:
+            self.on_value(self.path(), value)
+
+    def partial(self, open_depth: int = 2):
+        """Everything completed so far
+
+        Open containers down to open_depth levels are included with their completed
+        elements (depth 2 keeps the root object and its open entity list); deeper open
+        values, such as a half-written entity, are dropped.
+        """
+        if self.complete:
+            return self.root
+        value = None
+        for depth in range(min(open_depth, len(self.stack)) - 1, -1, -1):
+            frame = self.stack[depth]
+            container = dict(frame['value']) if isinstance(frame['value'], dict) else list(frame['value'])
+            if value is not None:
+                key = self.stack[depth + 1]['key']
+                if isinstance(container, dict):
+                    container[key] = value
+                else:
+                    container.append(value)
+            value = container
+        return value
+
+    def result(self, open_depth: int = 2) -> Tuple[object, bool, tuple]:
+        """End the input and return (value, complete, truncated path), see parse_response"""
+        complete = self.finish()
+        value = self.partial(open_depth)
+        if value is None:
+            raise ValueError(self.error or "no JSON value in response")
+        return value, complete, () if complete else self.truncated_at()
+
+    def truncated_at(self) -> tuple:
+        """Path of the innermost open container kept by partial(open_depth=2), e.g. ('people',)"""
+        return tuple(frame['key'] for frame in self.stack[1:2])
+
+
+def parse_response(text: str, open_depth: int = 2) -> Tuple[object, bool, tuple]:
+    """(value, complete, truncated path) of a whole model response
+
+    A response that is cut off or turns malformed part-way yields what was completed
+    before that point. Raises ValueError if nothing could be recovered.
+    """
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.result(open_depth)
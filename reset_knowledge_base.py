@@ -52,6 +52,16 @@ def reset_knowledge_base(markdown_dir: Path):
             index_file.unlink()
             deleted_count += 1
     
+    # Delete the staging store so the next build re-processes every source
+    for staging_file in markdown_dir.glob('.hivemind_staging.db*'):
+        staging_file.unlink()
+        deleted_count += 1
+    
+    # Delete the knowledge database; the next build writes it again
+    for database_file in markdown_dir.glob('.hivemind_knowledge.db*'):
+        database_file.unlink()
+        deleted_count += 1
+    
     print(f"\n\n✅ Reset complete!")
     print(f"   Deleted {deleted_count} generated files")
     print(f"   Templates and folder structure preserved")
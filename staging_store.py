@@ -0,0 +1,446 @@
+"""
+Staging Store for the HiveMind Knowledge Builder
+SQLite database next to the knowledge base that records every RawInput source
+(size, mtime, content hash, extraction status and result), the entities each
+source contributed to the current build, and every generated page. With
+streaming, entities are also staged provisionally while their document's
+answer is still being generated.
+
+Extraction results are committed per document as soon as they arrive, so an
+interrupted build resumes where it stopped. Post-processing (dedup,
+MIN_MENTIONS filtering, attendee resolution) runs as indexed queries.
+"""
+
+import json
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SCHEMA_VERSION = 2
+
+# Older schema versions that are upgraded in place rather than rebuilt
+MIGRATED_VERSIONS = (1,)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    source TEXT UNIQUE NOT NULL,
+    handler TEXT,
+    document_type TEXT,
+    size INTEGER,
+    mtime INTEGER,
+    sha256 TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',   -- pending | extracted | failed | duplicate
+    error TEXT,
+    entities TEXT,                            -- raw extraction result (JSON)
+    signature TEXT,                           -- MinHash signature (JSON) for near-duplicate detection
+    duplicate_of TEXT,                        -- representative source of a near-duplicate
+    updated TEXT
+);
+
+-- Entities staged for the current build, one row per mention
+CREATE TABLE IF NOT EXISTS mentions (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL,
+    category TEXT NOT NULL,                   -- organizations | technologies | topics
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_mentions_category_name ON mentions(category, name);
+
+CREATE TABLE IF NOT EXISTS people (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL,
+    name TEXT,
+    first_name TEXT,
+    company TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_people_first_name ON people(first_name);
+CREATE INDEX IF NOT EXISTS idx_people_company ON people(company);
+
+CREATE TABLE IF NOT EXISTS meetings (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS relationships (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL,
+    type TEXT,
+    source TEXT,
+    target TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_relationships_source ON relationships(source);
+CREATE INDEX IF NOT EXISTS idx_relationships_target ON relationships(target);
+
+-- Entities of a document whose streamed answer is still arriving, one row per closed entity;
+-- cleared when the document's result is recorded (rows left by an interrupted build stay
+-- until the document is extracted again)
+CREATE TABLE IF NOT EXISTS provisional (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    category TEXT NOT NULL,                   -- people | meetings | relationships
+    data TEXT NOT NULL,
+    received TEXT NOT NULL,
+    UNIQUE (source, category, data)
+);
+
+CREATE TABLE IF NOT EXISTS pages (
+    path TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    created TEXT NOT NULL
+);
+"""
+
+ENTITY_TABLES = ('mentions', 'people', 'meetings', 'relationships')
+
+
+def file_sha256(path: Path) -> str:
+    """Content hash of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_or_none(value) -> Optional[str]:
+    """Value as a queryable TEXT column (non-string values stay only in the JSON data)"""
+    return value if isinstance(value, str) else None
+
+
+def first_name_key(full_name: Optional[str]) -> Optional[str]:
+    """Lower-cased first name used to resolve meeting attendees"""
+    if not isinstance(full_name, str) or not full_name.split():
+        return None
+    return full_name.split()[0].lower()
+
+
+class StagingStore:
+    """Per-document extraction state, staged entities and page fingerprints in SQLite"""
+
+    def __init__(self, db_path: Path, read_only: bool = False):
+        self.db_path = Path(db_path)
+        self.read_only = read_only
+        self.lock = threading.RLock()
+        if read_only:
+            # Estimates only look up sources: open an existing store read-only, else an empty one in memory.
+            # Without a write-ahead log to replay, immutable also keeps SQLite from creating -wal/-shm files.
+            exists = self.db_path.exists()
+            uri = "file::memory:"
+            if exists:
+                wal = self.db_path.with_name(self.db_path.name + "-wal").exists()
+                uri = self.db_path.resolve().as_uri() + ("?mode=ro" if wal else "?mode=ro&immutable=1")
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row
+            if not exists:
+                self.conn.executescript(SCHEMA)
+            self.seen_sources = set()
+            self.seen_pages = set()
+            return
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Extraction workers record results directly, so share the connection under a lock
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, SCHEMA_VERSION) + MIGRATED_VERSIONS:
+                for table in ('documents', 'pages', 'provisional') + ENTITY_TABLES:
+                    self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.executescript(SCHEMA)
+            # Version 1 stores lack the near-duplicate columns
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(documents)")}
+            for column in ('signature', 'duplicate_of'):
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE documents ADD COLUMN {column} TEXT")
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        # Sources and pages touched during the current build
+        self.seen_sources = set()
+        self.seen_pages = set()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def save(self):
+        """Commit pending changes (documents are committed as they are recorded)"""
+        with self.lock:
+            self.conn.commit()
+
+    # --- Documents ---
+
+    def mark_seen(self, file_path: Path):
+        """Keep a source found in this build from being retracted (called once per scanned source)"""
+        self.seen_sources.add(str(file_path))
+
+    def unchanged_source(self, file_path: Path) -> Optional[Dict]:
+        """Return the stored extraction of a source whose content has not changed"""
+        source = str(file_path)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT * FROM documents WHERE source = ? AND status = 'extracted'", (source,)).fetchone()
+        if row is None:
+            return None
+
+        stat = file_path.stat()
+        if row['size'] != stat.st_size:
+            return None
+        if row['mtime'] != stat.st_mtime_ns:
+            # Touched but possibly identical: fall back to the content hash
+            if row['sha256'] != file_sha256(file_path):
+                return None
+            if not self.read_only:
+                with self.lock, self.conn:
+                    self.conn.execute("UPDATE documents SET mtime = ? WHERE id = ?", (stat.st_mtime_ns, row['id']))
+
+        return {
+            'handler': row['handler'],
+            'document_type': row['document_type'],
+            'entities': json.loads(row['entities']),
+            # Read-only stores may predate the signature column
+            'signature': json.loads(row['signature']) if 'signature' in row.keys() and row['signature'] else None
+        }
+
+    def record_source(self, job: Dict, status: str = 'extracted', error: str = None):
+        """Store a document's extraction result, status and signature, committed immediately"""
+        file_path = job['path']
+        stat = file_path.stat()
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM provisional WHERE source = ?", (job['source'],))
+            self.conn.execute("""
+                INSERT INTO documents (source, handler, document_type, size, mtime, sha256, status, error,
+                                       entities, signature, duplicate_of, updated)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(source) DO UPDATE SET
+                    handler = excluded.handler, document_type = excluded.document_type,
+                    size = excluded.size, mtime = excluded.mtime, sha256 = excluded.sha256,
+                    status = excluded.status, error = excluded.error, entities = excluded.entities,
+                    signature = excluded.signature, duplicate_of = excluded.duplicate_of,
+                    updated = excluded.updated
+            """, (job['source'], job['handler'], job['document_type'], stat.st_size, stat.st_mtime_ns,
+                  file_sha256(file_path), status, error,
+                  json.dumps(job['entities'], ensure_ascii=False),
+                  json.dumps(job['signature']) if job.get('signature') else None,
+                  job.get('duplicate_of'), datetime.now().isoformat()))
+
+    def record_failure(self, job: Dict, error: str):
+        """Mark a document as failed so the next build extracts it again"""
+        self.record_source(job, status='failed', error=error)
+
+    def record_duplicate(self, job: Dict):
+        """Mark a document as a near-duplicate of job['duplicate_of'] (re-checked every build)"""
+        self.record_source(job, status='duplicate')
+
+    def retract_deleted_sources(self) -> List[str]:
+        """Forget sources that were not seen in this build"""
+        with self.lock, self.conn:
+            sources = [row['source'] for row in self.conn.execute("SELECT source FROM documents")]
+            deleted = [source for source in sources if source not in self.seen_sources]
+            self.conn.executemany("DELETE FROM documents WHERE source = ?", [(s,) for s in deleted])
+            self.conn.executemany("DELETE FROM provisional WHERE source = ?", [(s,) for s in deleted])
+        return deleted
+
+    def record_provisional(self, source: str, category: str, entity: Dict):
+        """Stage one streamed entity of a document still being extracted, committed immediately
+
+        An entity sent again (by a retried or continued request) is stored once.
+        """
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO provisional (source, category, data, received) VALUES (?, ?, ?, ?)",
+                (source, category, json.dumps(entity, ensure_ascii=False, sort_keys=True), datetime.now().isoformat()))
+
+    def provisional_entities(self, source: Optional[str] = None) -> List[Dict]:
+        """Provisionally staged entities in arrival order, optionally of one source"""
+        query = "SELECT source, category, data FROM provisional"
+        params = ()
+        if source is not None:
+            query += " WHERE source = ?"
+            params = (source,)
+        with self.lock:
+            rows = self.conn.execute(query + " ORDER BY id", params).fetchall()
+        return [{'source': row['source'], 'category': row['category'], 'entity': json.loads(row['data'])}
+                for row in rows]
+
+    def document_id(self, source: str) -> int:
+        with self.lock:
+            row = self.conn.execute("SELECT id FROM documents WHERE source = ?", (source,)).fetchone()
+            if row:
+                return row['id']
+            with self.conn:
+                return self.conn.execute("INSERT INTO documents (source) VALUES (?)", (source,)).lastrowid
+
+    # --- Staged entities ---
+
+    def reset_entities(self):
+        """Clear entities staged by a previous build"""
+        with self.lock, self.conn:
+            for table in ENTITY_TABLES:
+                self.conn.execute(f"DELETE FROM {table}")
+
+    def stage_contribution(self, source: str, contribution: Dict[str, list]):
+        """Stage the entities one document contributed to the knowledge base"""
+        document_id = self.document_id(source)
+        with self.lock, self.conn:
+            for category in ('organizations', 'technologies', 'topics'):
+                self.conn.executemany(
+                    "INSERT INTO mentions (document_id, category, name) VALUES (?, ?, ?)",
+                    [(document_id, category, name) for name in contribution.get(category, []) if isinstance(name, str)])
+            self.conn.executemany(
+                "INSERT INTO people (document_id, name, first_name, company, data) VALUES (?, ?, ?, ?, ?)",
+                [(document_id, text_or_none(p.get('name')), first_name_key(p.get('name')),
+                  text_or_none(p.get('company')), json.dumps(p, ensure_ascii=False)) for p in contribution.get('people', [])])
+            self.conn.executemany(
+                "INSERT INTO meetings (document_id, data) VALUES (?, ?)",
+                [(document_id, json.dumps(m, ensure_ascii=False)) for m in contribution.get('meetings', [])])
+            self.conn.executemany(
+                "INSERT INTO relationships (document_id, type, source, target, data) VALUES (?, ?, ?, ?, ?)",
+                [(document_id, text_or_none(r.get('type')), text_or_none(r.get('source')), text_or_none(r.get('target')), json.dumps(r, ensure_ascii=False))
+                 for r in contribution.get('relationships', [])])
+
+    def mention_names(self, category: str) -> List[str]:
+        """All staged mentions of a category, in staging order (duplicates included)"""
+        with self.lock:
+            return [row[0] for row in self.conn.execute(
+                "SELECT name FROM mentions WHERE category = ? ORDER BY id", (category,))]
+
+    def load_mapping(self, mapping: Dict[str, str]):
+        """Load name -> canonical name pairs into a temporary lookup table"""
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS canonical (name TEXT PRIMARY KEY, canonical TEXT NOT NULL)")
+        self.conn.execute("DELETE FROM canonical")
+        self.conn.executemany("INSERT OR REPLACE INTO canonical (name, canonical) VALUES (?, ?)", mapping.items())
+
+    def rename_mentions(self, category: str, mapping: Dict[str, str]):
+        """Replace a category's mentions with their canonical names"""
+        with self.lock, self.conn:
+            self.load_mapping(mapping)
+            self.conn.execute("""
+                UPDATE mentions SET name = (SELECT canonical FROM canonical WHERE canonical.name = mentions.name)
+                WHERE category = ? AND name IN (SELECT name FROM canonical)
+            """, (category,))
+
+    def rename_references(self, mapping: Dict[str, str]):
+        """Point people's companies and relationship ends at canonical names"""
+        with self.lock, self.conn:
+            self.load_mapping(mapping)
+            for table, column in (('people', 'company'), ('relationships', 'source'), ('relationships', 'target')):
+                self.conn.execute(f"""
+                    UPDATE {table} SET {column} = (SELECT canonical FROM canonical WHERE canonical.name = {table}.{column})
+                    WHERE {column} IN (SELECT name FROM canonical)
+                """)
+
+    def count_mentions(self, category: str) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM mentions WHERE category = ?", (category,)).fetchone()[0]
+
+    def distinct_names(self, category: str, min_mentions: int = 1, always_keep: Iterable[str] = ()) -> List[str]:
+        """Unique names in first-seen order, optionally only those mentioned min_mentions+ times"""
+        keep = [name.lower() for name in always_keep]
+        placeholders = ', '.join('?' for _ in keep) or "''"
+        with self.lock:
+            return [row[0] for row in self.conn.execute(f"""
+                SELECT name FROM mentions WHERE category = ?
+                GROUP BY name
+                HAVING COUNT(*) >= ? OR lower(name) IN ({placeholders})
+                ORDER BY MIN(id)
+            """, (category, min_mentions, *keep))]
+
+    def mention_counts(self, category: str) -> Dict[str, int]:
+        with self.lock:
+            return {row[0]: row[1] for row in self.conn.execute(
+                "SELECT name, COUNT(*) FROM mentions WHERE category = ? GROUP BY name", (category,))}
+
+    def people(self) -> List[Dict]:
+        """Staged people, with canonical company names"""
+        with self.lock:
+            rows = self.conn.execute("SELECT company, data FROM people ORDER BY id").fetchall()
+        people = []
+        for row in rows:
+            person = json.loads(row['data'])
+            if row['company'] is not None:
+                person['company'] = row['company']
+            people.append(person)
+        return people
+
+    def meetings(self) -> List[Dict]:
+        with self.lock:
+            return [json.loads(row[0]) for row in self.conn.execute("SELECT data FROM meetings ORDER BY id")]
+
+    def relationships(self) -> List[Dict]:
+        """Staged relationships, with canonical source/target names"""
+        with self.lock:
+            rows = self.conn.execute("SELECT source, target, data FROM relationships ORDER BY id").fetchall()
+        relationships = []
+        for row in rows:
+            rel = json.loads(row['data'])
+            if row['source'] is not None:
+                rel['source'] = row['source']
+            if row['target'] is not None:
+                rel['target'] = row['target']
+            relationships.append(rel)
+        return relationships
+
+    def full_name_for(self, first_name: str) -> Optional[str]:
+        """Full name of the last staged person with this first name (indexed lookup)"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT name FROM people WHERE first_name = ? ORDER BY id DESC LIMIT 1",
+                (first_name.lower(),)).fetchone()
+        return row[0] if row else None
+
+    def resolve_attendees(self) -> int:
+        """Resolve meeting attendee first names to full names from staged people"""
+        with self.lock:
+            rows = self.conn.execute("SELECT id, data FROM meetings ORDER BY id").fetchall()
+        updates = []
+        for row in rows:
+            meeting = json.loads(row['data'])
+            resolved = []
+            for attendee in meeting.get('attendees', []):
+                attendee_clean = attendee.strip()
+                # Check if it's already a full name (has space)
+                if ' ' in attendee_clean or not attendee_clean:
+                    resolved.append(attendee_clean)
+                else:
+                    resolved.append(self.full_name_for(attendee_clean) or attendee_clean)  # Keep original if unknown
+            meeting['attendees_resolved'] = resolved
+            updates.append((json.dumps(meeting, ensure_ascii=False), row['id']))
+        with self.lock, self.conn:
+            self.conn.executemany("UPDATE meetings SET data = ? WHERE id = ?", updates)
+        return len(updates)
+
+    # --- Pages ---
+
+    def has_page(self, file_path: Path) -> bool:
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM pages WHERE path = ?", (str(file_path),)).fetchone() is not None
+
+    def page_created(self, file_path: Path) -> str:
+        """Creation date of a page, preserved across rebuilds"""
+        with self.lock:
+            row = self.conn.execute("SELECT created FROM pages WHERE path = ?", (str(file_path),)).fetchone()
+        return row[0] if row else datetime.now().strftime('%Y-%m-%d')
+
+    def record_pages(self, pages: Iterable[Tuple[Path, str, str]]):
+        """Remember the (path, content hash, created date) of every page this build produced"""
+        rows = [(str(file_path), content_hash, created) for file_path, content_hash, created in pages]
+        self.seen_pages.update(row[0] for row in rows)
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO pages (path, sha256, created) VALUES (?, ?, ?)", rows)
+
+    def stale_pages(self) -> List[str]:
+        """Pages from the previous build that this build did not produce"""
+        with self.lock, self.conn:
+            pages = [row[0] for row in self.conn.execute("SELECT path FROM pages")]
+            stale = [page for page in pages if page not in self.seen_pages]
+            self.conn.executemany("DELETE FROM pages WHERE path = ?", [(p,) for p in stale])
+        return stale
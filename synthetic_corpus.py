@@ -0,0 +1,163 @@
+"""
+Synthetic RawInput Generator for HiveMind build benchmarks
+Writes N deterministic documents in the RawInput layout the builder scans:
+LinkedIn profiles and meeting notes (markdown), strategic PDFs and DOCX
+meeting transcripts. PDF and DOCX files are written with the standard
+library only (minimal valid PDF / Office Open XML packages).
+"""
+
+import random
+import zipfile
+from pathlib import Path
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+from mock_llm import KNOWN_TECHNOLOGIES, KNOWN_ORGANIZATIONS
+
+
+FIRST_NAMES = ['Anna', 'Bart', 'Chloe', 'David', 'Elise', 'Frank', 'Greet', 'Hugo', 'Ines', 'Jan',
+               'Karen', 'Lucas', 'Marie', 'Nico', 'Olivia', 'Pieter', 'Quinten', 'Sofie', 'Tom', 'Wout']
+LAST_NAMES = ['Peeters', 'Janssens', 'Maes', 'Jacobs', 'Mertens', 'Willems', 'Claes', 'Goossens',
+              'Wouters', 'De Smet', 'Dubois', 'Lambert', 'Dupont', 'Martin', 'Simon', 'Laurent']
+ROLES = ['Product Owner', 'Enterprise Architect', 'Data Engineer', 'CIO', 'Head of AI',
+         'Security Officer', 'Cloud Architect', 'Program Manager', 'Director Data and IT Governance']
+TOPICS = ['AI Readiness', 'Cloud Migration', 'Data Governance', 'Security Posture', 'Copilot Adoption',
+          'Cost Optimization', 'Customer Experience', 'Network Automation', 'Responsible AI', 'Skilling']
+LOCATIONS = ['Brussels, Belgium', 'Antwerp, Belgium', 'Ghent, Belgium', 'Liège, Belgium', 'Mechelen, Belgium']
+
+# Share of each document kind in a generated corpus
+MIX = {'linkedin': 0.5, 'meeting_notes': 0.25, 'docx': 0.15, 'pdf': 0.10}
+
+
+def person_name(rng: random.Random, index: int) -> str:
+    # The index suffix keeps names unique in large corpora
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}-{index}"
+
+
+def profile_markdown(rng: random.Random, name: str) -> str:
+    company = rng.choice(KNOWN_ORGANIZATIONS)
+    skills = rng.sample(KNOWN_TECHNOLOGIES, 4) + rng.sample(TOPICS, 2)
+    return f"""# {name}
+
+**Name:** {name}
+**Role:** {rng.choice(ROLES)}
+**Company:** {company}
+**Location:** {rng.choice(LOCATIONS)}
+**Skills:** {', '.join(skills)}
+
+# Profile Summary
+{name} works at {company} on {skills[0]} and {skills[1]} programmes, with a focus on {skills[4]}.
+
+# Experience
+## {company} — {rng.choice(ROLES)}
+- Led the rollout of {skills[2]} across business units.
+- Sponsored the {skills[5]} initiative together with {rng.choice(KNOWN_ORGANIZATIONS)}.
+"""
+
+
+def meeting_markdown(rng: random.Random, index: int, attendees: List[str]) -> str:
+    topics = rng.sample(TOPICS, 3)
+    technologies = rng.sample(KNOWN_TECHNOLOGIES, 3)
+    date = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    lines = [f"- {tech} discussion: next steps agreed with the {rng.choice(ROLES)}." for tech in technologies]
+    return f"""# Proximus Account Team meeting {index}
+
+**Title:** Proximus Account Team meeting {index}
+**Date:** {date}
+**Attendees:** {', '.join(attendees)}
+**Topics:** {', '.join(topics)}
+
+## Notes
+{chr(10).join(lines)}
+- Proximus and Microsoft to follow up on {topics[0]}.
+"""
+
+
+def write_pdf(path: Path, lines: List[str]):
+    """Minimal single-page PDF with Helvetica text lines"""
+    def pdf_text(line: str) -> str:
+        safe = line.encode('latin-1', 'replace').decode('latin-1')
+        return safe.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    stream = "BT /F1 10 Tf 50 790 Td 14 TL\n" + "".join(f"({pdf_text(line)}) '\n" for line in lines) + "ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1')
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode('latin-1')
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1')
+    path.write_bytes(data)
+
+
+def write_docx(path: Path, paragraphs: List[str]):
+    """Minimal Office Open XML word document, one paragraph per line"""
+    body = "".join(f'<w:p><w:r><w:t xml:space="preserve">{escape(p)}</w:t></w:r></w:p>' for p in paragraphs)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr('[Content_Types].xml',
+                      '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                      '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                      '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                      '<Default Extension="xml" ContentType="application/xml"/>'
+                      '<Override PartName="/word/document.xml" '
+                      'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+                      '</Types>')
+        docx.writestr('_rels/.rels',
+                      '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                      '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                      '<Relationship Id="rId1" '
+                      'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+                      'Target="word/document.xml"/></Relationships>')
+        docx.writestr('word/document.xml',
+                      '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                      '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                      f'<w:body>{body}</w:body></w:document>')
+
+
+def generate_corpus(root: Path, documents: int, seed: int = 0) -> Dict[str, int]:
+    """Write `documents` synthetic files under root/RawInput; returns counts per kind"""
+    rng = random.Random(seed)
+    raw_input = Path(root) / "RawInput"
+    dirs = {
+        'linkedin': raw_input / "LinkedIn" / "Markdown (enhanced for AI interpretation)",
+        'meeting_notes': raw_input / "Internal Account Discussions",
+        'docx': raw_input / "Meeting transcripts",
+        'pdf': raw_input / "AI Plan"
+    }
+    for directory in dirs.values():
+        directory.mkdir(parents=True, exist_ok=True)
+
+    counts = {kind: int(documents * share) for kind, share in MIX.items()}
+    counts['linkedin'] += documents - sum(counts.values())
+
+    people = [person_name(rng, i) for i in range(max(1, counts['linkedin']))]
+    for i in range(counts['linkedin']):
+        (dirs['linkedin'] / f"profile_{i:05d}.md").write_text(profile_markdown(rng, people[i]), encoding='utf-8')
+
+    for i in range(counts['meeting_notes']):
+        # Attendees by first name, as in real notes; the builder resolves them to full names
+        attendees = [name.split()[0] for name in rng.sample(people, min(3, len(people)))]
+        (dirs['meeting_notes'] / f"meeting_{i:05d}.md").write_text(
+            meeting_markdown(rng, i, attendees), encoding='utf-8')
+
+    for i in range(counts['docx']):
+        write_docx(dirs['docx'] / f"Meeting_Transcript_{i:05d}.docx",
+                   meeting_markdown(rng, 100000 + i, rng.sample(people, min(3, len(people)))).splitlines())
+
+    for i in range(counts['pdf']):
+        technologies = rng.sample(KNOWN_TECHNOLOGIES, 5)
+        lines = [f"Proximus AI Plan {i}", f"Topics: {', '.join(rng.sample(TOPICS, 4))}"]
+        lines += [f"Proximus will scale {tech} with Microsoft in FY26." for tech in technologies]
+        write_pdf(dirs['pdf'] / f"Proximus AI Plan {i:05d}.pdf", lines)
+
+    return counts
@@ -0,0 +1,31 @@
+"""
+Shared pytest setup: the HiveMind modules live at the repository root
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mock_llm import MockChatClient
+from synthetic_corpus import generate_corpus
+
+
+@pytest.fixture
+def make_builder(tmp_path, monkeypatch):
+    """Factory for an AIKnowledgeBuilder working in a temporary directory with a synthetic
+    RawInput corpus and the offline MockChatClient"""
+    import ai_knowledge_builder
+
+    monkeypatch.chdir(tmp_path)
+
+    def make(documents: int = 12, client=None, **options):
+        if not (tmp_path / "RawInput").exists():
+            generate_corpus(tmp_path, documents)
+        options.setdefault('use_cache', False)
+        options.setdefault('conversion_workers', 0)
+        return ai_knowledge_builder.AIKnowledgeBuilder(client=client or MockChatClient(), **options)
+
+    return make
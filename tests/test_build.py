@@ -0,0 +1,38 @@
+"""
+End-to-end builds against the offline MockChatClient: out-of-order completions and page writes
+"""
+
+import shutil
+from pathlib import Path
+
+from mock_llm import MockChatClient
+
+
+def pages(root: Path) -> dict:
+    """Relative path -> content of every generated page"""
+    return {str(path.relative_to(root)): path.read_text(encoding='utf-8')
+            for path in sorted(root.rglob("*.md"))}
+
+
+def test_concurrent_build_matches_sequential_build(make_builder, tmp_path):
+    # Latency jitter makes requests complete out of order
+    client = MockChatClient(latency=0.002, jitter=0.01)
+    make_builder(documents=16, client=client, max_concurrency=8).build()
+    concurrent = pages(tmp_path / "markdown_files")
+
+    shutil.rmtree(tmp_path / "markdown_files")
+    make_builder(client=MockChatClient(), max_concurrency=1).build()
+    assert pages(tmp_path / "markdown_files") == concurrent
+    assert any(path.startswith("entities/people/") for path in concurrent)
+
+
+def test_hand_edited_page_is_rewritten(make_builder, tmp_path):
+    make_builder().build()
+    page = next((tmp_path / "markdown_files" / "entities" / "people").glob("*.md"))
+    generated = page.read_text(encoding='utf-8')
+    page.write_text(generated + "\nEdited by hand.\n", encoding='utf-8')
+
+    rebuilt = make_builder()
+    rebuilt.build()
+    assert page.read_text(encoding='utf-8') == generated
+    assert rebuilt.stats['pages_written'] == 1
@@ -0,0 +1,48 @@
+"""
+Tests for the conversion stage: per-document conversion failures and stopping the producer early
+"""
+
+import threading
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import ai_knowledge_builder
+
+
+def test_failed_conversion_fails_only_its_document(make_builder, monkeypatch):
+    builder = make_builder()
+
+    def crashed_worker(job):
+        if job['handler'] != 'pdf_document':
+            return None
+        future = Future()
+        future.set_exception(BrokenProcessPool("a worker process terminated abruptly"))
+        return future
+
+    monkeypatch.setattr(builder, 'stored_conversion', crashed_worker)
+    builder.build()
+
+    pdfs = [row[0] for row in builder.staging.conn.execute(
+        "SELECT source FROM documents WHERE source LIKE '%.pdf'")]
+    assert pdfs and sorted(builder.failed_sources) == sorted(pdfs)
+    statuses = dict(builder.staging.conn.execute("SELECT status, COUNT(*) FROM documents GROUP BY status"))
+    assert statuses['failed'] == len(pdfs) and statuses['extracted'] > 0
+    assert builder.stats['conversion_errors'] == len(pdfs)
+
+
+def test_closing_the_consumer_stops_the_producer(make_builder, monkeypatch):
+    monkeypatch.setattr(ai_knowledge_builder, 'CONVERSION_QUEUE_SIZE', 1)
+    builder = make_builder()
+    pending = [job for job in builder.collect_documents() if job['entities'] is None]
+    finished = threading.Event()
+    produce = builder.produce_conversions
+
+    def tracked(*args):
+        produce(*args)
+        finished.set()
+
+    monkeypatch.setattr(builder, 'produce_conversions', tracked)
+    jobs = builder.converted_jobs(pending)
+    next(jobs)
+    jobs.close()  # As when extraction raises: the producer is blocked on the full queue
+    assert finished.is_set()
@@ -0,0 +1,46 @@
+"""
+Tests for the --dry-run build estimate
+"""
+
+import os
+from pathlib import Path
+
+
+def tree_state(root: Path) -> dict:
+    """Path -> (size, mtime) of every file under root"""
+    state = {}
+    for directory, _, files in os.walk(root):
+        for name in files:
+            stat = os.stat(os.path.join(directory, name))
+            state[os.path.join(directory, name)] = (stat.st_size, stat.st_mtime_ns)
+    return state
+
+
+def test_dry_run_on_a_fresh_tree_writes_nothing(make_builder, tmp_path):
+    builder = make_builder(use_cache=True, dry_run=True)
+    projection = builder.dry_run()
+    builder.staging.close()
+
+    assert projection
+    assert not (tmp_path / "markdown_files").exists()
+    assert not (tmp_path / ".hivemind_cache").exists()
+
+
+def test_dry_run_leaves_staging_and_text_store_untouched(make_builder, tmp_path):
+    builder = make_builder(use_cache=True)
+    builder.build()
+    builder.staging.close()
+
+    # A touched but identical file makes a build refresh its stored mtime
+    profile = next((tmp_path / "RawInput").rglob("profile_00000.md"))
+    os.utime(profile, ns=(profile.stat().st_atime_ns, profile.stat().st_mtime_ns + 10 ** 9))
+    before = tree_state(tmp_path / "markdown_files")
+    before.update(tree_state(tmp_path / ".hivemind_cache"))
+
+    builder = make_builder(use_cache=True, dry_run=True)
+    builder.dry_run()
+    builder.staging.close()
+
+    after = tree_state(tmp_path / "markdown_files")
+    after.update(tree_state(tmp_path / ".hivemind_cache"))
+    assert after == before
@@ -0,0 +1,42 @@
+"""
+Tests for concurrent, chunked and packed extraction in AIKnowledgeBuilder.extract_documents
+"""
+
+
+def extract(builder):
+    jobs = builder.collect_documents()
+    return jobs, builder.extract_documents(jobs)
+
+
+def test_failed_batch_finishes_every_packed_job(make_builder, monkeypatch):
+    builder = make_builder(pack=True)
+
+    def fail(documents):
+        raise RuntimeError("batch endpoint down")
+
+    monkeypatch.setattr(builder, 'extract_batch_with_ai', fail)
+    jobs, extracted = extract(builder)
+
+    assert extracted
+    assert all('error' in job['entities'] for job in extracted)
+    assert sorted(builder.failed_sources) == sorted(job['source'] for job in extracted)
+
+
+def test_failed_request_is_recorded_as_failure(make_builder, monkeypatch):
+    builder = make_builder()
+    extract_entities = builder.extract_entities_with_ai
+
+    def fail_first_profile(text, source_file, document_type, tier=None):
+        if source_file.endswith("profile_00000.md"):
+            raise RuntimeError("unexpected failure")
+        return extract_entities(text, source_file, document_type, tier)
+
+    monkeypatch.setattr(builder, 'extract_entities_with_ai', fail_first_profile)
+    jobs, extracted = extract(builder)
+
+    assert len(builder.failed_sources) == 1
+    assert builder.failed_sources[0].endswith("profile_00000.md")
+    assert all(job['entities'] is not None for job in extracted)
+    row = builder.staging.conn.execute("SELECT status, error FROM documents WHERE source = ?",
+                                       (builder.failed_sources[0],)).fetchone()
+    assert tuple(row) == ('failed', "unexpected failure")
@@ -0,0 +1,56 @@
+"""
+Tests for the extraction cache: which answers are cached, and under which model
+"""
+
+from ai_knowledge_builder import EXTRACTION_MODEL, EXTRACTION_SYSTEM_PROMPT, EXTRACTION_TEMPERATURE, MAX_CONTINUATIONS
+from extraction_cache import ExtractionCache
+
+PROFILE = "**Name:** Anna Peeters\n**Role:** CIO\n**Company:** Proximus\n"
+PERSON = {'name': 'Anna Peeters', 'role': 'CIO', 'company': 'Proximus'}
+
+
+def answer(people, complete=True):
+    """request_extraction result: (value, complete, truncated path)"""
+    return {'people': people, 'organizations': ['Proximus']}, complete, None if complete else ('people',)
+
+
+def cached_models(builder):
+    """Models with a cached result for PROFILE"""
+    return [model for model in (EXTRACTION_MODEL, 'gpt-mini') if builder.cache.contains(ExtractionCache.make_key(
+        PROFILE, "LinkedIn Profile", EXTRACTION_SYSTEM_PROMPT, model, EXTRACTION_TEMPERATURE))]
+
+
+def test_incomplete_answer_is_not_cached(make_builder, monkeypatch):
+    builder = make_builder(use_cache=True)
+    requests = []
+
+    def truncated(user_prompt, tier, label, sources, max_tokens=None, open_depth=2):
+        requests.append(label)
+        return answer([PERSON], complete=False)
+
+    monkeypatch.setattr(builder, 'request_extraction', truncated)
+    entities = builder.extract_entities_with_ai(PROFILE, "profile.md", "LinkedIn Profile")
+
+    assert entities['people'][0]['name'] == 'Anna Peeters'
+    assert len(requests) == 1 + MAX_CONTINUATIONS
+    assert cached_models(builder) == []
+
+
+def test_escalated_answer_is_cached_under_the_large_model(make_builder, monkeypatch):
+    builder = make_builder(use_cache=True, small_model='gpt-mini')
+    tiers = []
+
+    def by_tier(user_prompt, tier, label, sources, max_tokens=None, open_depth=2):
+        tiers.append(tier)
+        return answer([] if tier == 'small' else [PERSON])  # No person: escalated
+
+    monkeypatch.setattr(builder, 'request_extraction', by_tier)
+    entities = builder.extract_entities_with_ai(PROFILE, "profile.md", "LinkedIn Profile")
+    assert tiers == ['small', 'large']
+    assert entities['people'][0]['name'] == 'Anna Peeters'
+    assert cached_models(builder) == [EXTRACTION_MODEL]
+
+    # The next build routes the document to the small tier again and reuses the large answer
+    assert builder.extract_entities_with_ai(PROFILE, "profile.md", "LinkedIn Profile") == entities
+    assert tiers == ['small', 'large']
+
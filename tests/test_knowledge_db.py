@@ -0,0 +1,125 @@
+"""
+Tests for the SQLite knowledge database: incremental sync, FTS5 search and freshness
+"""
+
+import os
+
+import pytest
+
+from knowledge_db import KnowledgeDatabase, DATABASE_NAME, FTS5_AVAILABLE
+
+pytestmark = pytest.mark.skipif(not FTS5_AVAILABLE, reason="SQLite without FTS5")
+
+
+def page(name: str, page_type: str, body: str, **frontmatter) -> str:
+    lines = [f"name: {name}", f"type: {page_type}"] + [f"{key}: {value}" for key, value in frontmatter.items()]
+    return "---\n" + "\n".join(lines) + f"\ncreated: 2025-01-01\n---\n\n# {name}\n\n{body}\n"
+
+
+@pytest.fixture
+def kb(tmp_path):
+    """Knowledge base with four pages on disk, and a database that checks the pages on every query"""
+    pages = {
+        tmp_path / "entities" / "technologies" / "databricks.md":
+            page("Databricks", "technology", "Lakehouse platform used by several teams."),
+        tmp_path / "entities" / "organizations" / "proximus.md":
+            page("Proximus", "organization", "Belgian telecom operator running Databricks and Azure workloads.",
+                 employs="['Anna Peeters']", uses_technologies="['Databricks', 'Azure']"),
+        tmp_path / "entities" / "people" / "anna-peeters.md":
+            page("Anna Peeters", "person", "Leads the data platform team.", works_for="Proximus"),
+        tmp_path / "entities" / "technologies" / "azure-databricks-connector.md":
+            page("Azure Databricks Connector", "technology", "Connector between the Databricks workspace and Azure.")
+    }
+    for file_path, content in pages.items():
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content, encoding='utf-8')
+    database = KnowledgeDatabase(tmp_path / DATABASE_NAME, check_interval=0)
+    yield tmp_path, database
+    database.close()
+
+
+RELATIONSHIPS = [{'type': 'works_for', 'source': 'Anna Peeters', 'target': 'Proximus'},
+                 {'type': 'uses', 'source': 'Proximus', 'target': 'Databricks'}]
+
+
+def edit(file_path, content: str):
+    """Rewrite a page, moving its mtime forward so the change is visible at any timestamp granularity"""
+    mtime = file_path.stat().st_mtime_ns + 10 ** 9
+    file_path.write_text(content, encoding='utf-8')
+    os.utime(file_path, ns=(mtime, mtime))
+
+
+def test_sync_indexes_only_changed_pages(kb):
+    kb_dir, database = kb
+    assert database.sync(kb_dir, RELATIONSHIPS) == {'updated': 4, 'unchanged': 0, 'removed': 0}
+    assert database.sync(kb_dir, RELATIONSHIPS) == {'updated': 0, 'unchanged': 4, 'removed': 0}
+
+    anna = kb_dir / "entities" / "people" / "anna-peeters.md"
+    edit(anna, page("Anna Peeters", "person", "Now leads the AI team.", works_for="Proximus"))
+    (kb_dir / "entities" / "technologies" / "azure-databricks-connector.md").unlink()
+    proximus = kb_dir / "entities" / "organizations" / "proximus.md"
+    edit(proximus, proximus.read_text(encoding='utf-8'))  # Touched, same content
+    assert database.sync(kb_dir, RELATIONSHIPS) == {'updated': 1, 'unchanged': 2, 'removed': 1}
+    assert database.is_current(kb_dir) is True
+
+    assert database.names('technologies') == ['Databricks']
+    assert database.relationships() == [('works_for', 'Anna Peeters', 'Proximus'), ('uses', 'Proximus', 'Databricks')]
+    assert [artifact['name'] for artifact in database.search(kb_dir, "AI team", ['people'])] == ['Anna Peeters']
+
+
+def test_hand_made_pages_are_indexed(kb):
+    kb_dir, database = kb
+    decision = kb_dir / "events" / "decisions" / "d1.md"
+    decision.parent.mkdir(parents=True)
+    decision.write_text(page("Adopt Databricks", "decision", "Proximus standardizes on Databricks."), encoding='utf-8')
+    database.sync(kb_dir, RELATIONSHIPS)
+
+    assert database.names('decisions') == ['Adopt Databricks']
+    assert [artifact['name'] for artifact in database.search(kb_dir, "standardizes", ['decisions'])] == ['Adopt Databricks']
+
+
+def test_search_ranks_name_matches_first(kb):
+    kb_dir, database = kb
+    database.sync(kb_dir, RELATIONSHIPS)
+
+    results = database.search(kb_dir, "databricks", ['technologies', 'organizations'])
+    assert [artifact['name'] for artifact in results[:2]] == ['Databricks', 'Azure Databricks Connector']
+    assert results[2]['name'] == 'Proximus'
+    assert results[0]['frontmatter']['type'] == 'technology'
+    assert results[0]['source'] == str(kb_dir / "entities" / "technologies" / "databricks.md")
+
+    assert [a['name'] for a in database.search(kb_dir, '"telecom operator"', ['organizations'])] == ['Proximus']
+    assert [a['name'] for a in database.search(kb_dir, 'lake*', ['technologies'])] == ['Databricks']
+    assert database.search(kb_dir, 'databricks', ['people']) == []
+    # FTS5 syntax in the input is quoted, not interpreted
+    assert database.search(kb_dir, 'NEAR(databricks OR) "', ['technologies']) == []
+
+
+def test_is_current_until_a_page_is_added_or_edited(kb):
+    kb_dir, database = kb
+    assert database.is_current(kb_dir) is False
+    database.sync(kb_dir, RELATIONSHIPS)
+    assert database.is_current(kb_dir) is True
+
+    new_page = kb_dir / "entities" / "people" / "bart-maes.md"
+    new_page.write_text(page("Bart Maes", "person", "Data engineer."), encoding='utf-8')
+    assert database.is_current(kb_dir) is False
+    database.sync(kb_dir, RELATIONSHIPS)
+    assert database.is_current(kb_dir) is True
+
+    # An edit in place leaves the directory's mtime unchanged
+    edit(new_page, page("Bart Maes", "person", "Data architect."))
+    assert database.is_current(kb_dir) is False
+
+
+def test_is_current_is_rechecked_after_the_interval_or_invalidation(kb):
+    kb_dir, database = kb
+    database.sync(kb_dir, RELATIONSHIPS)
+    database.check_interval = 3600
+    assert database.is_current(kb_dir) is True
+
+    anna = kb_dir / "entities" / "people" / "anna-peeters.md"
+    edit(anna, page("Anna Peeters", "person", "Now leads the AI team.", works_for="Proximus"))
+    assert database.is_current(kb_dir) is True  # Within the interval
+    database.invalidate()
+    assert database.is_current(kb_dir) is False
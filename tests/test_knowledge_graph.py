@@ -0,0 +1,61 @@
+"""
+Tests for the relationship graph: deduplicated edges, reverse lookups and bounded traversal
+"""
+
+from knowledge_graph import KnowledgeGraph, INCOMING, OUTGOING, frontmatter_edges
+
+EDGES = [
+    ('works_for', 'Anna Peeters', 'Proximus'),
+    ('works_for', 'Bart Maes', 'Proximus'),
+    ('works_for', 'anna  peeters', 'PROXIMUS'),  # Same edge, other spelling
+    ('uses', 'Proximus', 'Databricks'),
+    ('uses', 'Telenet', 'Databricks'),
+    ('attended', 'Anna Peeters', 'AI Roadmap Review'),
+]
+
+
+def names(found):
+    return {entry['name'] for entry in found}
+
+
+def test_edges_are_deduplicated_case_insensitively():
+    graph = KnowledgeGraph(EDGES)
+    assert graph.edge_count == 5
+    assert graph.match("anna peeters") == graph.match("Anna  Peeters")
+
+
+def test_incoming_edges_answer_inverse_questions():
+    graph = KnowledgeGraph(EDGES)
+    proximus = graph.match("Proximus")[0]
+    assert graph.edges(proximus, INCOMING, ['works_for']) == [
+        ('Anna Peeters', 'works_for', 'Proximus'), ('Bart Maes', 'works_for', 'Proximus')]
+    assert graph.edges(proximus, OUTGOING) == [('Proximus', 'uses', 'Databricks')]
+
+
+def test_traversal_is_bounded_by_depth_and_fanout():
+    graph = KnowledgeGraph(EDGES)
+    anna = graph.match("Anna Peeters")
+
+    found, truncated = graph.traverse(anna, depth=1)
+    assert names(found) == {'Proximus', 'AI Roadmap Review'}
+    assert not truncated
+
+    found, _ = graph.traverse(anna, depth=3)
+    assert names(found) == {'Proximus', 'AI Roadmap Review', 'Bart Maes', 'Databricks', 'Telenet'}
+    assert {entry['name']: entry['depth'] for entry in found}['Telenet'] == 3
+
+    found, truncated = graph.traverse(anna, depth=3, max_fanout=1)
+    assert truncated and len(found) < 5
+
+    found, _ = graph.traverse(anna, depth=3, edge_types=['works_for'])
+    assert names(found) == {'Proximus', 'Bart Maes'}
+
+
+def test_frontmatter_inverse_keys_give_extracted_edges():
+    artifacts = [{'category': 'organizations', 'name': 'Proximus',
+                  'frontmatter': {'employs': "['Anna Peeters', 'Bart Maes']", 'uses_technologies': "['Azure']"}},
+                 {'category': 'meetings', 'name': 'ai-roadmap-review',
+                  'frontmatter': {'title': 'AI Roadmap Review', 'attendees': "['Anna Peeters']"}}]
+    assert frontmatter_edges(artifacts) == [
+        ('works_for', 'Anna Peeters', 'Proximus'), ('works_for', 'Bart Maes', 'Proximus'),
+        ('uses', 'Proximus', 'Azure'), ('attended', 'Anna Peeters', 'AI Roadmap Review')]
@@ -0,0 +1,51 @@
+"""
+Tests for the BM25F knowledge search index
+"""
+
+from knowledge_index import KnowledgeIndex, parse_query
+
+
+def index_with_pages() -> KnowledgeIndex:
+    index = KnowledgeIndex()
+    index.add("databricks.md", 'technologies', "Databricks", {'type': 'technology'},
+              "Lakehouse platform. Used for data engineering.")
+    index.add("proximus.md", 'organizations', "Proximus", {'uses_technologies': "['Databricks', 'Azure']"},
+              "Belgian telecom operator. Runs Databricks workloads next to Azure data platform services.")
+    index.add("anna.md", 'people', "Anna Peeters", {'works_for': 'Proximus'}, "Leads the data platform team.")
+    return index
+
+
+def test_parse_query_clauses():
+    assert parse_query('azure "data platform" lake* Van-Geel') == [
+        ('term', ['azure']), ('phrase', ['data', 'platform']), ('prefix', ['lake']), ('phrase', ['van', 'geel'])]
+
+
+def test_name_match_ranks_first():
+    keys = [key for key, _ in index_with_pages().search("databricks")]
+    assert keys == ["databricks.md", "proximus.md"]
+
+
+def test_all_clauses_must_match():
+    index = index_with_pages()
+    assert sorted(key for key, _ in index.search('"data platform" proximus')) == ["anna.md", "proximus.md"]
+    assert index.search("databricks anna") == []
+    assert [key for key, _ in index.search("lake*")] == ["databricks.md"]
+    assert [key for key, _ in index.search("proximus", categories=['people'])] == ["anna.md"]
+
+
+def test_phrases_do_not_span_fields():
+    index = KnowledgeIndex()
+    index.add("a.md", 'topics', "Cloud", {}, "Migration plan")
+    assert index.search('"cloud migration"') == []
+
+
+def test_replaced_and_removed_pages_leave_the_index():
+    index = index_with_pages()
+    index.add("anna.md", 'people', "Anna Peeters", {}, "Now works on security.")
+    assert [key for key, _ in index.search("security")] == ["anna.md"]
+    assert [key for key, _ in index.search('"data platform"')] == ["proximus.md"]
+
+    index.remove("proximus.md")
+    assert [key for key, _ in index.search("databricks")] == ["databricks.md"]
+    assert len(index) == 2
+    assert "belgian" not in index.postings
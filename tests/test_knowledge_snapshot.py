@@ -0,0 +1,41 @@
+"""
+Tests for the shared knowledge snapshot: rescans bounded by the check interval, and invalidation
+"""
+
+import os
+
+from knowledge_snapshot import KnowledgeSnapshot
+from knowledge_tools import KnowledgeQuery, knowledge_base_changed
+
+
+def write_person(kb_dir, name: str, body: str):
+    file_path = kb_dir / "entities" / "people" / f"{name.lower().replace(' ', '-')}.md"
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(f"---\nname: {name}\ntype: person\n---\n\n{body}\n", encoding='utf-8')
+    return file_path
+
+
+def test_in_place_edit_is_seen_after_the_interval_or_invalidation(tmp_path):
+    page = write_person(tmp_path, "Anna Peeters", "Leads the data team.")
+    snapshot = KnowledgeSnapshot(tmp_path, check_interval=3600)
+    assert snapshot.artifacts('people')[0]['content'] == "Leads the data team."
+
+    page.write_text(page.read_text(encoding='utf-8').replace("data", "AI"), encoding='utf-8')
+    stat = page.stat()
+    os.utime(page, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert snapshot.artifacts('people')[0]['content'] == "Leads the data team."  # Within the interval
+
+    snapshot.invalidate()
+    assert snapshot.artifacts('people')[0]['content'] == "Leads the AI team."
+    assert [artifact['name'] for artifact in snapshot.search("AI", ['people'])] == ["Anna Peeters"]
+
+
+def test_agent_writes_invalidate_the_shared_snapshot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_person(tmp_path / "markdown_files", "Anna Peeters", "Leads the data team.")
+    kb = KnowledgeQuery()
+    assert len(kb.query_by_category('people')) == 1
+
+    write_person(tmp_path / "markdown_files", "Bart Maes", "Data engineer.")
+    knowledge_base_changed(tmp_path / "markdown_files")  # Spelled differently from KnowledgeQuery's path
+    assert len(kb.query_by_category('people')) == 2
@@ -0,0 +1,127 @@
+"""
+Tests for the request scheduler: retries, Retry-After, backoff and adaptive concurrency
+"""
+
+import threading
+import time
+
+import pytest
+
+import llm_scheduler
+from llm_scheduler import RequestScheduler, BASE_DELAY, MAX_DELAY
+from mock_llm import MockAPIError
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays the scheduler slept for (without sleeping)"""
+    delays = []
+    monkeypatch.setattr(llm_scheduler.time, 'sleep', delays.append)
+    return delays
+
+
+def failing(errors, result="ok"):
+    """Request raising the given errors in turn, then returning result"""
+    errors = list(errors)
+    calls = []
+
+    def request(**kwargs):
+        calls.append(kwargs)
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    request.calls = calls
+    return request
+
+
+def test_throttled_request_honors_retry_after(sleeps):
+    scheduler = RequestScheduler(max_concurrency=8)
+    request = failing([MockAPIError(429, retry_after_ms=250), MockAPIError(429, retry_after_ms=250)])
+
+    assert scheduler.call(request, phase='extraction', model='gpt') == "ok"
+    assert len(request.calls) == 3
+    assert all(0.25 <= delay <= 0.75 for delay in sleeps)
+    assert scheduler.retries['extraction'] == 2
+    assert scheduler.throttled['extraction'] == 2
+    # A burst of 429s halves the limit once; the success then adds back a fraction of a slot
+    assert 4 <= scheduler.limit < 5
+
+
+def test_server_errors_back_off_exponentially(sleeps):
+    scheduler = RequestScheduler(max_concurrency=4)
+    request = failing([MockAPIError(503)] * 3)
+
+    assert scheduler.call(request) == "ok"
+    assert len(sleeps) == 3
+    for attempt, delay in enumerate(sleeps):
+        step = min(MAX_DELAY, BASE_DELAY * 2 ** attempt)
+        assert 0.5 * step <= delay <= step
+    assert scheduler.throttled['extraction'] == 0
+    assert scheduler.limit == 4
+
+
+def test_client_errors_are_not_retried(sleeps):
+    scheduler = RequestScheduler(max_concurrency=4)
+    request = failing([MockAPIError(400)])
+
+    with pytest.raises(MockAPIError):
+        scheduler.call(request)
+    assert len(request.calls) == 1
+    assert sleeps == []
+    assert scheduler.in_flight == 0
+
+
+def test_gives_up_after_max_retries(sleeps):
+    scheduler = RequestScheduler(max_concurrency=4, max_retries=2)
+    request = failing([MockAPIError(429)] * 5)
+
+    with pytest.raises(MockAPIError):
+        scheduler.call(request)
+    assert len(request.calls) == 3
+    assert scheduler.in_flight == 0
+
+
+def test_concurrency_limit_bounds_requests_in_flight():
+    scheduler = RequestScheduler(max_concurrency=3)
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def request():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return True
+
+    threads = [threading.Thread(target=scheduler.call, args=(request,)) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 3
+
+
+def test_rpm_limit_waits_for_the_window():
+    scheduler = RequestScheduler(max_concurrency=4, rpm_limit=2)
+    assert scheduler.window_wait(100.0, 0) == 0.0
+    scheduler.window.extend([(100.0, 0), (110.0, 0)])
+    assert scheduler.window_wait(120.0, 0) == pytest.approx(40.0)
+    assert scheduler.window_wait(161.0, 0) == 0.0
+
+
+def test_failure_while_consuming_retries_the_request(sleeps):
+    consumed = []
+
+    def consume(result):
+        consumed.append(result)
+        if len(consumed) == 1:
+            raise MockAPIError(500)  # The stream broke off
+        return result.upper()
+
+    request = failing([])
+    assert RequestScheduler(2).call(request, consume=consume) == "OK"
+    assert len(request.calls) == 2 and len(sleeps) == 1
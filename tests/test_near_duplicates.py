@@ -0,0 +1,101 @@
+"""
+Tests for MinHash/LSH near-duplicate detection and the staging columns that store signatures
+"""
+
+import json
+import random
+import sqlite3
+
+from near_duplicates import NearDuplicateIndex, minhash_signature
+from staging_store import StagingStore, SCHEMA_VERSION, file_sha256
+
+WORDS = ["azure", "copilot", "proximus", "roadmap", "security", "data", "platform", "governance",
+         "migration", "pilot", "budget", "adoption", "teams", "fabric", "model", "review"]
+
+
+def document(seed: int, length: int = 400) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def test_lightly_edited_copy_is_found():
+    original = document(1)
+    words = original.split()
+    words[200] = "databricks"  # One changed word touches only a few shingles
+    index = NearDuplicateIndex()
+    index.add("original.md", minhash_signature(original))
+
+    match = index.find(minhash_signature(" ".join(words)))
+    assert match is not None
+    assert match[0] == "original.md" and match[1] >= 0.85
+
+
+def test_different_documents_are_not_matched():
+    index = NearDuplicateIndex()
+    index.add("a.md", minhash_signature(document(1)))
+    assert index.find(minhash_signature(document(2))) is None
+
+
+def test_short_documents_have_no_signature():
+    assert minhash_signature("Weekly sync with Proximus") is None
+
+
+# documents table as written by schema version 1 (before near-duplicate detection)
+V1_DOCUMENTS = """
+CREATE TABLE documents (
+    id INTEGER PRIMARY KEY,
+    source TEXT UNIQUE NOT NULL,
+    handler TEXT,
+    document_type TEXT,
+    size INTEGER,
+    mtime INTEGER,
+    sha256 TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    error TEXT,
+    entities TEXT,
+    updated TEXT
+);
+CREATE TABLE pages (
+    path TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    created TEXT NOT NULL
+);
+PRAGMA user_version = 1;
+"""
+
+ENTITIES = {'people': [], 'organizations': ['Proximus'], 'technologies': ['Azure'],
+            'topics': [], 'meetings': [], 'relationships': []}
+
+
+def write_v1_store(db_path, source_path):
+    stat = source_path.stat()
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(V1_DOCUMENTS)
+    conn.execute("""
+        INSERT INTO documents (source, handler, document_type, size, mtime, sha256, status, entities, updated)
+        VALUES (?, 'meeting_notes', 'Meeting Notes', ?, ?, ?, 'extracted', ?, '2025-01-01T00:00:00')
+    """, (str(source_path), stat.st_size, stat.st_mtime_ns, file_sha256(source_path), json.dumps(ENTITIES)))
+    conn.execute("INSERT INTO pages (path, sha256, created) VALUES ('page.md', 'abc', '2025-01-01')")
+    conn.commit()
+    conn.close()
+
+
+def test_version_1_store_is_upgraded_in_place(tmp_path):
+    source = tmp_path / "notes.md"
+    source.write_text("# Weekly sync\nProximus on Azure\n", encoding='utf-8')
+    db_path = tmp_path / ".hivemind_staging.db"
+    write_v1_store(db_path, source)
+
+    store = StagingStore(db_path)
+    try:
+        columns = {row[1] for row in store.conn.execute("PRAGMA table_info(documents)")}
+        assert {'signature', 'duplicate_of'} <= columns
+        assert store.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert store.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0] == 1
+
+        entry = store.unchanged_source(source)
+        assert entry is not None
+        assert entry['entities'] == ENTITIES
+        assert entry['signature'] is None
+    finally:
+        store.close()
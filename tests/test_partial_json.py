@@ -0,0 +1,83 @@
+"""
+Tests for salvaging cut-off extraction answers: partial JSON parsing and continuation requests
+"""
+
+import json
+
+import pytest
+
+from partial_json import IncrementalJSONParser, parse_response
+
+ANSWER = {
+    'people': [{'name': 'Anna Peeters', 'role': 'CIO', 'company': 'Proximus'},
+               {'name': 'Bart Maes', 'role': 'Data Engineer', 'company': 'Proximus'}],
+    'organizations': ['Proximus'],
+    'technologies': ['Azure', 'Databricks'],
+    'topics': [], 'meetings': [], 'relationships': []
+}
+
+
+def test_complete_answer_in_a_code_fence():
+    value, complete, truncated_at = parse_response("```json\n" + json.dumps(ANSWER) + "\n```")
+    assert value == ANSWER
+    assert complete is True
+    assert truncated_at == ()
+
+
+def test_cut_off_answer_keeps_completed_entities():
+    text = json.dumps(ANSWER)
+    cut = text[:text.index('Bart') + 6]  # Inside the second person
+
+    value, complete, truncated_at = parse_response(cut)
+    assert complete is False
+    assert truncated_at == ('people',)
+    assert value == {'people': [ANSWER['people'][0]]}
+
+
+def test_cut_off_batch_keeps_completed_documents():
+    text = json.dumps({'doc1': ANSWER, 'doc2': ANSWER})
+    cut = text[:text.rindex('Databricks')]
+
+    value, complete, _ = parse_response(cut, open_depth=1)
+    assert complete is False
+    assert value == {'doc1': ANSWER}
+
+
+def test_values_are_reported_as_they_close_across_pieces():
+    closed = []
+    parser = IncrementalJSONParser(lambda path, value: closed.append((path, value)))
+    text = json.dumps(ANSWER)
+    for start in range(0, len(text), 7):
+        parser.feed(text[start:start + 7])
+    assert parser.finish() is True
+    assert [value for path, value in closed if path == ('people',)] == ANSWER['people']
+
+
+def test_unrecoverable_answer_raises():
+    with pytest.raises(ValueError):
+        parse_response("I could not find any entities.")
+
+
+def test_cut_off_answer_is_completed_by_continuations(make_builder, monkeypatch):
+    builder = make_builder()
+    text = json.dumps(ANSWER)
+    answers = [
+        parse_response(text[:text.index('Bart') + 6]),
+        parse_response(json.dumps({'people': [ANSWER['people'][1]], 'organizations': ['Proximus'],
+                                   'technologies': ['Azure', 'Databricks']}))
+    ]
+    prompts = []
+
+    def respond(user_prompt, tier, label, sources, max_tokens=None, open_depth=2):
+        prompts.append(user_prompt)
+        return answers.pop(0)
+
+    monkeypatch.setattr(builder, 'request_extraction', respond)
+    entities, dropped, complete = builder.extract_complete("Extract this.", 'large', "profile.md")
+
+    assert complete is True
+    assert dropped == []
+    assert [person['name'] for person in entities['people']] == ['Anna Peeters', 'Bart Maes']
+    assert entities['technologies'] == ['Azure', 'Databricks']
+    assert "Anna Peeters" in prompts[1] and "cut off" in prompts[1]
+    assert builder.stats['continuations'] == 1
@@ -0,0 +1,101 @@
+"""
+Tests for the staging store: per-source bookkeeping, incremental rebuilds, resume and retraction
+"""
+
+import sqlite3
+
+from document_scanner import HANDLER_REGISTRY
+from mock_llm import MockChatClient
+from staging_store import StagingStore
+
+ENTITIES = {'people': [], 'organizations': ['Proximus'], 'technologies': ['Azure'],
+            'topics': [], 'meetings': [], 'relationships': []}
+
+
+def test_unknown_schema_version_is_rebuilt(tmp_path):
+    db_path = tmp_path / ".hivemind_staging.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript("CREATE TABLE documents (id INTEGER PRIMARY KEY, legacy TEXT); PRAGMA user_version = 99;")
+    conn.close()
+
+    store = StagingStore(db_path)
+    try:
+        columns = {row[1] for row in store.conn.execute("PRAGMA table_info(documents)")}
+        assert 'legacy' not in columns and 'signature' in columns
+    finally:
+        store.close()
+
+
+def test_changed_source_is_not_reused(tmp_path):
+    source = tmp_path / "notes.md"
+    source.write_text("first version\n", encoding='utf-8')
+    store = StagingStore(tmp_path / ".hivemind_staging.db")
+    try:
+        job = {'path': source, 'source': str(source), 'handler': 'meeting_notes',
+               'document_type': 'Meeting Notes', 'entities': ENTITIES}
+        store.record_source(job)
+        assert store.unchanged_source(source)['entities'] == ENTITIES
+
+        source.write_text("second, longer version\n", encoding='utf-8')
+        assert store.unchanged_source(source) is None
+    finally:
+        store.close()
+
+
+def test_rebuild_reuses_unchanged_sources(make_builder):
+    builder = make_builder()
+    builder.build()
+    extracted = builder.stats['sources_extracted']
+
+    client = MockChatClient()
+    rebuilt = make_builder(client=client)
+    rebuilt.build()
+    assert rebuilt.stats['sources_unchanged'] == extracted
+    assert rebuilt.stats['sources_extracted'] == 0
+    assert client.calls == 0
+    assert rebuilt.stats['pages_written'] == 0
+
+
+def test_interrupted_build_resumes_where_it_stopped(make_builder):
+    # The first build stops after extracting five documents (results are committed per document)
+    builder = make_builder()
+    jobs = builder.collect_documents()
+    builder.extract_documents(jobs[:5])
+    builder.staging.close()
+
+    client = MockChatClient()
+    resumed = make_builder(client=client)
+    resumed.build()
+    assert resumed.stats['sources_unchanged'] == 5
+    assert resumed.stats['sources_extracted'] == len(jobs) - 5
+    assert client.calls == len(jobs) - 5
+
+
+def test_deleted_source_is_retracted(make_builder, tmp_path):
+    make_builder().build()
+    profile = next((tmp_path / "RawInput").rglob("profile_00000.md"))
+    name = profile.read_text(encoding='utf-8').splitlines()[0].lstrip('# ')
+    person_page = tmp_path / "markdown_files" / "entities" / "people" / f"{name.lower().replace(' ', '-')}.md"
+    assert person_page.exists()
+
+    profile.unlink()
+    rebuilt = make_builder()
+    rebuilt.build()
+    assert not person_page.exists()
+    assert rebuilt.stats['pages_removed'] >= 1
+
+
+def test_sources_of_an_unavailable_handler_are_kept(make_builder, tmp_path, monkeypatch):
+    builder = make_builder()
+    builder.build()
+    staged = builder.staging.conn.execute("SELECT COUNT(*) FROM documents WHERE handler = 'docx_document'").fetchone()[0]
+    assert staged > 0
+
+    # markitdown missing: the DOCX transcripts cannot be converted
+    docx = next(handler for handler in HANDLER_REGISTRY if handler['name'] == 'docx_document')
+    monkeypatch.setitem(docx, 'available', lambda: False)
+    rebuilt = make_builder()
+    rebuilt.build()
+    assert rebuilt.staging.conn.execute("SELECT COUNT(*) FROM documents WHERE handler = 'docx_document'").fetchone()[0] == staged
+    assert rebuilt.stats['sources_unchanged'] == builder.stats['sources_extracted']
+    assert rebuilt.stats['pages_removed'] == 0
@@ -0,0 +1,56 @@
+"""
+Tests for streamed extraction: usage chunks, entities staged as they close, and identical output
+"""
+
+import shutil
+from pathlib import Path
+
+from mock_llm import MockChatClient
+
+PROFILE = "**Name:** Anna Peeters\n**Role:** CIO\n**Company:** Proximus\n"
+
+
+def pages(root: Path) -> dict:
+    return {str(path.relative_to(root)): path.read_text(encoding='utf-8') for path in sorted(root.rglob("*.md"))}
+
+
+def stream(**options) -> list:
+    return list(MockChatClient().chat.completions.create(
+        model='gpt-4.1', messages=[{'role': 'system', 'content': "Extract"}, {'role': 'user', 'content': PROFILE}],
+        stream=True, **options))
+
+
+def test_usage_chunk_is_sent_only_when_requested():
+    assert all(chunk.usage is None for chunk in stream())
+    chunks = stream(stream_options={'include_usage': True})
+    assert chunks[-1].choices == [] and chunks[-1].usage.completion_tokens > 0
+
+
+def test_entities_are_staged_before_their_document_is_recorded(make_builder):
+    builder = make_builder(stream=True)
+    staged_early = []
+
+    def check(source, category, entity):
+        # Runs after the staging store's listener, while the answer is still streaming
+        status = builder.staging.conn.execute("SELECT status FROM documents WHERE source = ?", (source,)).fetchone()
+        provisional = builder.staging.provisional_entities(source)
+        staged_early.append(status is None and {'source': source, 'category': category, 'entity': entity} in provisional)
+
+    builder.entity_listeners.append(check)
+    builder.build()
+
+    assert staged_early and all(staged_early)
+    assert builder.stats['entities_streamed'] == len(staged_early)
+    assert builder.staging.provisional_entities() == []  # Replaced by the recorded results
+
+
+def test_streamed_build_matches_unstreamed_build(make_builder, tmp_path):
+    builder = make_builder(stream=True, profile=True)
+    builder.build()
+    streamed = pages(tmp_path / "markdown_files")
+    assert sum(call['completion_tokens'] for call in builder.profiler.calls) > 0
+
+    shutil.rmtree(tmp_path / "markdown_files")
+    make_builder().build()
+    assert pages(tmp_path / "markdown_files") == streamed
+